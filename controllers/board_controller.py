@@ -5,7 +5,7 @@ from tkinter import Tk
 
 from models.board_model import BoardModel
 from undo_history.undo_history_manager import UndoHistoryManager
-from utils.constants import BOARD_SIZE
+from utils.constants import SUBGRID_SIZE
 from views.board_view import BoardView
 from controllers.cell_controller import CellController
 
@@ -13,10 +13,15 @@ from controllers.cell_controller import CellController
 class BoardController:
     """ Controller for managing the board's logic and interaction between the model and view. """
 
-    def __init__(self, parent: Union[Tk, tk.Frame], undo_history_manager: UndoHistoryManager):
-        """ Initialize the BoardController with a BoardModel, BoardView, and CellControllers. """
-        self.model = BoardModel()
-        self.view = BoardView(parent)
+    def __init__(self, parent: Union[Tk, tk.Frame], undo_history_manager: UndoHistoryManager,
+                 subgrid_size=SUBGRID_SIZE):
+        """
+        Initialize the BoardController with a BoardModel, BoardView, and CellControllers.
+        :param subgrid_size: Cells along each side of a subgrid: 3 for a 9x9 board, 4 for 16x16 or 5 for 25x25
+        """
+        self.model = BoardModel(subgrid_size)
+        self.size = self.model.size  # Cells along each side of the board
+        self.view = BoardView(parent, self.size)
         self.cells = []
         self.parent = parent
         self.selected_cell: CellController = None
@@ -31,9 +36,9 @@ class BoardController:
 
     def _initialize_cells(self):
         """ Initializes the cells in the board and assigns them to the view and model. """
-        for x in range(BOARD_SIZE):
+        for x in range(self.size):
             row_controllers = []
-            for y in range(BOARD_SIZE):
+            for y in range(self.size):
                 try:
                     # Create and add cell controller
                     cell_controller = CellController(self, self.view, self.model, x, y)
@@ -53,10 +58,22 @@ class BoardController:
         self.model.populate_board(numbers)
 
         # Update the views
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
+        for x in range(self.size):
+            for y in range(self.size):
                 self.cells[x][y].view.update_labels()
 
+    def load_puzzle(self, givens: list[int]):
+        """
+        Replaces the board with a new puzzle in one batch.
+        Every cell is reset first, including the givens of the last puzzle, then each cell view is redrawn once.
+        :param givens: The puzzle as a flat list of values in row major order, with 0 for blanks
+        """
+        cells = self.cells_flat
+        for cell, num in zip(cells, givens):
+            cell.model.load(num or None)
+        for cell in cells:
+            cell.model.notify()
+
     @property
     def cells_flat(self) -> list[CellController]:
         """ Returns a flat list of all cell controllers on the board. """
@@ -5,7 +5,7 @@ from models.board_model import BoardModel
 from models.cell_model import CellModel
 from undo_history.cell_commands import *
 from undo_history.undo_history_manager import UndoHistoryManager
-from utils.constants import BOARD_SIZE
+from core.geometry import symbol_digit
 from views.board_view import BoardView
 from views.cell_view import CellView
 from views.mode_button import ModeButton, Mode
@@ -19,10 +19,10 @@ class CellController:
     """ Controller for managing the logic between the Cell Model and Cell View. """
     def __init__(self, board_controller: 'BoardController', board_view: BoardView, board_model: BoardModel,
                  x: int, y: int, **kwargs):
-        if not (0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE):
+        if not (0 <= x < board_model.size and 0 <= y < board_model.size):
             raise ValueError(f"Invalid cell coordinates: ({x}, {y})")
 
-        self.model = CellModel(x, y)
+        self.model = CellModel(x, y, board_model.size)
         self.view = CellView(board_view.frame, self.model, **kwargs)
         self.board_controller = board_controller
         self.view.model = self.model
@@ -186,9 +186,10 @@ class EventHandler:
         self.cell_controller.move_selection(0, 1)
 
     def on_key_press(self, event):
-        """ Makes sure only valid numeric keys are pressed. """
-        if event.keysym in '123456789':
-            self.cell_controller.toggle_number(int(event.keysym))
+        """ Makes sure only valid digit keys are pressed. Digits above 9 are typed as letters, starting with A. """
+        number = symbol_digit(event.keysym)
+        if number is not None and number <= len(self.cell_controller.model.notes):
+            self.cell_controller.toggle_number(number)
             self.cell_controller.highlight_matching_cells()
 
     def clear(self, event=None):
@@ -237,8 +238,9 @@ class SelectionManager:
         :param dy: Change in Y
         """
 
-        new_x = (self.cell_controller.model.x + dx) % BOARD_SIZE
-        new_y = (self.cell_controller.model.y + dy) % BOARD_SIZE
+        size = len(self.cell_controller.board_controller.cells)
+        new_x = (self.cell_controller.model.x + dx) % size
+        new_y = (self.cell_controller.model.y + dy) % size
         new_cell = self.cell_controller.board_controller.cells[new_x][new_y]
         if new_cell:
             new_cell.event_handler.on_press(None)
@@ -0,0 +1,123 @@
+import numpy as np
+
+from core.grid import ALL_DIGITS, CELL_COLUMN, CELL_ROW, CELL_SUBGRID, HOUSES
+from utils.constants import BOARD_SIZE, SUBGRID_SIZE
+
+CELL_COUNT = BOARD_SIZE * BOARD_SIZE
+DIGIT_BITS = (1 << np.arange(BOARD_SIZE)).astype(np.uint16)  # Mask bit of each digit, digit 1 is the lowest bit
+
+_CELL_ROW = np.array(CELL_ROW)
+_CELL_COLUMN = np.array(CELL_COLUMN)
+_CELL_SUBGRID = np.array(CELL_SUBGRID)
+_HOUSE_CELLS = np.array([[x * BOARD_SIZE + y for x, y in house] for house in HOUSES])  # Rows, columns, then subgrids
+
+_VALUE_BITS = np.array([0] + [1 << (num - 1) for num in range(1, BOARD_SIZE + 1)], dtype=np.uint16)
+_POPCOUNT = np.array([mask.bit_count() for mask in range(ALL_DIGITS + 1)], dtype=np.uint8)
+_MASK_DIGIT = np.array([mask.bit_length() for mask in range(ALL_DIGITS + 1)], dtype=np.uint8)  # For single bits
+
+
+def digit_flags(boards: np.ndarray) -> np.ndarray:
+    """
+    Converts boards to one flag per digit.
+    :param boards: An (N, 81) array of values in row major order, with 0 for blanks
+    :return: An (N, 81, 9) bool array, true where the cell holds the digit.
+    """
+    return boards[:, :, None] == np.arange(1, BOARD_SIZE + 1, dtype=boards.dtype)
+
+
+def house_counts(flags: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Counts how many cells of every row, column and subgrid have each flag set.
+    :param flags: An (N, 81, 9) bool array of one flag per digit
+    :return: Three (N, 9, 9) arrays of counts, indexed by board, house and digit.
+    """
+    n = flags.shape[0]
+    grid = flags.reshape(n, BOARD_SIZE, BOARD_SIZE, BOARD_SIZE).astype(np.uint8)
+    rows = grid.sum(axis=2, dtype=np.uint8)
+    columns = grid.sum(axis=1, dtype=np.uint8)
+    subgrids = grid.reshape(n, SUBGRID_SIZE, SUBGRID_SIZE, SUBGRID_SIZE, SUBGRID_SIZE, BOARD_SIZE) \
+        .sum(axis=(2, 4), dtype=np.uint8).reshape(n, BOARD_SIZE, BOARD_SIZE)
+    return rows, columns, subgrids
+
+
+def candidate_flags(boards: np.ndarray) -> np.ndarray:
+    """
+    Finds the digits not used anywhere else in the house of each cell, for every cell of every board.
+    Like get_possible_values in models/cell_model.py, the value of a cell itself is not counted against it.
+    :param boards: An (N, 81) array of values in row major order, with 0 for blanks
+    :return: An (N, 81, 9) bool array, true where the digit is a candidate.
+    """
+    flags = digit_flags(boards)
+    rows, columns, subgrids = house_counts(flags)
+    own = flags.astype(np.uint8)
+    # Each placed digit is counted once in each of the 3 houses of its own cell
+    used = rows[:, _CELL_ROW] + columns[:, _CELL_COLUMN] + subgrids[:, _CELL_SUBGRID] - 3 * own
+    return used == 0
+
+
+def candidate_masks(boards: np.ndarray) -> np.ndarray:
+    """
+    Computes the candidate bitmask of every cell of every board, matching get_possible_values.
+    :param boards: An (N, 81) array of values in row major order, with 0 for blanks
+    :return: An (N, 81) uint16 array of masks, with digit 1 as the lowest bit.
+    """
+    return to_masks(candidate_flags(np.asarray(boards, dtype=np.uint8)))
+
+
+def to_masks(flags: np.ndarray) -> np.ndarray:
+    """ Packs an (..., 9) array of digit flags into bitmasks. """
+    return (flags * DIGIT_BITS).sum(axis=-1, dtype=np.uint16)
+
+
+def propagate_singles(boards: np.ndarray, max_rounds: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fills in naked and hidden singles on every board at once, a round at a time, until nothing is forced.
+    A board is frozen as soon as it has a contradiction: two equal digits in a house, a blank cell with no
+    candidates, or a cell that is the only place for two digits.
+    :param boards: An (N, 81) array of values in row major order, with 0 for blanks. It is not changed
+    :param max_rounds: Most rounds to run, defaulting to no limit
+    :return: The filled boards, and an (N,) bool array that is true for boards with a contradiction.
+    """
+    boards = np.array(boards, dtype=np.uint8)
+    contradiction = np.zeros(boards.shape[0], dtype=bool)
+    active = np.arange(boards.shape[0])  # Boards that changed in the last round, the only ones worth another
+
+    rounds = 0
+    while active.size and (max_rounds is None or rounds < max_rounds):
+        rounds += 1
+        current = boards[active]
+        blank = current == 0
+        bits = _VALUE_BITS[current]
+
+        # Digits placed in each house, and whether any house holds the same digit twice
+        placed = np.bitwise_or.reduce(bits[:, _HOUSE_CELLS], axis=2)
+        stuck = (_POPCOUNT[placed] < (~blank)[:, _HOUSE_CELLS].sum(axis=2)).any(axis=1)
+
+        used = placed[:, _CELL_ROW] | placed[:, BOARD_SIZE + _CELL_COLUMN] | placed[:, 2 * BOARD_SIZE + _CELL_SUBGRID]
+        candidates = np.where(blank, ~used & ALL_DIGITS, 0).astype(np.uint16)
+        stuck |= (blank & (candidates == 0)).any(axis=1)
+
+        # A naked single is a blank cell with one candidate
+        forced = np.where(_POPCOUNT[candidates] == 1, candidates, 0).astype(np.uint16)
+
+        # A hidden single is a digit with one place left in a house, and not yet placed there
+        seen_once = np.zeros_like(placed)
+        seen_twice = np.zeros_like(placed)
+        house_candidates = candidates[:, _HOUSE_CELLS]
+        for i in range(BOARD_SIZE):
+            seen_twice |= seen_once & house_candidates[:, :, i]
+            seen_once |= house_candidates[:, :, i]
+        stuck |= (ALL_DIGITS & ~(seen_once | placed) != 0).any(axis=1)  # A digit has nowhere left to go
+        hidden = seen_once & ~seen_twice
+        forced |= candidates & (hidden[:, _CELL_ROW] | hidden[:, BOARD_SIZE + _CELL_COLUMN] |
+                                hidden[:, 2 * BOARD_SIZE + _CELL_SUBGRID])
+
+        stuck |= (_POPCOUNT[forced] > 1).any(axis=1)
+        contradiction[active[stuck]] = True
+        forced[stuck] = 0
+        fill = forced != 0
+        current[fill] = _MASK_DIGIT[forced[fill]]
+        boards[active] = current
+
+        active = active[fill.any(axis=1)]
+    return boards, contradiction
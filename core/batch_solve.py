@@ -0,0 +1,220 @@
+"""
+Solves a file of puzzles from the command line, spreading the work over a process pool.
+
+Each line of the input is one puzzle of 81 digits in row major order, with 0 or . for blank cells. Lines of 256 or
+625 characters are 16x16 and 25x25 puzzles, with letters for the digits above 9. Each line of the output is the
+solution of the puzzle on the same input line, "unsolvable" if it has none, "invalid" if the line is not a puzzle,
+or "timeout" if its search gave up after TIME_LIMIT seconds. A blank input line gets a blank output line. With
+--unordered, lines are written as soon as they are solved and start with their line number in the input, counting
+blank lines, which are left out.
+
+With --rate, each line of the output is the difficulty of the puzzle instead, followed by the hardest technique it
+needs, or "guess" if the techniques get stuck. A puzzle whose search runs out of time is written as "hard timeout".
+
+With --dedupe, 9x9 puzzles are keyed by their canonical form, so each worker solves or rates a puzzle once however
+many relabeled, permuted or transposed copies of it the input holds. Finding the form takes a few milliseconds on
+average, and up to about 250ms for very symmetric boards, which is more than solving most puzzles, so it only pays off
+for inputs with many copies or for rating.
+
+    python -m core.batch_solve puzzles.txt -o solutions.txt
+    python -m core.batch_solve puzzles.txt --rate -o ratings.txt
+"""
+import argparse
+import sys
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+
+from core.cancellation import StopReason, deadline_in
+from core.canonical import canonical_form
+from core.exact_cover import ExactCoverSolver
+from core.geometry import BoardGeometry
+from core.grid import format_puzzle, parse_puzzle
+from core.rater import PuzzleRater
+
+INVALID = 'invalid'
+UNSOLVABLE = 'unsolvable'
+TIMEOUT = 'timeout'
+
+GUESS = 'guess'
+
+CACHE_SIZE = 1 << 16  # Canonical forms each worker remembers the result of, when deduping
+TIME_LIMIT = 10.0  # Seconds a worker searches one puzzle for before writing it as a timeout
+
+_solvers = {}  # One solver per worker process and board size, created on first use
+_rater = None
+_solutions = {}  # Canonical form, to its solution and why its search stopped
+_ratings = {}  # Canonical form, to its line of output when rated
+
+
+def solve_values(values: list[int]) -> tuple[Optional[list[int]], StopReason]:
+    """
+    Solves a puzzle with the exact cover solver, giving up after TIME_LIMIT seconds.
+    :param values: The puzzle as a flat list of values, with 0 for blanks
+    :return: The values of the solution, or None if there is none or the search gave up, and why the search stopped.
+    """
+    if len(values) not in _solvers:
+        _solvers[len(values)] = ExactCoverSolver(geometry=BoardGeometry.for_cell_count(len(values)))
+    solver = _solvers[len(values)]
+    solution = values[:]
+    if not solver.solve(solution, deadline_in(TIME_LIMIT)):
+        return None, solver.stop_reason
+    return solution, solver.stop_reason
+
+
+def _solution_line(solution: Optional[list[int]], stop_reason: StopReason) -> str:
+    """ Returns the line to write for the result of solve_values. """
+    if solution is not None:
+        return format_puzzle(solution)
+    return UNSOLVABLE if stop_reason is StopReason.COMPLETED else TIMEOUT
+
+
+def solve_line(line: str) -> str:
+    """ Solves one line of the input, returning the line to write for it. """
+    values = parse_puzzle(line)
+    if values is None:
+        return INVALID
+    return _solution_line(*solve_values(values))
+
+
+def rate_line(line: str) -> str:
+    """ Rates one line of the input, returning its difficulty and the hardest technique it needs. """
+    global _rater
+    if _rater is None:
+        _rater = PuzzleRater()
+
+    values = parse_puzzle(line)
+    if values is None:
+        return INVALID
+    rating = _rater.rate(values)
+    if rating is None:
+        return UNSOLVABLE
+    if rating.stop_reason is not StopReason.COMPLETED:
+        technique = TIMEOUT
+    elif rating.node_count:
+        technique = GUESS
+    else:
+        technique = 'none' if rating.technique is None else rating.technique.name.lower()
+    return f'{rating.difficulty.name.lower()} {technique}'
+
+
+def solve_line_deduped(line: str) -> str:
+    """
+    Solves one line of the input like solve_line, but solves each canonical form once, and turns its solution back
+    into one of the puzzle on the line. Boards other than 9x9 are solved as they are.
+    """
+    values = parse_puzzle(line)
+    if values is None or len(values) != 81:
+        return solve_line(line)
+    form, transform = canonical_form(values)
+    solution, stop_reason = _cached(_solutions, bytes(form), lambda: solve_values(form))
+    return _solution_line(None if solution is None else transform.invert(solution), stop_reason)
+
+
+def rate_line_deduped(line: str) -> str:
+    """ Rates one line of the input like rate_line, but rates each canonical form once. """
+    values = parse_puzzle(line)
+    if values is None or len(values) != 81:
+        return rate_line(line)
+    return _cached(_ratings, bytes(canonical_form(values)[0]), lambda: rate_line(line))
+
+
+def _cached(cache: dict, key: bytes, compute: Callable):
+    """ Returns the result for a key, computing it on a miss. The oldest entry is dropped once the cache is full. """
+    if key in cache:
+        return cache[key]
+    if len(cache) >= CACHE_SIZE:
+        del cache[next(iter(cache))]
+    result = cache[key] = compute()
+    return result
+
+
+def _solve_numbered(handle_line: Callable[[str], str], numbered_line: tuple[int, str]) -> tuple[int, str]:
+    """ Handles a line, keeping its line number so results can be written out of order. """
+    number, line = numbered_line
+    return number, handle_line(line)
+
+
+def solve_stream(lines: Iterable[str], pool, ordered=True, batch_size=10000, chunk_size=64,
+                 handle_line: Callable[[str], str] = solve_line) -> Iterator[str]:
+    """
+    Solves every line with the pool, yielding the output lines.
+    Only batch_size lines are read ahead at a time, because Pool.imap would otherwise read the whole input into its
+    task queue. Memory use is the same for a file of a thousand lines or a hundred million.
+    :param lines: The puzzles, one per line
+    :param pool: The process pool to solve with
+    :param ordered: If true, results are yielded in input order, with an empty result for each blank line. Otherwise
+                    as soon as they are solved, with the input line number in front, and blank lines left out
+    :param batch_size: How many lines to read ahead of the results
+    :param chunk_size: How many lines to send to a worker at once
+    :param handle_line: Turns a line of input into its line of output, such as solve_line or rate_line
+    """
+    numbered = enumerate(lines, 1)  # Numbered before blank lines are skipped, so numbers match the input
+    while True:
+        batch = list(islice(numbered, batch_size))
+        if not batch:
+            return
+        puzzles = [(number, line) for number, line in batch if line.strip()]
+        if ordered:
+            results = pool.imap(handle_line, (line for _, line in puzzles), chunk_size)
+            for _, line in batch:
+                yield next(results) if line.strip() else ''
+        else:
+            for number, result in pool.imap_unordered(partial(_solve_numbered, handle_line), puzzles, chunk_size):
+                yield f'{number} {result}'
+
+
+def run(source: TextIO, destination: TextIO, processes: int = None, ordered=True, batch_size=10000,
+        chunk_size=64, rate=False, dedupe=False) -> int:
+    """
+    Solves every puzzle in source and writes the results to destination.
+    :param processes: Number of worker processes, defaulting to one per core
+    :param rate: If true, the puzzles are rated instead of solved
+    :param dedupe: If true, each worker solves or rates equivalent 9x9 puzzles once
+    :return: The number of puzzles that were invalid, unsolvable or timed out.
+    """
+    failures = 0
+    if dedupe:
+        handle_line = rate_line_deduped if rate else solve_line_deduped
+    else:
+        handle_line = rate_line if rate else solve_line
+    with Pool(processes) as pool:
+        for result in solve_stream(source, pool, ordered, batch_size, chunk_size, handle_line):
+            if result.endswith(INVALID) or result.endswith(UNSOLVABLE) or result.endswith(TIMEOUT):
+                failures += 1
+            destination.write(result + '\n')
+    return failures
+
+
+def main(argv: list[str] = None) -> int:
+    """ Entry point for the command line. Returns 1 if any puzzle was invalid, unsolvable or timed out. """
+    parser = argparse.ArgumentParser(description='Solve a file of sudoku puzzles, one per line.')
+    parser.add_argument('input', help='Puzzle file, or - for standard input')
+    parser.add_argument('-o', '--output', help='Solution file, defaulting to standard output')
+    parser.add_argument('-p', '--processes', type=int, help='Worker processes, defaulting to one per core')
+    parser.add_argument('--unordered', action='store_true',
+                        help='Write solutions as they complete, prefixed with their line number')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Lines read ahead of the results')
+    parser.add_argument('--chunk-size', type=int, default=64, help='Lines sent to a worker at once')
+    parser.add_argument('--rate', action='store_true',
+                        help='Write the difficulty of each puzzle and the hardest technique it needs')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='Solve or rate equivalent 9x9 puzzles once, for inputs with many copies of a puzzle')
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    destination = sys.stdout if args.output is None else open(args.output, 'w')
+    try:
+        failures = run(source, destination, args.processes, not args.unordered, args.batch_size, args.chunk_size,
+                       args.rate, args.dedupe)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if destination is not sys.stdout:
+            destination.close()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
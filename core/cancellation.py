@@ -0,0 +1,52 @@
+import threading
+import time
+from enum import Enum
+from typing import Optional
+
+CHECK_INTERVAL = 1024  # Iterations between checks of the deadline and cancellation token
+
+
+class StopReason(Enum):
+    """ Why the last solve or check stopped: """
+    COMPLETED = 0  # The search finished, so the answer is exact
+    MAX_ITERATIONS = 1  # The iteration limit was reached
+    DEADLINE = 2  # The deadline passed
+    CANCELLED = 3  # The cancellation token was cancelled
+
+
+class CancellationToken:
+    """
+    Lets another thread, or a UI callback, ask a solve in progress to stop.
+    Solvers only look at the token every CHECK_INTERVAL iterations, so cancelling costs nothing while it isn't used.
+    Passing a multiprocessing Event lets one token stop solves running in several processes.
+    """
+
+    def __init__(self, event=None):
+        self._event = threading.Event() if event is None else event
+
+    def cancel(self):
+        """ Asks every solve using this token to stop as soon as it next checks. """
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        """ Returns true once cancel has been called. """
+        return self._event.is_set()
+
+
+def deadline_in(seconds: float) -> float:
+    """ Returns the deadline for a time budget starting now, on the clock solvers check deadlines against. """
+    return time.monotonic() + seconds
+
+
+def check_stop(deadline: Optional[float], cancel_token: Optional[CancellationToken]) -> Optional[StopReason]:
+    """
+    Checks whether a solve should stop early.
+    :param deadline: A time from deadline_in, or None for no deadline
+    :param cancel_token: The token of the solve, or None if it can't be cancelled
+    :return: The reason to stop, or None to carry on.
+    """
+    if cancel_token is not None and cancel_token.is_cancelled():
+        return StopReason.CANCELLED
+    if deadline is not None and time.monotonic() >= deadline:
+        return StopReason.DEADLINE
+    return None
@@ -0,0 +1,235 @@
+from itertools import permutations, product
+
+from core.geometry import BoardGeometry
+
+MERGE_THRESHOLD = 4096  # Candidates kept before those with the same rows left are merged, reached by symmetric boards
+
+_tables = {}  # Subgrid size, to its line orders and clue pattern tables
+
+
+class SymmetryTransform:
+    """
+    One of the ways to turn a board into an equivalent one: an optional transposition, then an order of the rows and
+    of the columns that keeps each band and stack together, then a relabeling of the digits.
+    Row r of the transformed board is row rows[r] of the (transposed) board, read in the order of columns, and each
+    digit d becomes relabel[d].
+    """
+
+    def __init__(self, size: int, transposed: bool, rows: tuple[int, ...], columns: tuple[int, ...],
+                 relabel: list[int]):
+        self.size = size
+        self.transposed = transposed
+        self.rows = rows
+        self.columns = columns
+        self.relabel = relabel  # Each digit, to the digit it becomes, with 0 staying 0
+
+    def apply(self, values: list[int]) -> list[int]:
+        """ Transforms a board, given as a flat list of values with 0 for blanks. """
+        return [self.relabel[values[index]] for index in self._sources()]
+
+    def invert(self, values: list[int]) -> list[int]:
+        """ Undoes the transform, such as to turn the solution of a canonical puzzle into one of the original. """
+        unlabel = [0] * (self.size + 1)
+        for num, label in enumerate(self.relabel):
+            unlabel[label] = num
+        original = [0] * (self.size * self.size)
+        for index, source in enumerate(self._sources()):
+            original[source] = unlabel[values[index]]
+        return original
+
+    def _sources(self) -> list[int]:
+        """ Returns the index in the original board of every cell of the transformed board. """
+        size = self.size
+        if self.transposed:
+            return [column * size + row for row in self.rows for column in self.columns]
+        return [row * size + column for row in self.rows for column in self.columns]
+
+
+def canonical_form(values: list[int]) -> tuple[list[int], SymmetryTransform]:
+    """
+    Finds the canonical form of a board: the smallest of every board it can be turned into by relabeling digits,
+    reordering rows within bands and bands, the same for columns, and transposing. Two boards are equivalent exactly
+    when their canonical forms are equal, so the form can be used to find puzzles that are the same in disguise.
+
+    Boards are compared row by row: first by which cells of the row are blank, reading each blank as smaller than a
+    clue, then by the digits of the row. The digits are relabeled in the order they first appear, which always gives
+    the smallest labels. The rows are chosen one at a time, keeping only the transforms that tie for the smallest row
+    so far, and comparing clue patterns through lookup tables before any digits. Swapping identical rows or columns
+    changes nothing, so only one of them is tried. Most 9x9 puzzles only look at a few thousand of the 3 million
+    transforms, so the median is about a millisecond, but the mean is several times that, from 2 to 9ms depending on
+    the puzzles. Boards that map onto themselves under many transforms, such as puzzles with symmetric clues and full
+    grids, keep every tied transform until MERGE_THRESHOLD of them are merged, and take 150 to 250ms.
+    Only boards up to 9x9 are supported, as a 16x16 board has millions of column orders to try.
+    :param values: The board as a flat list of values in row major order, with 0 for blanks
+    :return: The canonical board, and the transform that turns the board into it.
+    """
+    geometry = BoardGeometry.for_cell_count(len(values))
+    if geometry is None or geometry.subgrid_size > 3:
+        raise ValueError('Canonical forms are only found for boards up to 9x9')
+    size, n = geometry.size, geometry.subgrid_size
+    orders, pattern_tables, best_orders = _tables_for(n)
+    grids = ([values[row * size:row * size + size] for row in range(size)],
+             [values[column::size] for column in range(size)])
+    masks = [[sum(1 << column for column, num in enumerate(row) if num) for row in grid] for grid in grids]
+    # Swapping identical lines leaves the board as it is, so lines are told apart by the first line they match
+    line_ids = [[grid.index(line) for line in grid] for grid in grids]
+
+    # Every first row has its clues relabeled 1, 2, 3 and so on, so only the pattern of clues can tell them apart
+    smallest = min(pattern_tables[best_orders[mask][0]][mask] for grid_masks in masks for mask in grid_masks)
+    # Transposed, rows so far, column order, relabeling, next label. The relabeling is left for the second row to fill
+    # in, as most candidates are dropped by the pattern of their second row
+    candidates = []
+    for transposed in range(2):
+        column_ids = line_ids[1 - transposed]
+        repeated_columns = len(set(column_ids)) < size
+        for row in _row_choices((), n, line_ids[transposed]):
+            mask = masks[transposed][row]
+            if pattern_tables[best_orders[mask][0]][mask] != smallest:
+                continue
+            seen = set()
+            for order in best_orders[mask]:
+                if repeated_columns:
+                    columns = tuple(column_ids[column] for column in orders[order])
+                    if columns in seen:
+                        continue
+                    seen.add(columns)
+                candidates.append((transposed, (row,), order, None, 1))
+
+    for _ in range(1, size):
+        candidates = _next_rows(candidates, grids, masks, line_ids, orders, pattern_tables, n)
+        if len(candidates) > MERGE_THRESHOLD:
+            candidates = _merge(candidates, grids, orders, n)
+
+    transposed, rows, order, relabel, next_label = candidates[0]
+    for num in range(1, size + 1):  # Digits missing from a puzzle take the labels left over
+        if not relabel[num]:
+            relabel[num] = next_label
+            next_label += 1
+    transform = SymmetryTransform(size, bool(transposed), rows, orders[order], relabel)
+    return transform.apply(values), transform
+
+
+def canonical_key(values: list[int]) -> bytes:
+    """ Returns the canonical form of a board packed into bytes, to use as a dictionary key. """
+    return bytes(canonical_form(values)[0])
+
+
+def _next_rows(candidates: list, grids: tuple, masks: list, line_ids: list, orders: list, pattern_tables: list,
+               n: int) -> list:
+    """ Extends every candidate by each row it can take next, keeping only those that tie for the smallest row. """
+    extended = []
+    smallest_pattern = None
+    choices = {}
+    for transposed, rows, order, relabel, next_label in candidates:
+        table, grid_masks = pattern_tables[order], masks[transposed]
+        if (transposed, rows) not in choices:
+            choices[transposed, rows] = _row_choices(rows, n, line_ids[transposed])
+        for row in choices[transposed, rows]:
+            pattern = table[grid_masks[row]]
+            if smallest_pattern is None or pattern < smallest_pattern:
+                smallest_pattern = pattern
+                extended = []
+            if pattern == smallest_pattern:
+                extended.append((transposed, rows, order, relabel, next_label, row))
+
+    kept = []
+    smallest_labels = None
+    for transposed, rows, order, relabel, next_label, row in extended:
+        if relabel is None:
+            relabel = [0] * (len(grids[0]) + 1)
+            next_label = _labels(grids[transposed][rows[0]], orders[order], relabel, next_label)[1]
+        else:
+            relabel = relabel[:]
+        labels, next_label = _labels(grids[transposed][row], orders[order], relabel, next_label)
+        if smallest_labels is None or labels < smallest_labels:
+            smallest_labels = labels
+            kept = []
+        if labels == smallest_labels:
+            kept.append((transposed, rows + (row,), order, relabel, next_label))
+    return kept
+
+
+def _row_choices(rows: tuple[int, ...], n: int, row_ids: list[int] = None) -> list[int]:
+    """
+    Returns the rows that can come next: the rest of the current band, or any row of a band not used yet.
+    Given the ids of the rows, only the first of the rows of a band that are identical is returned.
+    """
+    if len(rows) % n:
+        band = rows[-1] // n
+        choices = [row for row in range(band * n, band * n + n) if row not in rows]
+    else:
+        used_bands = {row // n for row in rows}
+        choices = [row for row in range(n * n) if row // n not in used_bands]
+    if row_ids is None:
+        return choices
+    return [row for row in choices
+            if not any(row_ids[other] == row_ids[row] and other // n == row // n for other in choices if other < row)]
+
+
+def _labels(line: list[int], order: tuple[int, ...], relabel: list[int],
+            next_label: int) -> tuple[tuple[int, ...], int]:
+    """
+    Relabels a row read in a column order, giving digits not seen before the next labels in turn.
+    :return: The labels of the row, and the next label to give out.
+    """
+    labels = []
+    for column in order:
+        num = line[column]
+        if num and not relabel[num]:
+            relabel[num] = next_label
+            next_label += 1
+        labels.append(relabel[num])
+    return tuple(labels), next_label
+
+
+def _merge(candidates: list, grids: tuple, orders: list, n: int) -> list:
+    """
+    Keeps one candidate for every set of rows left to choose. Candidates that would see the same rows from here on,
+    with the same labels, can only go on to the same boards.
+    """
+    merged = {}
+    for candidate in candidates:
+        transposed, rows, order, relabel, next_label = candidate
+        grid, columns = grids[transposed], orders[order]
+        band = tuple(sorted(_relabeled(grid[row], columns, relabel) for row in _row_choices(rows, n))
+                     if len(rows) % n else ())
+        used_bands = {row // n for row in rows}
+        bands = tuple(sorted(tuple(sorted(_relabeled(grid[row], columns, relabel) for row in range(start, start + n)))
+                             for start in range(0, n * n, n) if start // n not in used_bands))
+        merged.setdefault((band, bands, next_label), candidate)
+    return list(merged.values())
+
+
+def _relabeled(line: list[int], columns: tuple[int, ...], relabel: list[int]) -> tuple[int, ...]:
+    """ Reads a row in a column order, with the labels of digits seen so far, and the rest negated. """
+    return tuple(relabel[line[column]] or -line[column] for column in columns)
+
+
+def _tables_for(n: int) -> tuple[list, list, list]:
+    """
+    Builds the tables for boards of a subgrid size, once per size:
+    every order of the lines that keeps each band together, the clue pattern of every row mask read in each order,
+    and for every row mask, the orders that give it the smallest pattern.
+    A pattern has a bit for each cell, with the first cell the highest bit, so a smaller pattern has its blanks first.
+    """
+    if n not in _tables:
+        size = n * n
+        orders = [tuple(band * n + line for band, lines in zip(bands, inner) for line in lines)
+                  for bands in permutations(range(n))
+                  for inner in product(list(permutations(range(n))), repeat=n)]
+        pattern_tables = []
+        for order in orders:
+            bits = [0] * size
+            for position, column in enumerate(order):
+                bits[column] = 1 << (size - 1 - position)
+            table = [0] * (1 << size)
+            for mask in range(1, 1 << size):
+                lowest = mask & -mask
+                table[mask] = table[mask ^ lowest] + bits[lowest.bit_length() - 1]
+            pattern_tables.append(table)
+        best_orders = []
+        for patterns in zip(*pattern_tables):
+            smallest = min(patterns)
+            best_orders.append([index for index, pattern in enumerate(patterns) if pattern == smallest])
+        _tables[n] = (orders, pattern_tables, best_orders)
+    return _tables[n]
@@ -0,0 +1,334 @@
+from typing import Callable, Optional
+
+from core.cancellation import CHECK_INTERVAL, CancellationToken, StopReason, check_stop
+from core.geometry import CLASSIC, BoardGeometry
+from core.stats import SolverStats
+
+
+class ExactCoverSolver:
+    """
+    Exact cover solver for sudoku, using Knuth's Dancing Links (Algorithm X).
+    On a 9x9 board, each of the 729 possible placements is a row that covers 4 of the 324 constraints, and a solution
+    is a set of rows that covers every constraint exactly once. Boards are flat lists of values in row major order,
+    with 0 for blank cells.
+
+    The node pool is built once for the size of board given, and reused: the givens are covered before searching and
+    uncovered afterwards, which leaves every link exactly as it was for the next puzzle.
+    """
+
+    def __init__(self, on_stats: Callable[[SolverStats], None] = None, geometry: BoardGeometry = CLASSIC):
+        self.geometry = geometry  # The size of board the matrix is built for
+        self._size = geometry.size
+        self._cell_count = geometry.cell_count
+        self._column_count = 4 * geometry.cell_count  # Cell, row-digit, column-digit and subgrid-digit constraints
+        self._row_count = geometry.cell_count * geometry.size  # One row for every digit in every cell
+        self.stats = SolverStats()  # Filled in by every solve and check
+        self.on_stats = on_stats  # Called with the stats at the end of every solve and check
+        self.stop_reason = StopReason.COMPLETED  # Why the last solve or check stopped
+        self._deadline = None  # Deadline of the solve or check in progress
+        self._cancel_token = None  # Cancellation token of the solve or check in progress
+        self._next_check = 0  # Node count to check the deadline and token at next
+        self._build_matrix()
+
+    def solve(self, values: list[int], deadline: float = None, cancel_token: CancellationToken = None) -> bool:
+        """
+        Fills the blank cells of the board with a solution.
+        :param values: The board to solve in place
+        :param deadline: A time from deadline_in to give up at
+        :param cancel_token: A token that can be cancelled to give up early
+        :return: Returns true if it was able to solve the board. Check stop_reason to know why it wasn't.
+        """
+        solutions = []
+        if not self.count_solutions(values, 1, solutions, deadline, cancel_token):
+            return False
+        values[:] = solutions[0]
+        return True
+
+    def count_solutions(self, values: list[int], limit: int = 2, solutions: list[list[int]] = None,
+                        deadline: float = None, cancel_token: CancellationToken = None) -> int:
+        """
+        Counts the solutions of the board, stopping once limit of them are found. The board is not changed.
+        :param values: The board to search
+        :param limit: The number of solutions to stop at. 2 is enough to tell if the solution is unique
+        :param solutions: If given, the values of each solution found are appended to it
+        :return: The number of solutions found, at most limit. Check stop_reason to know if it is exact.
+        """
+        self._begin(deadline, cancel_token)
+        count = 0
+        selected = self._select_givens(values)
+        if selected is not None:
+            with self.stats.phase('search'):
+                count = self._search(limit, selected[:], solutions)
+            self._deselect(selected)
+        self.stats.solution_count = count
+        self._report_stats()
+        return count
+
+    def is_consistent(self, values: list[int]) -> bool:
+        """ Returns true if no two givens on the board share a row, column or subgrid. """
+        selected = self._select_givens(values)
+        if selected is None:
+            return False
+        self._deselect(selected)
+        return True
+
+    def has_other_solution(self, values: list[int], solution: list[int], cells: list[int] = None,
+                           deadline: float = None, cancel_token: CancellationToken = None) -> bool:
+        """
+        Checks whether the board has a solution other than a known one.
+        Each blank cell is searched in turn with its known digit hidden from the matrix. If the board was unique
+        before some cells were removed, another solution has to differ in one of them, so only those need to be passed.
+        :param values: The board to check
+        :param solution: The values of the known solution
+        :param cells: The indices of the cells to search, defaulting to every blank cell
+        :return: Returns true if another solution exists, or if the search stopped early before knowing.
+        """
+        self._begin(deadline, cancel_token)
+        selected = self._select_givens(values)
+        if selected is None:
+            self._report_stats()
+            return False
+
+        if cells is None:
+            cells = [index for index, value in enumerate(values) if not value]
+
+        found = False
+        with self.stats.phase('search'):
+            for index in cells:
+                if values[index]:
+                    continue
+                known_row = index * self._size + solution[index] - 1
+                self._hide_row(known_row)
+                found = self._search(1, [], None) > 0 or self.stop_reason is not StopReason.COMPLETED
+                self._unhide_row(known_row)
+                if found:
+                    break
+
+        self._deselect(selected)
+        self.stats.solution_count = int(found)
+        self._report_stats()
+        return found
+
+    def _begin(self, deadline: Optional[float], cancel_token: Optional[CancellationToken]):
+        """ Resets the stats and stop reason, and keeps the limits, for a new solve or check. """
+        self.stats = SolverStats()
+        self.stop_reason = StopReason.COMPLETED
+        self._deadline = deadline
+        self._cancel_token = cancel_token
+        self._next_check = 0 if deadline is not None or cancel_token is not None else float('inf')
+
+    def _report_stats(self):
+        """ Passes the stats of the solve or check that just finished to the stats hook. """
+        if self.on_stats is not None:
+            self.on_stats(self.stats)
+
+    def _select_givens(self, values: list[int]) -> Optional[list[int]]:
+        """
+        Covers the constraints of every given.
+        :return: The rows that were selected, or None if two givens conflict. Nothing is left covered on a conflict.
+        """
+        if len(values) != self._cell_count:
+            raise ValueError(f'Expected {self._cell_count} values for a {self.geometry} board, got {len(values)}')
+        selected = []
+        covered = set()
+        size = self._size
+        for row in (index * size + num - 1 for index, num in enumerate(values) if num):
+            columns = self._row_columns[row]
+            if any(column in covered for column in columns):
+                self._deselect(selected)
+                return None
+            covered.update(columns)
+            self._select(row)
+            selected.append(row)
+        return selected
+
+    def _search(self, limit: int, partial: list[int], solutions: Optional[list[list[int]]], depth: int = 0) -> int:
+        """
+        Recursively searches with Algorithm X, always branching on the column with the fewest rows.
+        :param limit: Stop once this many solutions are found
+        :param partial: The rows selected so far
+        :param solutions: If not None, the values of each solution found are appended to it
+        :param depth: The number of rows the search has chosen, not counting the givens
+        :return: The number of solutions found, at most limit.
+        """
+        right, down, size, stats = self._right, self._down, self._column_sizes, self.stats
+
+        column = right[0]
+        if column == 0:
+            if solutions is not None:
+                solutions.append(self._rows_to_values(partial))
+            return 1
+
+        # Choose the column with the fewest remaining rows
+        best, best_size = column, size[column]
+        while column != 0 and best_size > 1:
+            if size[column] < best_size:
+                best, best_size = column, size[column]
+            column = right[column]
+        stats.node_count += 1
+        if stats.node_count >= self._next_check:
+            # The links are only restored if the search unwinds normally, so stopping just ends every loop early
+            reason = check_stop(self._deadline, self._cancel_token)
+            if reason is not None:
+                self.stop_reason = reason
+                self._next_check = float('inf')
+                return 0
+            self._next_check = stats.node_count + CHECK_INTERVAL
+        if best_size == 0:
+            stats.add_dead_end(depth)
+            return 0
+
+        count = 0
+        self._cover(best)
+        node = down[best]
+        while node != best and count < limit and self.stop_reason is StopReason.COMPLETED:
+            partial.append(self._node_row[node])
+            stats.candidates_tested += 1
+            neighbour = right[node]
+            while neighbour != node:
+                self._cover(self._node_column[neighbour])
+                neighbour = right[neighbour]
+
+            count += self._search(limit - count, partial, solutions, depth + 1)
+
+            neighbour = self._left[node]
+            while neighbour != node:
+                self._uncover(self._node_column[neighbour])
+                neighbour = self._left[neighbour]
+            partial.pop()
+            node = down[node]
+        self._uncover(best)
+        if count == 0:
+            stats.backtrack_count += 1  # Every row of the column failed
+        return count
+
+    def _select(self, row: int):
+        """ Covers every column of a row, as if the row had been chosen by the search. """
+        for column in self._row_columns[row]:
+            self._cover(column)
+
+    def _deselect(self, rows: list[int]):
+        """ Uncovers the columns of the selected rows, in the reverse order they were covered. """
+        for row in reversed(rows):
+            for column in reversed(self._row_columns[row]):
+                self._uncover(column)
+        rows.clear()
+
+    def _hide_row(self, row: int):
+        """ Removes a row from its columns, so the search can't choose it. """
+        up, down, size = self._up, self._down, self._column_sizes
+        for node in self._row_nodes(row):
+            down[up[node]] = down[node]
+            up[down[node]] = up[node]
+            size[self._node_column[node]] -= 1
+
+    def _unhide_row(self, row: int):
+        """ Restores a row removed by _hide_row. """
+        up, down, size = self._up, self._down, self._column_sizes
+        for node in reversed(self._row_nodes(row)):
+            down[up[node]] = node
+            up[down[node]] = node
+            size[self._node_column[node]] += 1
+
+    def _row_nodes(self, row: int) -> range:
+        """ Returns the nodes of a row. """
+        first = 1 + self._column_count + row * 4
+        return range(first, first + 4)
+
+    def _cover(self, column: int):
+        """ Removes a column from the header list, and all rows that use it from the other columns. """
+        left, right, up, down, size, node_column = \
+            self._left, self._right, self._up, self._down, self._column_sizes, self._node_column
+        right[left[column]] = right[column]
+        left[right[column]] = left[column]
+        node = down[column]
+        while node != column:
+            neighbour = right[node]
+            while neighbour != node:
+                down[up[neighbour]] = down[neighbour]
+                up[down[neighbour]] = up[neighbour]
+                size[node_column[neighbour]] -= 1
+                neighbour = right[neighbour]
+            node = down[node]
+
+    def _uncover(self, column: int):
+        """ Restores a column removed by _cover. Must be called in the reverse order of the covers. """
+        left, right, up, down, size, node_column = \
+            self._left, self._right, self._up, self._down, self._column_sizes, self._node_column
+        node = up[column]
+        while node != column:
+            neighbour = left[node]
+            while neighbour != node:
+                size[node_column[neighbour]] += 1
+                down[up[neighbour]] = neighbour
+                up[down[neighbour]] = neighbour
+                neighbour = left[neighbour]
+            node = up[node]
+        right[left[column]] = column
+        left[right[column]] = column
+
+    def _build_matrix(self):
+        """
+        Builds the node pool for the sudoku constraint matrix.
+        Node 0 is the root, the next 4 nodes per cell are the column headers (324 of them on a 9x9 board) and each row
+        adds 4 more nodes.
+        """
+        column_count = self._column_count
+        node_total = 1 + column_count + self._row_count * 4
+        self._left = [0] * node_total
+        self._right = [0] * node_total
+        self._up = list(range(node_total))
+        self._down = list(range(node_total))
+        self._node_column = [0] * node_total
+        self._node_row = [-1] * node_total
+        self._column_sizes = [0] * (1 + column_count)
+        self._row_columns = []
+
+        # Link the headers in a circle with the root
+        for column in range(1 + column_count):
+            self._left[column] = column - 1 if column > 0 else column_count
+            self._right[column] = column + 1 if column < column_count else 0
+
+        node = 1 + column_count
+        for row in range(self._row_count):
+            columns = self._constraint_columns(*self._decode_row(row))
+            self._row_columns.append(columns)
+            first = node
+            for i, column in enumerate(columns):
+                # Insert at the bottom of the column
+                self._node_column[node] = column
+                self._node_row[node] = row
+                self._up[node] = self._up[column]
+                self._down[node] = column
+                self._down[self._up[column]] = node
+                self._up[column] = node
+                self._column_sizes[column] += 1
+
+                # Link to the other nodes in the row
+                self._left[node] = node - 1 if i > 0 else first + len(columns) - 1
+                self._right[node] = node + 1 if i < len(columns) - 1 else first
+                node += 1
+
+    def _constraint_columns(self, x: int, y: int, num: int) -> tuple[int, int, int, int]:
+        """ Returns the header nodes of the 4 constraints satisfied by placing num at (x, y). """
+        size, cell_count = self._size, self._cell_count
+        subgrid = self.geometry.subgrid_index(x, y)
+        digit = num - 1
+        return (1 + x * size + y,
+                1 + cell_count + x * size + digit,
+                1 + 2 * cell_count + y * size + digit,
+                1 + 3 * cell_count + subgrid * size + digit)
+
+    def _rows_to_values(self, rows: list[int]) -> list[int]:
+        """ Converts the rows of a solution to a flat list of values. """
+        values = [0] * self._cell_count
+        for row in rows:
+            cell, digit = divmod(row, self._size)
+            values[cell] = digit + 1
+        return values
+
+    def _decode_row(self, row: int) -> tuple[int, int, int]:
+        """ Returns the x, y and digit of the placement a matrix row represents. """
+        cell, digit = divmod(row, self._size)
+        x, y = divmod(cell, self._size)
+        return x, y, digit + 1
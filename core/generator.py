@@ -0,0 +1,156 @@
+import random
+from typing import Callable, Optional, Protocol
+
+from core.cancellation import CancellationToken
+from core.exact_cover import ExactCoverSolver
+from core.full_grid import FullGridGenerator
+from core.geometry import CLASSIC, BoardGeometry
+from core.grid import BitmaskGrid
+from core.solver import CellOrder, GridSolver
+from core.stats import SolverStats
+from core.transposition import TranspositionCache
+from utils.constants import BOARD_SIZE
+
+
+class UniquenessSolver(Protocol):
+    """
+    What PuzzleGenerator needs from a uniqueness solver, such as ExactCoverSolver, ParallelSolver, or the
+    DancingLinksSolver and ParallelUniquenessSolver adapters of a board controller.
+    """
+    stats: SolverStats  # The stats of the last check, merged into the generator's
+
+    def has_other_solution(self, values: list[int], solution: list[int], cells: list[int] = None,
+                           deadline: float = None, cancel_token: CancellationToken = None) -> bool:
+        """ Checks whether a flat board has a solution other than a known one, differing in one of the cells. """
+
+
+class GeneratedPuzzle:
+    """ A puzzle made by PuzzleGenerator. Boards are flat lists of values in row major order, with 0 for blanks. """
+
+    def __init__(self, givens: list[int], solution: list[int], removed: list[int]):
+        self.givens = givens
+        self.solution = solution
+        self.removed = removed  # Indices of the removed cells, in the order they were removed
+
+    def clue_count(self) -> int:
+        """ Returns the number of givens left in the puzzle. """
+        return sum(1 for num in self.givens if num)
+
+
+class PuzzleGenerator:
+    """
+    Generates sudoku puzzles with a unique solution, without needing a board controller.
+    A FullGridGenerator makes a solved grid, then groups of 4 symmetrical cells are removed in a random order. Each
+    removal is kept only if no other solution differs in the removed cells. Larger boards, such as 16x16, are
+    generated by passing their geometry.
+
+    Given a TranspositionCache, each removal is checked by counting the solutions of the propagated board instead of
+    with the uniqueness solver. Consecutive boards only differ by one group of cells, so most of each count is
+    answered by states the earlier counts already finished. The cache can be shared between generators.
+
+    All the randomness comes from one random.Random, so a seed always gives the same puzzle. Generating with a seed
+    per puzzle makes puzzles addressable by their seed, and keeps workers in a pool from sharing any random state.
+    """
+
+    def __init__(self, target_count=40, max_iterations=1000, uniqueness_solver: UniquenessSolver = None,
+                 on_stats: Callable[[SolverStats], None] = None, rng: random.Random = None,
+                 geometry: BoardGeometry = CLASSIC, cache: TranspositionCache = None):
+        self.target_count = target_count  # Number of cells to remove. Higher the count, harder the difficulty
+        self.max_iterations = max_iterations  # Most removals to try before giving up on the target
+        self.rng = random if rng is None else rng  # Used when generate isn't given a seed
+        self.geometry = geometry  # The size of board to generate
+        self.filler = FullGridGenerator(geometry, self.rng)  # Makes the solved grids the puzzles are cut from
+        if uniqueness_solver is None and cache is None:
+            uniqueness_solver = ExactCoverSolver(geometry=geometry)
+        self.uniqueness_solver = uniqueness_solver  # Checks removals when there is no cache. None if there is one
+        self.cache = cache  # If given, removals are checked by counting with a cached search
+        self.counter = None if cache is None else GridSolver(CellOrder.MINIMUM_REMAINING_VALUES, None, cache=cache)
+        self.stats = SolverStats()  # Every search of the last puzzle generated, with fill and remove phases
+        self.on_stats = on_stats  # Called with the stats after every puzzle generated
+
+    def generate(self, seed: Optional[int] = None) -> GeneratedPuzzle:
+        """
+        Fills a grid, then removes cells while the puzzle stays unique.
+        :param seed: If given, the puzzle only depends on the seed and the settings of the generator
+        """
+        rng = self.rng if seed is None else random.Random(seed)
+        self.stats = SolverStats()
+        with self.stats.phase('fill'):
+            solution = self.fill(None if seed is None else rng)
+        with self.stats.phase('remove'):
+            givens, removed = self.remove_numbers(solution, rng)
+
+        if self.on_stats is not None:
+            self.on_stats(self.stats)
+        return GeneratedPuzzle(givens, solution, removed)
+
+    def fill(self, rng: random.Random = None) -> list[int]:
+        """
+        Returns the values of a randomly filled grid.
+        :param rng: If given, a new base grid is searched with it, so the grid only depends on rng. Otherwise the
+                    filler may transform a base it searched for an earlier grid
+        """
+        solution = self.filler.generate(rng, new_base=rng is not None)
+        self.stats.merge(self.filler.stats)
+        return solution
+
+    def remove_numbers(self, solution: list[int], rng: random.Random = None) -> tuple[list[int], list[int]]:
+        """
+        Randomly removes symmetrical groups of cells from a solved grid.
+        :param solution: The values of a solved grid
+        :param rng: Picks the order cells are removed in, defaulting to the generator's own
+        :return: The values left after removing, and the indices of the removed cells.
+        """
+        rng = self.rng if rng is None else rng
+        givens = solution[:]
+        removed = []
+        number_cells_to_remove = self.target_count
+
+        all_cells = list(range(self.geometry.cell_count))
+        rng.shuffle(all_cells)
+
+        iterations = 0
+        while number_cells_to_remove > 0 and iterations < self.max_iterations and all_cells:
+            iterations += 1
+            index = all_cells.pop()
+            if not givens[index]:
+                continue
+
+            sym_cells = [cell for cell in self.symmetrical_cells(index, self.geometry.size) if givens[cell]]
+            for cell in sym_cells:
+                givens[cell] = 0
+
+            if self._has_other_solution(givens, solution, sym_cells):
+                for cell in sym_cells:
+                    givens[cell] = solution[cell]
+            else:
+                number_cells_to_remove -= len(sym_cells)
+                removed.extend(sym_cells)
+        return givens, removed
+
+    def _has_other_solution(self, givens: list[int], solution: list[int], removed: list[int]) -> bool:
+        """ Checks whether the puzzle has a solution other than the one it was made from, after some removals. """
+        if self.counter is None:
+            # The puzzle was unique before the removal, so another solution has to differ in a removed cell
+            found = self.uniqueness_solver.has_other_solution(givens, solution, removed)
+            self.stats.merge(self.uniqueness_solver.stats)
+            return found
+
+        grid = BitmaskGrid.from_values(givens)
+        grid.propagate()  # Givens taken from a solution never conflict
+        count = self.counter.count_solutions(grid, 2)
+        self.stats.merge(self.counter.stats)
+        return count > 1
+
+    @staticmethod
+    def symmetrical_cells(index: int, size=BOARD_SIZE) -> list[int]:
+        """
+        Gets the cells that are 4 way symmetrical with a cell. Cells on a middle line appear more than once.
+        :param index: The flat index of the cell
+        :param size: The number of cells in each row of the board
+        :return: The flat indices of the cell and its 3 reflections, without duplicates.
+        """
+        x, y = divmod(index, size)
+        mirror_x, mirror_y = size - 1 - x, size - 1 - y
+        reflections = [(x, y), (mirror_x, y), (x, mirror_y), (mirror_x, mirror_y)]
+        return list(dict.fromkeys(rx * size + ry for rx, ry in reflections))
@@ -0,0 +1,83 @@
+from math import isqrt
+from typing import Optional
+
+from utils.constants import DIGIT_SYMBOLS, SUBGRID_SIZE
+
+
+class BoardGeometry:
+    """
+    The shape of a board made of subgrid_size x subgrid_size subgrids, such as 9x9, 16x16 or 25x25.
+    Holds the lookup tables the solvers use in their inner loops: the row, column and subgrid of every cell, and the
+    cells of every house. The tables are built once per size and shared, so use BoardGeometry.of to get one.
+    """
+    _cache = {}
+
+    def __init__(self, subgrid_size: int):
+        if not 2 <= subgrid_size <= isqrt(len(DIGIT_SYMBOLS)):
+            raise ValueError(f'Unsupported subgrid size: {subgrid_size}')
+        size = subgrid_size * subgrid_size
+        self.subgrid_size = subgrid_size
+        self.size = size  # Cells in each row, column and subgrid, and the number of digits
+        self.cell_count = size * size
+        self.all_digits = (1 << size) - 1  # Mask with a bit set for every digit
+
+        # The row, column and subgrid of every cell, by flat index
+        self.cell_row = [index // size for index in range(self.cell_count)]
+        self.cell_column = [index % size for index in range(self.cell_count)]
+        self.cell_subgrid = [(index // size // subgrid_size) * subgrid_size + index % size // subgrid_size
+                             for index in range(self.cell_count)]
+
+        # The cells of every row, column and subgrid, as (x, y)
+        self.houses = [[(x, y) for y in range(size)] for x in range(size)] + \
+                      [[(x, y) for x in range(size)] for y in range(size)] + \
+                      [[(start_x + i, start_y + j) for i in range(subgrid_size) for j in range(subgrid_size)]
+                       for start_x in range(0, size, subgrid_size) for start_y in range(0, size, subgrid_size)]
+
+        # The other cells that share a row, column or subgrid with every cell, by flat index
+        peers = [set() for _ in range(self.cell_count)]
+        for house in self.houses:
+            indices = [x * size + y for x, y in house]
+            for index in indices:
+                peers[index].update(indices)
+        self.peers = [sorted(cells - {index}) for index, cells in enumerate(peers)]
+
+    @classmethod
+    def of(cls, subgrid_size: int = SUBGRID_SIZE) -> 'BoardGeometry':
+        """ Returns the shared geometry for a subgrid size. """
+        if subgrid_size not in cls._cache:
+            cls._cache[subgrid_size] = cls(subgrid_size)
+        return cls._cache[subgrid_size]
+
+    @classmethod
+    def for_cell_count(cls, cell_count: int) -> Optional['BoardGeometry']:
+        """ Returns the geometry of a board with the given number of cells, or None if no board has that many. """
+        subgrid_size = isqrt(isqrt(cell_count))
+        if subgrid_size ** 4 != cell_count:
+            return None
+        try:
+            return cls.of(subgrid_size)
+        except ValueError:
+            return None
+
+    def subgrid_index(self, x: int, y: int) -> int:
+        """ Returns the index of the subgrid that contains the cell at (x, y). """
+        return (x // self.subgrid_size) * self.subgrid_size + y // self.subgrid_size
+
+    def __repr__(self):
+        return f'BoardGeometry({self.size}x{self.size})'
+
+
+CLASSIC = BoardGeometry.of(SUBGRID_SIZE)  # The standard 9x9 board
+
+
+def digit_symbol(num: int) -> str:
+    """ Returns the character shown for a digit: 1 to 9, then A for 10, B for 11 and so on. """
+    return DIGIT_SYMBOLS[num - 1]
+
+
+def symbol_digit(char: str) -> Optional[int]:
+    """ Returns the digit a character stands for, or None if it isn't a digit symbol. Letters may be lower case. """
+    if len(char) != 1:
+        return None
+    index = DIGIT_SYMBOLS.find(char.upper())
+    return index + 1 if index >= 0 else None
@@ -0,0 +1,250 @@
+from typing import Optional
+
+from core.geometry import CLASSIC, BoardGeometry, digit_symbol, symbol_digit
+from utils.constants import SUBGRID_SIZE
+
+# Tables of the standard 9x9 board, for code that only handles that size. See BoardGeometry for other sizes
+ALL_DIGITS = CLASSIC.all_digits  # Mask with a bit set for every digit
+CELL_ROW = CLASSIC.cell_row  # The row, column and subgrid of every cell, by flat index
+CELL_COLUMN = CLASSIC.cell_column
+CELL_SUBGRID = CLASSIC.cell_subgrid
+HOUSES = CLASSIC.houses  # The cells of every row, column and subgrid, used to look for hidden singles
+
+
+def digit_bit(num: int) -> int:
+    """ Returns the mask bit used for a digit. Digit 1 is the lowest bit. """
+    return 1 << (num - 1)
+
+
+def mask_digits(mask: int) -> list[int]:
+    """ Returns the digits that are set in a mask, in ascending order. """
+    return [num for num in range(1, mask.bit_length() + 1) if mask & (1 << (num - 1))]
+
+
+def parse_puzzle(line: str) -> Optional[list[int]]:
+    """
+    Parses a puzzle written as one line of digits in row major order.
+    The size of the board comes from the length of the line, so 81 characters are a 9x9 board and 256 a 16x16 one.
+    Digits above 9 are written as letters, starting with A for 10.
+    :param line: The puzzle, with 0 or . for blank cells. Surrounding whitespace is ignored
+    :return: The values as a flat list with 0 for blanks, or None if the line is not a puzzle.
+    """
+    line = line.strip()
+    geometry = BoardGeometry.for_cell_count(len(line))
+    if geometry is None:
+        return None
+    values = []
+    for char in line:
+        if char == '.' or char == '0':
+            values.append(0)
+            continue
+        num = symbol_digit(char)
+        if num is None or num > geometry.size:
+            return None
+        values.append(num)
+    return values
+
+
+def format_puzzle(values: list[int]) -> str:
+    """ Writes a flat list of values as one line of digits, with 0 for blank cells. """
+    return ''.join(digit_symbol(num) if num else '0' for num in values)
+
+
+class BitmaskGrid:
+    """
+    Compact representation of the board used by the solvers.
+    Values are kept in a flat list, with 0 meaning blank. Each row, column and subgrid keeps a mask of the digits
+    already placed in it, one bit per digit, so checking whether a digit fits in a cell is a single bit operation
+    instead of building and scanning the house of the cell. Python ints have no width limit, so the same masks work
+    for the 16 and 25 digits of larger boards.
+    """
+    def __init__(self, geometry: BoardGeometry = CLASSIC):
+        self.geometry = geometry
+        self.size = geometry.size
+        self.subgrid_size = geometry.subgrid_size
+        self.values = [0] * geometry.cell_count
+        self.rows = [0] * geometry.size
+        self.columns = [0] * geometry.size
+        self.subgrids = [0] * geometry.size
+
+    @classmethod
+    def from_rows(cls, rows: list[list[int]]) -> 'BitmaskGrid':
+        """
+        Creates a grid from a 2d list of values. The size of the board comes from the number of rows.
+        :param rows: The values of the board, where None or 0 are blank cells.
+        """
+        grid = cls(cls._geometry_for(len(rows) ** 2))
+        for x in range(grid.size):
+            for y in range(grid.size):
+                if rows[x][y]:
+                    grid.place(x, y, rows[x][y])
+        return grid
+
+    @classmethod
+    def from_values(cls, values: list[int]) -> 'BitmaskGrid':
+        """
+        Creates a grid from a flat list of values in row major order. The size of the board comes from the length.
+        :param values: The values of the board, where None or 0 are blank cells.
+        """
+        grid = cls(cls._geometry_for(len(values)))
+        for index, num in enumerate(values):
+            if num:
+                grid.place(*divmod(index, grid.size), num)
+        return grid
+
+    @classmethod
+    def from_givens(cls, values: list[int]) -> Optional['BitmaskGrid']:
+        """
+        Creates a grid from a flat list of values, checking that no two givens share a row, column or subgrid.
+        :param values: The values of the board, where None or 0 are blank cells.
+        :return: The grid, or None if two givens conflict.
+        """
+        grid = cls(cls._geometry_for(len(values)))
+        for index, num in enumerate(values):
+            if not num:
+                continue
+            x, y = divmod(index, grid.size)
+            if not grid.can_place(x, y, num):
+                return None
+            grid.place(x, y, num)
+        return grid
+
+    @staticmethod
+    def _geometry_for(cell_count: int) -> BoardGeometry:
+        """ Returns the geometry of a board with the given number of cells, raising a ValueError if there is none. """
+        geometry = BoardGeometry.for_cell_count(cell_count)
+        if geometry is None:
+            raise ValueError(f'No board has {cell_count} cells')
+        return geometry
+
+    def to_rows(self) -> list[list[int]]:
+        """ Returns the values as a 2d list, with 0 for blank cells. """
+        size = self.size
+        return [self.values[x * size:(x + 1) * size] for x in range(size)]
+
+    def copy(self) -> 'BitmaskGrid':
+        """ Returns an independent copy of the grid. """
+        grid = BitmaskGrid(self.geometry)
+        grid.values = self.values[:]
+        grid.rows = self.rows[:]
+        grid.columns = self.columns[:]
+        grid.subgrids = self.subgrids[:]
+        return grid
+
+    @staticmethod
+    def subgrid_index(x: int, y: int, subgrid_size=SUBGRID_SIZE) -> int:
+        """ Returns the index of the subgrid that contains the cell at (x, y), on a board of the given subgrid size. """
+        return (x // subgrid_size) * subgrid_size + y // subgrid_size
+
+    def get(self, x: int, y: int) -> int:
+        """ Returns the value at (x, y), or 0 if the cell is blank. """
+        return self.values[x * self.size + y]
+
+    def is_blank(self, x: int, y: int) -> bool:
+        """ Returns true if the cell at (x, y) has no value. """
+        return self.values[x * self.size + y] == 0
+
+    def candidates(self, x: int, y: int) -> int:
+        """ Returns a mask of the digits that are not yet used in the house of the cell at (x, y). """
+        n = self.subgrid_size
+        used = self.rows[x] | self.columns[y] | self.subgrids[(x // n) * n + y // n]
+        return ~used & self.geometry.all_digits
+
+    def can_place(self, x: int, y: int, num: int) -> bool:
+        """ Returns true if num is not yet used in the row, column or subgrid of the cell at (x, y). """
+        return self.candidates(x, y) & (1 << (num - 1)) != 0
+
+    def most_constrained_cell(self) -> Optional[tuple[int, int, int]]:
+        """
+        Finds the blank cell with the fewest candidates, stopping early if a cell has none left.
+        :return: The x, y and candidate mask of the cell, or None if the grid has no blank cells.
+        """
+        best = None
+        best_count = self.size + 1
+        values, size = self.values, self.size
+        for index in range(len(values)):
+            if values[index]:
+                continue
+            x, y = divmod(index, size)
+            candidates = self.candidates(x, y)
+            count = candidates.bit_count()
+            if count < best_count:
+                best, best_count = (x, y, candidates), count
+                if count <= 1:
+                    break  # Can't do better than a forced cell or a dead end
+        return best
+
+    def propagate(self) -> Optional[list[tuple[int, int]]]:
+        """
+        Fills in forced cells until nothing else is forced.
+        A naked single is a blank cell with only one candidate, and a hidden single is a digit that only fits in one
+        cell of a row, column or subgrid.
+        :return: The cells that were filled, in the order they were filled, or None if the grid has a contradiction.
+                 On a contradiction the cells filled so far are left in place.
+        """
+        size, all_digits = self.size, self.geometry.all_digits
+        filled = []
+        changed = True
+        while changed:
+            changed = False
+
+            # Naked singles
+            for index in range(len(self.values)):
+                if self.values[index]:
+                    continue
+                x, y = divmod(index, size)
+                candidates = self.candidates(x, y)
+                if not candidates:
+                    return None
+                if candidates & (candidates - 1) == 0:
+                    self.place(x, y, candidates.bit_length())
+                    filled.append((x, y))
+                    changed = True
+
+            # Hidden singles
+            for house in self.geometry.houses:
+                seen_once = seen_twice = placed = 0
+                for x, y in house:
+                    num = self.values[x * size + y]
+                    if num:
+                        placed |= 1 << (num - 1)
+                        continue
+                    candidates = self.candidates(x, y)
+                    seen_twice |= seen_once & candidates
+                    seen_once |= candidates
+                if all_digits & ~(seen_once | placed):
+                    return None  # A digit has nowhere left to go in this house
+
+                hidden = seen_once & ~seen_twice
+                if not hidden:
+                    continue
+                bit = hidden & -hidden
+                for x, y in house:
+                    if self.values[x * size + y] == 0 and self.candidates(x, y) & bit:
+                        self.place(x, y, bit.bit_length())
+                        filled.append((x, y))
+                        changed = True
+                        break
+        return filled
+
+    def place(self, x: int, y: int, num: int):
+        """ Sets the value of a cell and marks the digit as used in its row, column and subgrid. """
+        n = self.subgrid_size
+        bit = 1 << (num - 1)
+        self.values[x * self.size + y] = num
+        self.rows[x] |= bit
+        self.columns[y] |= bit
+        self.subgrids[(x // n) * n + y // n] |= bit
+
+    def remove(self, x: int, y: int):
+        """ Clears the value of a cell and frees its digit in the row, column and subgrid. """
+        index = x * self.size + y
+        num = self.values[index]
+        if num == 0:
+            return
+        n = self.subgrid_size
+        bit = ~(1 << (num - 1))
+        self.values[index] = 0
+        self.rows[x] &= bit
+        self.columns[y] &= bit
+        self.subgrids[(x // n) * n + y // n] &= bit
@@ -0,0 +1,308 @@
+from enum import Enum
+from itertools import combinations
+from typing import Optional
+
+from core.geometry import CLASSIC, BoardGeometry
+from core.grid import BitmaskGrid
+
+
+class Technique(Enum):
+    """ The techniques LogicalSolver uses, in the order it tries them, cheapest first: """
+    NAKED_SINGLE = 0  # A cell with one candidate left
+    HIDDEN_SINGLE = 1  # A digit with one cell left in a house
+    LOCKED_CANDIDATES = 2  # A digit confined to where a line crosses a subgrid is removed from the rest of both
+    NAKED_PAIR = 3  # Two cells of a house with the same two candidates, which the other cells of the house lose
+    HIDDEN_PAIR = 4  # Two digits confined to the same two cells of a house, which lose every other candidate
+    NAKED_TRIPLE = 5
+    HIDDEN_TRIPLE = 6
+    NAKED_QUAD = 7
+    HIDDEN_QUAD = 8
+    X_WING = 9  # A digit confined to the same two columns in two rows is removed from the rest of those columns
+    SWORDFISH = 10  # The same, with three rows and three columns
+    XY_WING = 11  # A cell with candidates AB, seeing cells with AC and BC, rules C out of every cell seeing both
+    JELLYFISH = 12  # The same as X-Wing, with four rows and four columns
+
+
+class LogicResult:
+    """ The result of solving a puzzle with LogicalSolver. """
+
+    def __init__(self, values: list[int], candidates: list[int], technique_counts: dict[Technique, int]):
+        self.values = values  # The board once the techniques ran out, with 0 for the cells still blank
+        self.candidates = candidates  # The candidate mask of every blank cell, or 0 for filled cells
+        self.technique_counts = technique_counts  # Steps that made progress with each technique
+
+    @property
+    def solved(self) -> bool:
+        """ Returns true if the techniques filled the whole board. """
+        return all(self.values)
+
+    @property
+    def hardest(self) -> Optional[Technique]:
+        """ Returns the hardest technique the puzzle needed, or None if it was already full. """
+        return max(self.technique_counts, key=lambda technique: technique.value, default=None)
+
+
+class LogicalSolver:
+    """
+    Solves puzzles the way a person would, without guessing.
+    Every blank cell keeps a mask of its remaining candidates, one bit per digit. Each step applies the cheapest
+    technique that places a digit or removes a candidate anywhere on the board, then starts again from the cheapest,
+    so the hardest technique used is the hardest one the puzzle needs. Solving stops once the board is full, or when
+    no technique makes progress, which leaves the rest to a search.
+
+    Every technique only removes candidates that no solution can use, so the board left behind has the same
+    solutions as the puzzle.
+    """
+
+    def __init__(self):
+        self.geometry: Optional[BoardGeometry] = None  # The size of the last board solved, set by solve
+        self._values = []
+        self._candidates = []
+        self._blank_count = 0
+        self._steps = [(Technique.NAKED_SINGLE, self._naked_singles),
+                       (Technique.HIDDEN_SINGLE, self._hidden_singles),
+                       (Technique.LOCKED_CANDIDATES, self._locked_candidates),
+                       (Technique.NAKED_PAIR, lambda: self._naked_subsets(2)),
+                       (Technique.HIDDEN_PAIR, lambda: self._hidden_subsets(2)),
+                       (Technique.NAKED_TRIPLE, lambda: self._naked_subsets(3)),
+                       (Technique.HIDDEN_TRIPLE, lambda: self._hidden_subsets(3)),
+                       (Technique.NAKED_QUAD, lambda: self._naked_subsets(4)),
+                       (Technique.HIDDEN_QUAD, lambda: self._hidden_subsets(4)),
+                       (Technique.X_WING, lambda: self._fish(2)),
+                       (Technique.SWORDFISH, lambda: self._fish(3)),
+                       (Technique.XY_WING, self._xy_wings),
+                       (Technique.JELLYFISH, lambda: self._fish(4))]
+        self._use_geometry(CLASSIC)
+
+    def solve(self, values: list[int]) -> Optional[LogicResult]:
+        """
+        Applies the techniques until the board is full or none of them makes progress.
+        :param values: The puzzle as a flat list of values in row major order, with 0 for blanks
+        :return: The result, or None if the puzzle breaks a rule, or runs into a cell with no candidates left.
+        """
+        grid = BitmaskGrid.from_givens(values)
+        if grid is None:
+            return None
+        if grid.geometry is not self.geometry:
+            self._use_geometry(grid.geometry)
+
+        size = self.geometry.size
+        self._values = grid.values
+        self._candidates = [0 if num else grid.candidates(*divmod(index, size))
+                            for index, num in enumerate(grid.values)]
+        self._blank_count = grid.values.count(0)
+        technique_counts = {}
+        while self._blank_count:
+            for technique, step in self._steps:
+                progress = step()
+                if progress is None:
+                    return None
+                if progress:
+                    technique_counts[technique] = technique_counts.get(technique, 0) + 1
+                    break
+            else:
+                break  # Stuck, as no technique made progress
+        return LogicResult(self._values, self._candidates, technique_counts)
+
+    def _use_geometry(self, geometry: BoardGeometry):
+        """ Builds the tables of flat cell indices the techniques walk, for a board of the given size. """
+        size, n = geometry.size, geometry.subgrid_size
+        self.geometry = geometry
+        self._peers = geometry.peers
+        self._peer_sets = [set(peers) for peers in geometry.peers]
+        self._houses = [[x * size + y for x, y in house] for house in geometry.houses]
+        self._lines = (self._houses[:size], self._houses[size:2 * size])  # Rows, then columns
+
+        # Every place a row or column crosses a subgrid: the cells they share, the rest of the line, and the rest of
+        # the subgrid
+        self._intersections = []
+        for subgrid in self._houses[2 * size:]:
+            top, left = geometry.cell_row[subgrid[0]], geometry.cell_column[subgrid[0]]
+            crossing = [self._houses[top + i] for i in range(n)] + [self._houses[size + left + i] for i in range(n)]
+            for line in crossing:
+                shared = set(line) & set(subgrid)
+                self._intersections.append(([index for index in line if index in shared],
+                                            [index for index in line if index not in shared],
+                                            [index for index in subgrid if index not in shared]))
+
+    def _place(self, index: int, num: int):
+        """ Fills a cell, removing the digit from the candidates of its peers. """
+        candidates = self._candidates
+        keep = ~(1 << (num - 1))
+        self._values[index] = num
+        candidates[index] = 0
+        for peer in self._peers[index]:
+            candidates[peer] &= keep
+        self._blank_count -= 1
+
+    def _eliminate(self, cells: list[int], mask: int) -> bool:
+        """ Removes the digits of mask from the candidates of the cells. Returns true if any were removed. """
+        candidates = self._candidates
+        removed = False
+        for index in cells:
+            if candidates[index] & mask:
+                candidates[index] &= ~mask
+                removed = True
+        return removed
+
+    def _naked_singles(self) -> Optional[bool]:
+        """ Fills every blank cell with one candidate left. Returns None if a blank cell has none left. """
+        values, candidates = self._values, self._candidates
+        placed = False
+        for index in range(len(values)):
+            if values[index]:
+                continue
+            mask = candidates[index]
+            if not mask:
+                return None
+            if mask & (mask - 1) == 0:
+                self._place(index, mask.bit_length())
+                placed = True
+        return placed
+
+    def _hidden_singles(self) -> bool:
+        """ Fills every cell that is the only place left for a digit in one of its houses. """
+        candidates = self._candidates
+        placed = False
+        for house in self._houses:
+            seen_once = seen_twice = 0
+            for index in house:
+                mask = candidates[index]
+                seen_twice |= seen_once & mask
+                seen_once |= mask
+            hidden = seen_once & ~seen_twice
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for index in house:
+                    if candidates[index] & bit:
+                        self._place(index, bit.bit_length())
+                        placed = True
+                        break
+        return placed
+
+    def _locked_candidates(self) -> bool:
+        """
+        Where a row or column crosses a subgrid, a digit that the subgrid only has in the shared cells can't go
+        anywhere else in the line, and one that the line only has in the shared cells can't go anywhere else in the
+        subgrid.
+        """
+        candidates = self._candidates
+        removed = False
+        for shared, line_rest, subgrid_rest in self._intersections:
+            shared_mask = 0
+            for index in shared:
+                shared_mask |= candidates[index]
+            if not shared_mask:
+                continue
+            line_mask = subgrid_mask = 0
+            for index in line_rest:
+                line_mask |= candidates[index]
+            for index in subgrid_rest:
+                subgrid_mask |= candidates[index]
+            pointing = shared_mask & line_mask & ~subgrid_mask
+            claiming = shared_mask & subgrid_mask & ~line_mask
+            if pointing:
+                removed |= self._eliminate(line_rest, pointing)
+            if claiming:
+                removed |= self._eliminate(subgrid_rest, claiming)
+        return removed
+
+    def _naked_subsets(self, size: int) -> bool:
+        """ When size cells of a house have only size candidates between them, no other cell of it can have them. """
+        candidates = self._candidates
+        removed = False
+        for house in self._houses:
+            blanks = [index for index in house if candidates[index]]
+            if len(blanks) <= size:
+                continue
+            cells = [index for index in blanks if candidates[index].bit_count() <= size]
+            for subset in combinations(cells, size):
+                mask = 0
+                for index in subset:
+                    mask |= candidates[index]
+                if mask.bit_count() == size:
+                    removed |= self._eliminate([index for index in blanks if index not in subset], mask)
+        return removed
+
+    def _hidden_subsets(self, size: int) -> bool:
+        """ When size digits only fit in size cells of a house between them, those cells can't have other digits. """
+        candidates = self._candidates
+        removed = False
+        for house in self._houses:
+            blanks = [index for index in house if candidates[index]]
+            if len(blanks) <= size:
+                continue
+            places = {}  # Each digit bit left in the house, to a mask of the blank cells it fits in
+            for position, index in enumerate(blanks):
+                mask = candidates[index]
+                while mask:
+                    bit = mask & -mask
+                    mask ^= bit
+                    places[bit] = places.get(bit, 0) | 1 << position
+            digits = [bit for bit, cells in places.items() if cells.bit_count() <= size]
+            for subset in combinations(digits, size):
+                cells = digit_mask = 0
+                for bit in subset:
+                    cells |= places[bit]
+                    digit_mask |= bit
+                if cells.bit_count() == size:
+                    subset_cells = [index for position, index in enumerate(blanks) if cells >> position & 1]
+                    removed |= self._eliminate(subset_cells, ~digit_mask & self.geometry.all_digits)
+        return removed
+
+    def _fish(self, size: int) -> bool:
+        """
+        When a digit only fits in size columns across size rows, those rows hold it in every one of the columns, so
+        the other rows can't have it there. The same goes with rows and columns the other way around. With 2 lines
+        this is an X-Wing, with 3 a Swordfish and with 4 a Jellyfish.
+        """
+        candidates = self._candidates
+        board_size = self.geometry.size
+        removed = False
+        for num in range(1, board_size + 1):
+            bit = 1 << (num - 1)
+            row_places = [0] * board_size  # Each row, to a mask of the columns the digit fits in
+            column_places = [0] * board_size
+            for index in range(len(candidates)):
+                if candidates[index] & bit:
+                    x, y = divmod(index, board_size)
+                    row_places[x] |= 1 << y
+                    column_places[y] |= 1 << x
+
+            for places, cover_lines in ((row_places, self._lines[1]), (column_places, self._lines[0])):
+                bases = [line for line in range(board_size) if 2 <= places[line].bit_count() <= size]
+                for subset in combinations(bases, size):
+                    covered = 0
+                    for line in subset:
+                        covered |= places[line]
+                    if covered.bit_count() != size:
+                        continue
+                    for cover in range(board_size):
+                        if covered >> cover & 1:
+                            # The cells of the cover line are in the order of the base lines
+                            removed |= self._eliminate([index for line, index in enumerate(cover_lines[cover])
+                                                        if line not in subset], bit)
+        return removed
+
+    def _xy_wings(self) -> bool:
+        """
+        A cell with candidates AB, seeing a cell with AC and a cell with BC, makes one of those two cells C whichever
+        of A or B it turns out to be, so any cell that sees both of them can't be C.
+        """
+        candidates = self._candidates
+        removed = False
+        for pivot in range(len(candidates)):
+            pivot_mask = candidates[pivot]
+            if pivot_mask.bit_count() != 2:
+                continue
+            wings = [peer for peer in self._peers[pivot]
+                     if candidates[peer].bit_count() == 2 and (candidates[peer] & pivot_mask).bit_count() == 1]
+            for first, second in combinations(wings, 2):
+                first_mask, second_mask = candidates[first], candidates[second]
+                shared = first_mask & second_mask
+                if first_mask == second_mask or shared.bit_count() != 1 or shared & pivot_mask or \
+                        (first_mask | second_mask | pivot_mask).bit_count() != 3:
+                    continue
+                removed |= self._eliminate(list(self._peer_sets[first] & self._peer_sets[second]), shared)
+        return removed
@@ -0,0 +1,282 @@
+import multiprocessing
+from collections import deque
+from typing import Callable, Optional
+
+from core.cancellation import CHECK_INTERVAL, CancellationToken, StopReason
+from core.grid import BitmaskGrid, mask_digits
+from core.solver import CellOrder, GridSolver
+from core.stats import SolverStats
+
+POLL_SECONDS = 0.05  # How often the parent checks its own cancellation token while waiting for workers
+
+# Shared with every worker of a pool when it starts, as multiprocessing primitives can't be sent with each task
+_stop_event = None  # Set once the check in progress has found all the solutions it needs
+_found_count = None  # Solutions found so far by the check in progress, across every worker
+
+
+def _init_worker(stop_event, found_count):
+    """ Keeps the shared stop event and solution count in the worker process. """
+    global _stop_event, _found_count
+    _stop_event, _found_count = stop_event, found_count
+
+
+def _search_branch(task: tuple[list[int], int, Optional[float], bool]) -> tuple[int, StopReason, SolverStats, list]:
+    """
+    Runs in a worker. Counts the solutions of one branch of the search tree, adding each one to the shared count as
+    soon as it is found, and stopping once the shared count reaches the limit, whoever found them.
+    :param task: The values of the branch, the limit, the deadline, and whether to send the solutions back
+    :return: The solutions found in the branch, why its search stopped, its stats, and the solutions if asked for.
+    """
+    values, limit, deadline, keep_solutions = task
+    search = GridSolver(CellOrder.MINIMUM_REMAINING_VALUES, max_iterations=None)
+    grid = BitmaskGrid.from_givens(values)
+    if grid is None or grid.propagate() is None:
+        return 0, StopReason.COMPLETED, search.stats, []
+
+    solutions = []
+
+    def on_solution(solution: list[int]):
+        if keep_solutions:
+            solutions.append(solution[:])
+        with _found_count.get_lock():
+            _found_count.value += 1
+            if _found_count.value >= limit:
+                _stop_event.set()
+
+    count = search.count_solutions(grid, limit, deadline=deadline, cancel_token=CancellationToken(_stop_event),
+                                   on_solution=on_solution)
+    return count, search.stop_reason, search.stats, solutions
+
+
+class ParallelSolver:
+    """
+    Counts solutions and checks uniqueness by splitting the search tree across a process pool.
+    Most checks finish within a few thousand iterations, far quicker than sending work to another process, so each
+    one is first searched here with a budget of split_after iterations. Only searches that run out of budget are split:
+    the most constrained cells are branched on, one digit per branch, until there are enough branches to keep every
+    worker busy. Every worker adds the solutions it finds to a shared count, and all of them stop as soon as the count
+    reaches the limit, so a uniqueness check ends the moment any two workers have found a solution between them.
+
+    Has the same flat list contract as ExactCoverSolver, so it can be given to PuzzleGenerator as its uniqueness
+    solver. The pool is started on the first split and kept until close is called, or the with block is left. Only one
+    check may run at a time, as the workers share one stop event.
+    """
+
+    def __init__(self, processes: int = None, split_after=8 * CHECK_INTERVAL, branches_per_process=4,
+                 on_stats: Callable[[SolverStats], None] = None):
+        self.processes = processes or multiprocessing.cpu_count()  # Worker processes, defaulting to one per core
+        self.split_after = split_after  # Iterations searched here before splitting across the pool
+        self.branches_per_process = branches_per_process  # More branches than workers evens out the uneven ones
+        self.stats = SolverStats()  # Filled in by every check, including the searches of every worker
+        self.on_stats = on_stats  # Called with the stats at the end of every check
+        self.stop_reason = StopReason.COMPLETED  # Why the last check stopped
+        self.split_count = 0  # Branches the last check was split into, or 0 if it finished without the pool
+        self._pool = None
+        self._stop_event = None
+        self._found_count = None
+
+    def __enter__(self) -> 'ParallelSolver':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ Stops the worker processes. The next split starts them again. """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def has_unique_solution(self, values: list[int], deadline: float = None,
+                            cancel_token: CancellationToken = None) -> bool:
+        """
+        Returns true if the board has exactly one solution. False if the check stopped early, see stop_reason.
+        :param values: The board to check, as a flat list of values with 0 for blanks
+        """
+        return self.count_solutions(values, 2, deadline=deadline, cancel_token=cancel_token) == 1 and \
+            self.stop_reason is StopReason.COMPLETED
+
+    def count_solutions(self, values: list[int], limit: int = 2, solutions: list[list[int]] = None,
+                        deadline: float = None, cancel_token: CancellationToken = None) -> int:
+        """
+        Counts the solutions of the board, stopping as soon as limit of them are found. The board is not changed.
+        :param values: The board to search, as a flat list of values with 0 for blanks
+        :param limit: The number of solutions to stop at. 2 is enough to tell if the solution is unique
+        :param solutions: If given, the values of each solution found are appended to it. Solutions found by the
+                          pool come in the order the workers finish
+        :return: The number of solutions found, at most limit. Check stop_reason to know if it is exact.
+        """
+        self._begin()
+        count = 0
+        found = []
+        grid = BitmaskGrid.from_givens(values)
+        if grid is not None and grid.propagate() is not None:
+            search = GridSolver(CellOrder.MINIMUM_REMAINING_VALUES, self.split_after)
+            count = search.count_solutions(grid, limit, found, deadline, cancel_token)
+            self.stats.merge(search.stats)
+            self.stop_reason = search.stop_reason
+            if self.stop_reason is StopReason.MAX_ITERATIONS:
+                with self.stats.phase('split'):
+                    branches, found = self._split([grid.values[:]], limit)
+                tasks = [(branch, limit, deadline, solutions is not None) for branch in branches]
+                count = self._run_tasks(tasks, limit, len(found), found, cancel_token)
+
+        if solutions is not None:
+            solutions.extend(found[:limit])
+        self._report_stats()
+        return min(count, limit)
+
+    def has_other_solution(self, values: list[int], solution: list[int], cells: list[int] = None,
+                           deadline: float = None, cancel_token: CancellationToken = None) -> bool:
+        """
+        Checks whether the board has a solution other than a known one.
+        The cells are first searched here in turn, with split_after iterations between all of them. Another solution
+        has to put a different digit in one of the cells the budget didn't settle, so each of those digits starts its
+        own branch. Without cells, the solutions are counted instead, as a branch for every digit of every blank cell
+        would search most of the tree many times over.
+        :param values: The board to check
+        :param solution: The values of the known solution
+        :param cells: The indices of the cells removed since the board was last known to be unique
+        :return: Returns true if another solution exists, or if the search stopped early before knowing.
+        """
+        if cells is None:
+            return self.count_solutions(values, 2, deadline=deadline, cancel_token=cancel_token) > 1 or \
+                self.stop_reason is not StopReason.COMPLETED
+
+        self._begin()
+        grid = BitmaskGrid.from_givens(values)
+        if grid is None:
+            self._report_stats()
+            return False
+
+        # The cells are searched here one at a time, sharing one budget, until it runs out
+        search = GridSolver(CellOrder.MINIMUM_REMAINING_VALUES)
+        budget = self.split_after
+        found = False
+        unsettled = []  # The cells left for the pool, from the one the budget ran out on
+        for position, index in enumerate(cells):
+            search.max_iterations = budget
+            found = search.has_other_solution(grid, solution, [index], deadline, cancel_token)
+            self.stats.merge(search.stats)
+            budget -= search.stats.candidates_tested  # Zero for a cell skipped without a search
+            self.stop_reason = search.stop_reason
+            if self.stop_reason is StopReason.MAX_ITERATIONS:
+                found = False
+                unsettled = cells[position:]
+                break
+            if found:
+                break
+
+        if unsettled:
+            with self.stats.phase('split'):
+                roots = []
+                for index in unsettled:
+                    if values[index]:
+                        continue
+                    x, y = divmod(index, grid.size)
+                    for num in mask_digits(grid.candidates(x, y) & ~(1 << (solution[index] - 1))):
+                        roots.append(self._branch(grid, x, y, num))
+                branches, solved = self._split(roots, 1)
+            tasks = [(branch, 1, deadline, False) for branch in branches]
+            found = self._run_tasks(tasks, 1, len(solved), [], cancel_token) > 0 or \
+                self.stop_reason is not StopReason.COMPLETED
+
+        self._report_stats()
+        return found
+
+    def _begin(self):
+        """ Resets the stats and stop reason for a new check. """
+        self.stats = SolverStats()
+        self.stop_reason = StopReason.COMPLETED
+        self.split_count = 0
+
+    def _report_stats(self):
+        """ Passes the stats of the check that just finished to the stats hook. """
+        if self.on_stats is not None:
+            self.on_stats(self.stats)
+
+    def _split(self, roots: list[Optional[list[int]]], limit: int) -> tuple[list[list[int]], list[list[int]]]:
+        """
+        Splits the search tree into branches, breadth first, until there are enough to keep every worker busy.
+        Each new branch places one digit in the most constrained cell of its parent, then fills in any forced cells.
+        :param roots: The values of the propagated branches to start from. None is a branch with no solutions
+        :return: The values of each branch, and the values of any solutions found while splitting.
+        """
+        target = self.processes * self.branches_per_process
+        branches = deque()
+        solved = []
+        for values in roots:
+            if values is not None:
+                (branches if 0 in values else solved).append(values)
+        while branches and len(branches) < target and len(solved) < limit:
+            grid = BitmaskGrid.from_values(branches.popleft())
+            x, y, candidates = grid.most_constrained_cell()
+            for num in mask_digits(candidates):
+                values = self._branch(grid, x, y, num)
+                if values is not None:
+                    (branches if 0 in values else solved).append(values)
+        return list(branches), solved
+
+    @staticmethod
+    def _branch(grid: BitmaskGrid, x: int, y: int, num: int) -> Optional[list[int]]:
+        """ Returns the values of a copy of the grid with num placed at (x, y) and propagated, or None if it fails. """
+        child = grid.copy()
+        child.place(x, y, num)
+        if child.propagate() is None:
+            return None
+        return child.values
+
+    def _run_tasks(self, tasks: list[tuple[list[int], int, Optional[float], bool]], limit: int, already_found: int,
+                   found: list[list[int]], cancel_token: Optional[CancellationToken]) -> int:
+        """
+        Searches every branch on the pool until the shared count reaches limit or every branch is searched.
+        Every result is waited for, even after the limit is reached, so no stale branch is left running into the next
+        check. Branches that start after the stop event is set return straight away.
+        :param already_found: Solutions found before splitting, which count towards the limit
+        :param found: Solutions sent back by the workers are appended to it
+        :return: The number of solutions found, including already_found.
+        """
+        self.split_count = len(tasks)
+        count = already_found
+        self.stop_reason = StopReason.COMPLETED
+        if count >= limit or not tasks:
+            return count
+
+        pool = self._get_pool()
+        self._stop_event.clear()
+        self._found_count.value = already_found
+        stop_reasons = set()
+        with self.stats.phase('parallel'):
+            results = pool.imap_unordered(_search_branch, tasks)
+            while True:
+                try:
+                    branch_count, reason, stats, solutions = results.next(POLL_SECONDS)
+                except StopIteration:
+                    break
+                except multiprocessing.TimeoutError:
+                    if cancel_token is not None and cancel_token.is_cancelled():
+                        self._stop_event.set()
+                    continue
+                count += branch_count
+                found.extend(solutions)
+                stop_reasons.add(reason)
+                self.stats.merge(stats)
+                if count >= limit:
+                    self._stop_event.set()
+
+        # Workers only stop each other once the limit is reached, so any other stop came from the deadline or the token
+        if count < limit:
+            if cancel_token is not None and cancel_token.is_cancelled():
+                self.stop_reason = StopReason.CANCELLED
+            elif StopReason.DEADLINE in stop_reasons:
+                self.stop_reason = StopReason.DEADLINE
+        return count
+
+    def _get_pool(self):
+        """ Returns the process pool, starting it with the shared stop event and count if it isn't running. """
+        if self._pool is None:
+            self._stop_event = multiprocessing.Event()
+            self._found_count = multiprocessing.Value('i', 0)
+            self._pool = multiprocessing.Pool(self.processes, _init_worker, (self._stop_event, self._found_count))
+        return self._pool
@@ -0,0 +1,486 @@
+"""
+A file of generated puzzles, read through mmap so a bank of millions of puzzles barely takes any memory.
+
+Each puzzle is one fixed size record: its difficulty, a bit per cell for the givens, the solution with 4 bits per
+cell, and a hash of the puzzle's canonical form. A 9x9 puzzle fits in 64 bytes, so a million of them take 64MB on
+disk, and any one is read from a single page.
+A small index file next to the bank lists the records of each difficulty and clue count, so a random puzzle of a
+given difficulty costs one read of the index and one of the bank. A unique bank also keeps the sorted hashes of its
+canonical forms in a third file, so checking for a puzzle in disguise is a binary search.
+
+Fill a bank from the command line, rating each puzzle as it is generated:
+
+    python -m core.puzzle_bank puzzles.sdb --count 10000 --target 50
+
+Add --unique to skip puzzles equivalent to one already in the bank, or copy the distinct puzzles of a bank to a new
+one with --dedupe:
+
+    python -m core.puzzle_bank puzzles.sdb --dedupe distinct.sdb
+"""
+import argparse
+import hashlib
+import heapq
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from typing import Optional
+
+from core.canonical import canonical_form
+from core.generator import GeneratedPuzzle, PuzzleGenerator
+from core.geometry import CLASSIC, BoardGeometry
+from core.rater import Difficulty, PuzzleRater
+from core.transposition import TranspositionCache
+
+BANK_MAGIC = b'SDKB'
+INDEX_MAGIC = b'SDKI'
+HASHES_MAGIC = b'SDKH'
+BANK_VERSION = 2
+_BANK_HEADER = struct.Struct('<4sHHH')  # Magic, version, cell count, record size. Padded to a whole record
+_INDEX_HEADER = struct.Struct('<4sHII')  # Magic, version, records indexed, key count
+_INDEX_KEY = struct.Struct('<BHIQ')  # Difficulty, clue count, record count, offset of the record numbers
+_RECORD_NUMBER = struct.Struct('<I')
+_HASHES_HEADER = struct.Struct('<4sHI')  # Magic, version, records hashed
+_FORM_HASH = struct.Struct('<Q')  # The hash of a canonical form, kept in each record and in the hashes file
+FORM_HASH_SIZE = _FORM_HASH.size
+
+
+class PuzzleBank:
+    """
+    Stores puzzles with their solutions and difficulties in a file of fixed size records, indexed by difficulty and
+    clue count. Boards up to 16x16 can be stored, as each digit of the solution is kept in 4 bits.
+
+    Records are padded to a power of two, and the header takes up the first record, so no record crosses a page.
+    The bank and the index are both mapped read only, so reading a puzzle only pages in the parts of the files it
+    touches. Appended records go straight to the end of the bank, while their record numbers are kept in memory until
+    flush writes a new index. An index missing the latest records, such as after a crash, is brought up to date by
+    scanning just those records when the bank is opened.
+
+    Each 9x9 record keeps a hash of the canonical form of its puzzle, which is the same for every relabeling,
+    permutation and transposition of it. Finding the form adds a few milliseconds to an append on average, and up to
+    about 250ms for a puzzle with very symmetric clues. A unique bank refuses puzzles whose canonical form it already
+    holds. It maps a file of the sorted hashes of its records, and keeps the hashes of records appended since in
+    memory. That file is merged again once those outgrow an eighth of it, and when the bank closes, so opening a
+    unique bank reads no records but those missing from the file. Larger boards have no canonical form, so their hash
+    is 0.
+    A bank is not thread safe, so guard it with a lock if several threads use it.
+    """
+
+    def __init__(self, path: str, geometry: BoardGeometry = CLASSIC, flush_every=4096, unique=False):
+        """
+        Opens a bank, creating it if the file doesn't exist.
+        :param path: The bank file. The index is kept in the same place, with .idx added to the name, and the hashes
+                     of a unique bank with .hashes
+        :param geometry: The size of the boards in the bank, which has to match an existing bank
+        :param flush_every: Records appended before the index is written again
+        :param unique: If true, puzzles equivalent to one already in the bank are not added. 9x9 boards only
+        """
+        if geometry.size > 16:
+            raise ValueError('A puzzle bank holds boards up to 16x16, as each digit is stored in 4 bits')
+        if unique and geometry.size > 9:
+            raise ValueError('Only banks of 9x9 boards can be unique, as larger boards have no canonical form')
+        self.path = path
+        self.index_path = path + '.idx'
+        self.hashes_path = path + '.hashes'
+        self.geometry = geometry
+        self.flush_every = flush_every
+        self.unique = unique
+        self._mask_size = (geometry.cell_count + 7) // 8
+        self._digits_size = (geometry.cell_count + 1) // 2
+        self._hash_offset = 1 + self._mask_size + self._digits_size
+        self.record_size = 1 << (self._hash_offset + FORM_HASH_SIZE - 1).bit_length()
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._file = open(path, 'r+b')
+            self._read_header()
+        else:
+            self._file = open(path, 'w+b')
+            self._file.write(_BANK_HEADER.pack(BANK_MAGIC, BANK_VERSION, geometry.cell_count, self.record_size)
+                             .ljust(self.record_size, b'\0'))
+        self._record_count = self._file.seek(0, os.SEEK_END) // self.record_size - 1  # A partial record is overwritten
+        self._records: Optional[mmap.mmap] = None
+        self._mapped_count = 0  # Records covered by the bank's map
+
+        self._index_file = None
+        self._index: Optional[mmap.mmap] = None
+        self._keys: dict[tuple[int, int], tuple[int, int]] = {}  # Difficulty and clue count, to count and offset
+        self._pending: dict[tuple[int, int], array] = {}  # Record numbers appended since the index was written
+        self._pending_count = 0
+        self._load_index()
+
+        self._hashes_file = None
+        self._hashes: Optional[mmap.mmap] = None
+        self._hashed_count = 0  # Records whose hashes are in the hashes file
+        self._new_hashes: set[int] = set()  # Hashes of the records appended since the hashes file was written
+        if unique:
+            self._load_hashes()
+
+    def __len__(self):
+        return self._record_count
+
+    def __enter__(self) -> 'PuzzleBank':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, puzzle: GeneratedPuzzle, difficulty: Difficulty) -> Optional[int]:
+        """
+        Adds a puzzle to the end of the bank.
+        :param puzzle: A puzzle whose givens agree with its solution
+        :param difficulty: The rating of the puzzle, which it is indexed under
+        :return: The record number of the puzzle, or None if the bank is unique and already holds it in disguise.
+        """
+        return self._append_record(self._pack(puzzle, difficulty))
+
+    def get(self, number: int) -> GeneratedPuzzle:
+        """ Reads the puzzle in a record. Removed cells are listed in row major order, as the order isn't stored. """
+        record = self._record(number)
+        mask = int.from_bytes(record[1:1 + self._mask_size], 'little')
+        solution = []
+        for byte in record[1 + self._mask_size:1 + self._mask_size + self._digits_size]:
+            solution.append((byte >> 4) + 1)
+            solution.append((byte & 0xF) + 1)
+        del solution[self.geometry.cell_count:]
+        givens = [num if mask >> index & 1 else 0 for index, num in enumerate(solution)]
+        return GeneratedPuzzle(givens, solution, [index for index, num in enumerate(givens) if not num])
+
+    def difficulty(self, number: int) -> Difficulty:
+        """ Returns the difficulty a record is indexed under. """
+        return Difficulty(self._record(number)[0])
+
+    def count(self, difficulty: Difficulty = None, min_clues=0, max_clues: int = None) -> int:
+        """ Returns the number of puzzles of a difficulty and range of clue counts. None matches every difficulty. """
+        return sum(self._key_count(key) for key in self._matching_keys(difficulty, min_clues, max_clues))
+
+    def random(self, difficulty: Difficulty = None, min_clues=0, max_clues: int = None,
+               rng: random.Random = None) -> Optional[GeneratedPuzzle]:
+        """
+        Picks a puzzle uniformly from those of a difficulty and range of clue counts.
+        :param difficulty: The difficulty to pick from, or None for any
+        :param min_clues: The fewest givens the puzzle can have
+        :param max_clues: The most givens the puzzle can have, or None for no limit
+        :param rng: Picks the puzzle, defaulting to the random module
+        :return: The puzzle, or None if the bank has none that match.
+        """
+        rng = random if rng is None else rng
+        keys = self._matching_keys(difficulty, min_clues, max_clues)
+        choice = rng.randrange(self.count(difficulty, min_clues, max_clues)) if keys else 0
+        for key in keys:
+            key_count = self._key_count(key)
+            if choice < key_count:
+                return self.get(self._record_number(key, choice))
+            choice -= key_count
+        return None
+
+    def flush(self):
+        """ Writes any buffered records, and a new index if records were appended since the last one. """
+        self._file.flush()
+        if not self._pending_count and self._index is not None:
+            return
+
+        keys = sorted(set(self._keys) | set(self._pending))
+        offset = _INDEX_HEADER.size + _INDEX_KEY.size * len(keys)
+        table, numbers = [], []
+        for key in keys:
+            count, start = self._keys.get(key, (0, 0))
+            pending = self._pending.get(key, array('I'))
+            if sys.byteorder == 'big':  # pragma: no cover
+                pending.byteswap()
+            table.append(_INDEX_KEY.pack(key[0], key[1], count + len(pending), offset))
+            numbers.append(self._index[start:start + count * _RECORD_NUMBER.size] if count else b'')
+            numbers.append(pending.tobytes())
+            offset += (count + len(pending)) * _RECORD_NUMBER.size
+
+        temporary_path = self.index_path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(_INDEX_HEADER.pack(INDEX_MAGIC, BANK_VERSION, self._record_count, len(keys)))
+            file.writelines(table)
+            file.writelines(numbers)
+        self._close_index()
+        os.replace(temporary_path, self.index_path)
+        self._pending = {}
+        self._pending_count = 0
+        self._load_index()
+        if len(self._new_hashes) >= max(self.flush_every, self._hashed_count // 8):
+            self._write_hashes()
+
+    def close(self):
+        """ Flushes the bank and the hashes of a unique bank, then closes every file. """
+        self.flush()
+        if self._new_hashes:
+            self._write_hashes()
+        self._close_hashes()
+        self._close_index()
+        if self._records is not None:
+            self._records.close()
+            self._records = None
+        self._file.close()
+
+    def _read_header(self):
+        """ Checks that the bank on disk was written by this version, for boards of this size. """
+        data = self._file.read(_BANK_HEADER.size)
+        if len(data) < _BANK_HEADER.size:
+            raise ValueError('Too short to be a puzzle bank')
+        magic, version, cell_count, record_size = _BANK_HEADER.unpack(data)
+        if magic != BANK_MAGIC or version != BANK_VERSION:
+            raise ValueError('Not a puzzle bank, or written by an unsupported version')
+        if cell_count != self.geometry.cell_count or record_size != self.record_size:
+            raise ValueError(f'The puzzle bank holds boards of {cell_count} cells, not {self.geometry.cell_count}')
+
+    def _append_record(self, record: bytes) -> Optional[int]:
+        """ Writes a packed record to the end of the bank, unless the bank is unique and holds its puzzle. """
+        if self.unique:
+            form_hash = self._form_hash(record)
+            if self._holds(form_hash):
+                return None
+            self._new_hashes.add(form_hash)
+
+        number = self._record_count
+        self._file.seek((number + 1) * self.record_size)
+        self._file.write(record)
+        self._record_count += 1
+        self._add_pending(self._index_key(record), number)
+        if self._pending_count >= self.flush_every:
+            self.flush()
+        return number
+
+    def _pack(self, puzzle: GeneratedPuzzle, difficulty: Difficulty) -> bytes:
+        """ Packs a puzzle into a record, with the hash of its canonical form. """
+        cell_count = self.geometry.cell_count
+        if len(puzzle.solution) != cell_count or len(puzzle.givens) != cell_count:
+            raise ValueError(f'The puzzle bank holds boards of {cell_count} cells')
+        if any(num and num != puzzle.solution[index] for index, num in enumerate(puzzle.givens)):
+            raise ValueError('The givens of the puzzle disagree with its solution')
+        mask = sum(1 << index for index, num in enumerate(puzzle.givens) if num)
+        digits = [num - 1 for num in puzzle.solution] + [0]  # An odd cell count leaves the last low half empty
+        packed = bytes(digits[index] << 4 | digits[index + 1] for index in range(0, cell_count, 2))
+        if self.geometry.size > 9:
+            form_hash = bytes(FORM_HASH_SIZE)
+        else:
+            form_hash = hashlib.blake2b(bytes(canonical_form(puzzle.givens)[0]), digest_size=FORM_HASH_SIZE).digest()
+        return (bytes([difficulty.value]) + mask.to_bytes(self._mask_size, 'little') + packed + form_hash).ljust(
+            self.record_size, b'\0')
+
+    def _index_key(self, record: bytes) -> tuple[int, int]:
+        """ Returns the difficulty and clue count a record is indexed under. """
+        return record[0], int.from_bytes(record[1:1 + self._mask_size], 'little').bit_count()
+
+    def _form_hash(self, record: bytes) -> int:
+        """ Returns the hash of the canonical form of the puzzle in a record. """
+        return _FORM_HASH.unpack_from(record, self._hash_offset)[0]
+
+    def _holds(self, form_hash: int) -> bool:
+        """ Returns true if a record has the hash, searching the sorted hashes file and then the newer hashes. """
+        if form_hash in self._new_hashes:
+            return True
+        low, high = 0, self._hashes_in_file()
+        while low < high:
+            middle = (low + high) // 2
+            found = _FORM_HASH.unpack_from(self._hashes, _HASHES_HEADER.size + middle * FORM_HASH_SIZE)[0]
+            if found == form_hash:
+                return True
+            if found < form_hash:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    def _hashes_in_file(self) -> int:
+        """ Returns the number of hashes in the hashes file. """
+        return 0 if self._hashes is None else (len(self._hashes) - _HASHES_HEADER.size) // FORM_HASH_SIZE
+
+    def _load_hashes(self):
+        """
+        Maps the hashes file, then reads the hashes of any records it is missing. A broken file is rebuilt from every
+        record, and written again if it was missing many.
+        """
+        self._hashed_count = 0
+        try:
+            self._hashes_file = open(self.hashes_path, 'rb')
+            self._hashes = mmap.mmap(self._hashes_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, self._hashed_count = _HASHES_HEADER.unpack_from(self._hashes)
+            if magic != HASHES_MAGIC or version != BANK_VERSION or self._hashed_count > self._record_count:
+                raise ValueError('Stale puzzle bank hashes')
+        except (OSError, ValueError, struct.error):
+            self._close_hashes()
+            self._hashed_count = 0
+
+        self._new_hashes = {self._form_hash(self._record(number))
+                            for number in range(self._hashed_count, self._record_count)}
+        if len(self._new_hashes) >= max(self.flush_every, self._hashed_count // 8):
+            self._write_hashes()
+
+    def _write_hashes(self):
+        """ Merges the newer hashes into a new hashes file, covering every record in the bank. """
+        self._file.flush()
+        old_hashes = (found for found, in _FORM_HASH.iter_unpack(self._hashes[_HASHES_HEADER.size:])) \
+            if self._hashes is not None else ()
+        temporary_path = self.hashes_path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(_HASHES_HEADER.pack(HASHES_MAGIC, BANK_VERSION, self._record_count))
+            chunk = array('Q')
+            for form_hash in heapq.merge(old_hashes, sorted(self._new_hashes)):
+                chunk.append(form_hash)
+                if len(chunk) == 1 << 16:
+                    self._write_chunk(file, chunk)
+            self._write_chunk(file, chunk)
+        self._close_hashes()
+        os.replace(temporary_path, self.hashes_path)
+        self._load_hashes()
+
+    @staticmethod
+    def _write_chunk(file, chunk: array):
+        """ Writes hashes to a file in little endian order, then empties the chunk. """
+        if sys.byteorder == 'big':  # pragma: no cover
+            chunk.byteswap()
+        file.write(chunk.tobytes())
+        del chunk[:]
+
+    def _close_hashes(self):
+        """ Unmaps the hashes file and closes it, if it is open. """
+        if self._hashes is not None:
+            self._hashes.close()
+            self._hashes = None
+        if self._hashes_file is not None:
+            self._hashes_file.close()
+            self._hashes_file = None
+
+    def _record(self, number: int) -> bytes:
+        """ Returns the bytes of a record, mapping the end of the bank again if it was appended since the last map. """
+        if not 0 <= number < self._record_count:
+            raise IndexError('Record number out of range')
+        if number >= self._mapped_count:
+            self._file.flush()
+            if self._records is not None:
+                self._records.close()
+            self._records = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_count = self._record_count
+        start = (number + 1) * self.record_size
+        return self._records[start:start + self.record_size]
+
+    def _load_index(self):
+        """ Maps the index, then indexes any records it is missing. A broken index is rebuilt from every record. """
+        self._keys = {}
+        indexed = 0
+        try:
+            self._index_file = open(self.index_path, 'rb')
+            self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, indexed, key_count = _INDEX_HEADER.unpack_from(self._index)
+            if magic != INDEX_MAGIC or version != BANK_VERSION or indexed > self._record_count:
+                raise ValueError('Stale puzzle bank index')
+            for i in range(key_count):
+                difficulty, clue_count, count, offset = _INDEX_KEY.unpack_from(
+                    self._index, _INDEX_HEADER.size + i * _INDEX_KEY.size)
+                self._keys[difficulty, clue_count] = (count, offset)
+        except (OSError, ValueError, struct.error):
+            self._close_index()
+            self._keys = {}
+            indexed = 0
+
+        for number in range(indexed, self._record_count):
+            self._add_pending(self._index_key(self._record(number)), number)
+
+    def _close_index(self):
+        """ Unmaps the index and closes its file, if it is open. """
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+    def _add_pending(self, key: tuple[int, int], number: int):
+        """ Indexes a record in memory, until the next flush writes it to the index file. """
+        self._pending.setdefault(key, array('I')).append(number)
+        self._pending_count += 1
+
+    def _matching_keys(self, difficulty: Optional[Difficulty], min_clues: int, max_clues: Optional[int]) -> list:
+        """ Returns the keys of the index with a difficulty and clue count in range, in a fixed order. """
+        return sorted(key for key in set(self._keys) | set(self._pending)
+                      if (difficulty is None or key[0] == difficulty.value) and min_clues <= key[1]
+                      and (max_clues is None or key[1] <= max_clues))
+
+    def _key_count(self, key: tuple[int, int]) -> int:
+        """ Returns the number of records under a key, written to the index or not. """
+        return self._keys.get(key, (0, 0))[0] + len(self._pending.get(key, ()))
+
+    def _record_number(self, key: tuple[int, int], i: int) -> int:
+        """ Returns the number of the i-th record under a key, reading it from the index if it was written there. """
+        count, offset = self._keys.get(key, (0, 0))
+        if i < count:
+            return _RECORD_NUMBER.unpack_from(self._index, offset + i * _RECORD_NUMBER.size)[0]
+        return self._pending[key][i - count]
+
+
+def fill_bank(bank: PuzzleBank, count: int, target_count=40, seed: int = None) -> dict[Difficulty, int]:
+    """
+    Generates puzzles, rates them, and appends them to a bank.
+    :param count: The number of puzzles to generate
+    :param target_count: The number of cells to remove from each puzzle
+    :param seed: Seeds the generator, so the same seed always adds the same puzzles
+    :return: The number of puzzles added at each difficulty, leaving out those a unique bank already held.
+    """
+    generator = PuzzleGenerator(target_count, rng=random.Random(seed), geometry=bank.geometry,
+                                cache=TranspositionCache())
+    rater = PuzzleRater()
+    added = {difficulty: 0 for difficulty in Difficulty}
+    for _ in range(count):
+        puzzle = generator.generate()
+        difficulty = rater.rate(puzzle.givens).difficulty
+        if bank.append(puzzle, difficulty) is not None:
+            added[difficulty] += 1
+    return added
+
+
+def dedupe_bank(source: PuzzleBank, destination: PuzzleBank) -> int:
+    """
+    Copies the puzzles of a bank to a unique bank, leaving out any equivalent to one copied before.
+    Records are copied as they are, so no puzzle is canonicalized again.
+    :param source: The bank to read
+    :param destination: A unique bank of the same geometry
+    :return: The number of puzzles copied.
+    """
+    if not destination.unique or destination.geometry.cell_count != source.geometry.cell_count:
+        raise ValueError('Puzzles can only be deduped into a unique bank of the same size')
+    return sum(destination._append_record(source._record(number)) is not None for number in range(len(source)))
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Entry point for the command line. Prints the number of puzzles at each difficulty in the bank, or in the deduped
+    copy of it.
+    """
+    parser = argparse.ArgumentParser(description='Add generated sudoku puzzles to a puzzle bank.')
+    parser.add_argument('bank', help='Bank file, created if it does not exist')
+    parser.add_argument('-n', '--count', type=int, default=0, help='Puzzles to generate and add')
+    parser.add_argument('--target', type=int, default=40, help='Cells to remove from each puzzle')
+    parser.add_argument('--size', type=int, choices=[9, 16], default=9, help='Cells along each side of the board')
+    parser.add_argument('--seed', type=int, help='Seed for the generator')
+    parser.add_argument('--unique', action='store_true', help='Skip puzzles equivalent to one in the bank. 9x9 only')
+    parser.add_argument('--dedupe', metavar='OUTPUT', help='Copy the distinct puzzles of the bank to a new bank')
+    args = parser.parse_args(argv)
+    if (args.unique or args.dedupe) and args.size != 9:
+        parser.error('only 9x9 banks can be deduped')
+
+    with PuzzleBank(args.bank, BoardGeometry.of({9: 3, 16: 4}[args.size]), unique=args.unique) as bank:
+        fill_bank(bank, args.count, args.target, args.seed)
+        if args.dedupe:
+            with PuzzleBank(args.dedupe, bank.geometry, unique=True) as distinct:
+                dedupe_bank(bank, distinct)
+                _print_counts(distinct)
+        else:
+            _print_counts(bank)
+    return 0
+
+
+def _print_counts(bank: PuzzleBank):
+    """ Prints the number of puzzles in a bank at each difficulty. """
+    for difficulty in Difficulty:
+        print(f'{difficulty.name.lower()}: {bank.count(difficulty)}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import threading
+from collections import deque
+from typing import Hashable, Optional
+
+from core.generator import GeneratedPuzzle, PuzzleGenerator
+from core.puzzle_bank import PuzzleBank
+from core.rater import PuzzleRater
+
+
+class PuzzlePool:
+    """
+    Keeps a few ready puzzles for each difficulty, so a new game can start without waiting on a generator.
+    A worker thread tops every pool up to depth, one puzzle at a time, starting with the pool that has the fewest
+    puzzles. Taking a puzzle from a pool that isn't empty is O(1). An empty pool falls back to generating on the
+    calling thread.
+
+    The worker can be paused, such as while the user is solving a puzzle, so it doesn't take CPU from the UI. It
+    finishes the puzzle it is on, then waits until it is resumed.
+    Each difficulty has its own PuzzleGenerator, which is only ever used by one thread at a time, so generators must
+    not share a uniqueness solver or a transposition cache.
+
+    Given a PuzzleBank, every puzzle the worker makes is rated and appended to it, and an empty pool draws a puzzle
+    from the bank with as many clues as its generator leaves before generating one.
+    """
+
+    def __init__(self, generators: dict[Hashable, PuzzleGenerator], depth=3, bank: PuzzleBank = None):
+        self.generators = generators  # Each difficulty, to the generator making its puzzles
+        self.depth = depth  # Puzzles to keep ready for each difficulty
+        self.bank = bank  # If given, puzzles are saved to it, and drawn from it when a pool runs dry
+        self.rater = None if bank is None else PuzzleRater()
+        self._bank_lock = threading.Lock()  # Held while the bank is in use
+        self._puzzles = {key: deque() for key in generators}
+        self._locks = {key: threading.Lock() for key in generators}  # Held while a generator is in use
+        self._condition = threading.Condition()  # Guards the pools and the paused and closed flags
+        self._paused = False
+        self._closed = False
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self):
+        """ Starts the worker thread that keeps the pools full. Does nothing if it is already running. """
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._refill, daemon=True)
+            self._worker.start()
+
+    def take(self, key: Hashable) -> GeneratedPuzzle:
+        """
+        Returns a ready puzzle of a difficulty, and lets the worker make another in its place.
+        :param key: The difficulty, as given in generators
+        :return: The oldest puzzle in the pool. If the pool is empty, a puzzle from the bank, or a new one generated
+                 on this thread.
+        """
+        puzzle = self._pop(key)
+        if puzzle is None and self.bank is not None:
+            puzzle = self._draw(key)
+        if puzzle is not None:
+            return puzzle
+
+        with self._locks[key]:
+            # The worker may have finished one while this thread waited for the generator
+            puzzle = self._pop(key)
+            return self.generators[key].generate() if puzzle is None else puzzle
+
+    def count(self, key: Hashable) -> int:
+        """ Returns the number of ready puzzles of a difficulty. """
+        with self._condition:
+            return len(self._puzzles[key])
+
+    def pause(self):
+        """ Stops the worker from starting another puzzle until resume is called. """
+        with self._condition:
+            self._paused = True
+
+    def resume(self):
+        """ Lets the worker carry on filling the pools. """
+        with self._condition:
+            self._paused = False
+            self._condition.notify_all()
+
+    def is_paused(self) -> bool:
+        """ Returns true while the worker is paused. """
+        return self._paused
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Blocks until every pool is full.
+        :param timeout: The most seconds to wait, or None to wait for as long as it takes
+        :return: Returns true if every pool is full, false if the timeout passed first.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._next_key() is None, timeout)
+
+    def close(self):
+        """
+        Stops the worker once it finishes the puzzle it is on. Ready puzzles can still be taken.
+        Once this returns, the worker won't append to the bank again, so the bank can be closed.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        with self._bank_lock:
+            pass  # Waits for an append in progress to finish
+
+    def _pop(self, key: Hashable) -> Optional[GeneratedPuzzle]:
+        """ Takes the oldest puzzle of a difficulty, or returns None if its pool is empty. """
+        with self._condition:
+            if not self._puzzles[key]:
+                return None
+            puzzle = self._puzzles[key].popleft()
+            self._condition.notify_all()
+            return puzzle
+
+    def _draw(self, key: Hashable) -> Optional[GeneratedPuzzle]:
+        """
+        Picks a random puzzle from the bank with the clues the generator of a difficulty leaves: the cells it doesn't
+        remove, less up to 3 from the last symmetrical group removed.
+        """
+        generator = self.generators[key]
+        max_clues = generator.geometry.cell_count - generator.target_count
+        with self._bank_lock:
+            return self.bank.random(min_clues=max_clues - 3, max_clues=max_clues)
+
+    def _save(self, puzzle: GeneratedPuzzle):
+        """ Rates a puzzle and appends it to the bank. """
+        rating = self.rater.rate(puzzle.givens)
+        with self._bank_lock:
+            if not self._closed:
+                self.bank.append(puzzle, rating.difficulty)
+
+    def _next_key(self) -> Optional[Hashable]:
+        """ Returns the difficulty with the fewest ready puzzles, or None if every pool is full. """
+        key = min(self._puzzles, key=lambda k: len(self._puzzles[k]), default=None)
+        return None if key is None or len(self._puzzles[key]) >= self.depth else key
+
+    def _refill(self):
+        """ Runs on the worker thread. Generates puzzles for the emptiest pool until closed. """
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed or not self._paused and self._next_key() is not None)
+                if self._closed:
+                    return
+                key = self._next_key()
+
+            with self._locks[key]:
+                puzzle = self.generators[key].generate()
+            if self.bank is not None:
+                self._save(puzzle)
+            with self._condition:
+                self._puzzles[key].append(puzzle)
+                self._condition.notify_all()
@@ -0,0 +1,77 @@
+from enum import Enum
+from typing import Optional
+
+from core.cancellation import StopReason, deadline_in
+from core.exact_cover import ExactCoverSolver
+from core.logic import LogicalSolver, Technique
+
+
+class Difficulty(Enum):
+    """ How hard a puzzle is to solve by hand: """
+    EASY = 0  # Solved by filling in naked and hidden singles alone
+    MEDIUM = 1  # Needs locked candidates, or pairs, triples or quads of a house
+    HARD = 2  # Needs a fish or a wing, or a guess once every technique is stuck
+
+
+class PuzzleRating:
+    """ The result of rating a puzzle with PuzzleRater. """
+
+    def __init__(self, difficulty: Difficulty, clue_count: int, propagated_count: int, node_count: int,
+                 technique: Optional[Technique] = None, technique_counts: dict[Technique, int] = None,
+                 stop_reason: StopReason = StopReason.COMPLETED):
+        self.difficulty = difficulty
+        self.clue_count = clue_count  # Givens in the puzzle
+        self.propagated_count = propagated_count  # Cells filled by the techniques before any guess was needed
+        self.node_count = node_count  # Exact cover columns the search branched on after the techniques got stuck
+        self.technique = technique  # The hardest technique the puzzle needed
+        self.technique_counts = {} if technique_counts is None else technique_counts  # Steps made with each one
+        self.stop_reason = stop_reason  # Anything but COMPLETED if the search gave up before finding a solution
+
+
+class PuzzleRater:
+    """
+    Rates puzzles by the hardest technique a person needs to solve them.
+    The puzzle is solved with LogicalSolver, which always uses the cheapest technique that makes progress, so two
+    puzzles with the same number of givens can be far apart. If every technique gets stuck, whatever is left is
+    searched with the exact cover solver, and the puzzle is hard. The search gives up after time_limit seconds, so no
+    puzzle can hold up a batch of ratings; the rating is then still hard, with its stop_reason set.
+    """
+
+    def __init__(self, hard_technique: Technique = Technique.X_WING, time_limit: Optional[float] = 10.0):
+        self.hard_technique = hard_technique  # Puzzles needing this technique or a later one are hard
+        self.time_limit = time_limit  # Seconds the search may take once the techniques are stuck. None for no limit
+        self.logic = LogicalSolver()
+        self._solvers: dict[int, ExactCoverSolver] = {}  # Cell count, to the solver for boards of that size
+
+    def rate(self, values: list[int]) -> Optional[PuzzleRating]:
+        """
+        Rates a puzzle.
+        :param values: The puzzle as a flat list of values in row major order, with 0 for blanks
+        :return: The rating, or None if the puzzle has no solution. A puzzle whose search ran out of time is rated
+                 hard, with the reason it stopped.
+        """
+        result = self.logic.solve(values)
+        if result is None:
+            return None  # Two givens share a house, or a cell runs out of candidates
+
+        clue_count = sum(1 for num in values if num)
+        propagated_count = sum(1 for num in result.values if num) - clue_count
+        technique = result.hardest
+        if result.solved:
+            if technique is None or technique.value <= Technique.HIDDEN_SINGLE.value:
+                difficulty = Difficulty.EASY
+            elif technique.value < self.hard_technique.value:
+                difficulty = Difficulty.MEDIUM
+            else:
+                difficulty = Difficulty.HARD
+            return PuzzleRating(difficulty, clue_count, propagated_count, 0, technique, result.technique_counts)
+
+        if self.logic.geometry.cell_count not in self._solvers:
+            self._solvers[self.logic.geometry.cell_count] = ExactCoverSolver(geometry=self.logic.geometry)
+        solver = self._solvers[self.logic.geometry.cell_count]
+        deadline = None if self.time_limit is None else deadline_in(self.time_limit)
+        if not solver.count_solutions(result.values, 1, deadline=deadline) \
+                and solver.stop_reason is StopReason.COMPLETED:
+            return None
+        return PuzzleRating(Difficulty.HARD, clue_count, propagated_count, solver.stats.node_count, technique,
+                            result.technique_counts, solver.stop_reason)
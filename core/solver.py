@@ -0,0 +1,578 @@
+import random
+from enum import Enum
+from typing import Callable, Optional
+
+from core.cancellation import CHECK_INTERVAL, CancellationToken, StopReason, check_stop
+from core.grid import BitmaskGrid
+from core.stats import SolverStats
+from core.transposition import TranspositionCache, zobrist_hash, zobrist_keys
+
+
+class CellOrder(Enum):
+    """ The order the solver picks the next cell to branch on. """
+    ROW_MAJOR = 0  # Left to right, top to bottom
+    MINIMUM_REMAINING_VALUES = 1  # The blank cell with the fewest candidates
+
+
+class BacktrackMode(Enum):
+    """ Where the search goes back to when a cell runs out of digits. """
+    CHRONOLOGICAL = 0  # The cell filled just before it
+    CONFLICT_DIRECTED = 1  # The last cell filled that helped rule out its digits, skipping the ones that didn't
+
+
+class GridSolver:
+    """
+    Depth first search over a BitmaskGrid, without recursion.
+    The choices made so far are kept on an explicit trail: for every depth, the cell being filled, whether a digit is
+    currently placed in it, and the digits still left to try. Backtracking pops the trail and undoes the placement,
+    so the search runs in a single Python frame no matter how many cells are blank.
+
+    Given a TranspositionCache, the board is also hashed as it changes, and the number of solutions below every state
+    that is searched to the end is stored. States already in the cache are not searched again, which pays off when
+    the same solver checks many boards that only differ by a few cells, as a generator does.
+
+    With conflict-directed backjumping, every depth also keeps the set of earlier depths whose digits ruled out one
+    of its own. When a cell runs out of digits, the search jumps straight back to the latest depth in that set, and
+    passes the rest of the set on to it. The cells in between had nothing to do with the dead end, so trying their
+    other digits would only reach it again. Once a solution is found, the search falls back to going back one depth
+    at a time above it, so counting still visits every solution.
+    """
+
+    def __init__(self, cell_order: CellOrder = CellOrder.ROW_MAJOR, max_iterations=1000000, shuffle=False,
+                 on_stats: Callable[[SolverStats], None] = None, rng: random.Random = None,
+                 cache: TranspositionCache = None, backtrack_mode: BacktrackMode = BacktrackMode.CHRONOLOGICAL):
+        if cache is not None and backtrack_mode is BacktrackMode.CONFLICT_DIRECTED:
+            raise ValueError('A transposition cache can only be used with chronological backtracking')
+        self.cell_order = cell_order
+        self.max_iterations = max_iterations  # Used to avoid searching forever. None means no limit
+        self.shuffle = shuffle  # If true, digits are tried in a random order. Used for board generation
+        self.rng = random if rng is None else rng  # Shuffles the digits. Pass a seeded random.Random to reproduce
+        self.iter_count = 0  # Counts the digits placed by the search
+        self.node_count = 0  # Counts the blank cells branched on
+        self.dead_end_count = 0  # Counts the blank cells that had no candidates left
+        self.backtrack_count = 0  # Counts the times the search stepped back a depth
+        self.hit_max_iterations = False  # True if the last search gave up before finishing
+        self.stop_reason = StopReason.COMPLETED  # Why the last solve or check stopped
+        self.stats = SolverStats()  # Filled in by every solve and check, across all the searches it runs
+        self.on_stats = on_stats  # Called with the stats at the end of every solve and check
+        self.cache = cache  # States with a known number of solutions, shared by every search. None to not cache
+        self.cache_lookups = 0  # Counts the states the last search looked up in the cache
+        self.cache_hits = 0  # Counts the states the last search didn't have to search, thanks to the cache
+        self.backtrack_mode = backtrack_mode
+        self.backjump_count = 0  # Counts the depths skipped over by conflict-directed backjumps in the last search
+        self._deadline = None  # Deadline of the solve or check in progress
+        self._cancel_token = None  # Cancellation token of the solve or check in progress
+
+    def solve(self, grid: BitmaskGrid, on_place: Callable[[int, int, int], None] = None,
+              on_remove: Callable[[int, int], None] = None, deadline: float = None,
+              cancel_token: CancellationToken = None) -> bool:
+        """
+        Fills the blank cells of the grid with a solution.
+        If there is none, or the search stops early, the grid is left the way it was found.
+        :param grid: The grid to solve in place
+        :param on_place: Called with x, y and the digit every time the search places a digit
+        :param on_remove: Called with x and y every time the search removes a digit
+        :param deadline: A time from deadline_in to give up at
+        :param cancel_token: A token that can be cancelled to give up early
+        :return: Returns true if it was able to solve the grid. Check stop_reason to know why it wasn't.
+        """
+        self._begin(deadline, cancel_token)
+        solved = self._search(grid, 1, True, on_place, on_remove) == 1
+        self._report_stats()
+        return solved
+
+    def has_unique_solution(self, grid: BitmaskGrid, deadline: float = None,
+                            cancel_token: CancellationToken = None) -> bool:
+        """
+        Searches for a second solution, stopping as soon as one is found.
+        :param grid: The grid to check. It is left unchanged
+        :return: Returns true if the grid has exactly one solution. False if the search stopped early.
+        """
+        return self.count_solutions(grid, 2, deadline=deadline, cancel_token=cancel_token) == 1 and \
+            self.stop_reason is StopReason.COMPLETED
+
+    def count_solutions(self, grid: BitmaskGrid, limit: int = 2, solutions: list[list[int]] = None,
+                        deadline: float = None, cancel_token: CancellationToken = None,
+                        on_solution: Callable[[list[int]], None] = None) -> int:
+        """
+        Counts the solutions of the grid, stopping as soon as limit of them are found.
+        A limit of 2 is the cheapest way to tell a unique grid from one with several solutions.
+        :param grid: The grid to search. It is left unchanged
+        :param limit: The number of solutions to stop at
+        :param solutions: If given, the values of each solution found are appended to it, in the order found
+        :param on_solution: Called with the values of each solution as soon as it is found. The list is the grid's
+                            own, so copy it to keep it
+        :return: The number of solutions found, at most limit. Check stop_reason to know if it is exact.
+        """
+        self._begin(deadline, cancel_token)
+
+        def found():
+            if solutions is not None:
+                solutions.append(grid.values[:])
+            if on_solution is not None:
+                on_solution(grid.values)
+
+        count = self._search(grid, limit, False,
+                             on_solution=None if solutions is None and on_solution is None else found)
+        self._report_stats()
+        return count
+
+    def has_other_solution(self, grid: BitmaskGrid, solution: list[int], cells: list[int] = None,
+                           deadline: float = None, cancel_token: CancellationToken = None) -> bool:
+        """
+        Checks whether the grid has a solution other than a known one.
+        Any other solution must differ from the known one in at least one blank cell, so each blank cell is searched
+        in turn with its known digit forbidden. Most of these searches hit a contradiction within a few nodes.
+
+        When the grid was unique before some cells were removed, another solution must differ in one of the removed
+        cells, so only those need to be passed in.
+        :param grid: The grid to check. It is left unchanged
+        :param solution: The values of the known solution, in row major order
+        :param cells: The indices of the cells to search, defaulting to every blank cell
+        :return: Returns true if another solution exists, or if the search stopped early before knowing.
+        """
+        self._begin(deadline, cancel_token)
+        if cells is None:
+            cells = [index for index, value in enumerate(grid.values) if value == 0]
+
+        found = False
+        for index in cells:
+            if grid.values[index]:
+                continue
+            x, y = divmod(index, grid.size)
+            candidates = grid.candidates(x, y) & ~(1 << (solution[index] - 1))
+            if not candidates:
+                continue  # The known digit is the only one that fits
+            if self._search(grid, 1, False, root=(index, candidates)) or self.stop_reason is not StopReason.COMPLETED:
+                found = True
+                break
+        self._report_stats()
+        return found
+
+    def _begin(self, deadline: Optional[float], cancel_token: Optional[CancellationToken]):
+        """ Resets the stats and stop reason, and keeps the limits, for a new solve or check. """
+        self.stats = SolverStats()
+        self.stop_reason = StopReason.COMPLETED
+        self._deadline = deadline
+        self._cancel_token = cancel_token
+
+    def _report_stats(self):
+        """ Passes the stats of the solve or check that just finished to the stats hook. """
+        if self.on_stats is not None:
+            self.on_stats(self.stats)
+
+    def _search(self, grid: BitmaskGrid, limit: int, keep_solution: bool,
+                on_place: Optional[Callable[[int, int, int], None]] = None,
+                on_remove: Optional[Callable[[int, int], None]] = None,
+                on_solution: Optional[Callable[[], None]] = None,
+                root: Optional[tuple[int, int]] = None) -> int:
+        """ Runs one search, adding its counters and time to the stats. Takes the same arguments as _run_search. """
+        stats = self.stats
+        run_search = self._run_backjumping_search if self.backtrack_mode is BacktrackMode.CONFLICT_DIRECTED \
+            else self._run_search
+        with stats.phase('search'):
+            count = run_search(grid, limit, keep_solution, on_place, on_remove, on_solution, root)
+        stats.node_count += self.node_count
+        stats.backtrack_count += self.backtrack_count
+        stats.candidates_tested += self.iter_count
+        stats.solution_count += count
+        stats.cache_lookups += self.cache_lookups
+        stats.cache_hits += self.cache_hits
+        return count
+
+    def _run_search(self, grid: BitmaskGrid, limit: int, keep_solution: bool,
+                    on_place: Optional[Callable[[int, int, int], None]],
+                    on_remove: Optional[Callable[[int, int], None]],
+                    on_solution: Optional[Callable[[], None]],
+                    root: Optional[tuple[int, int]]) -> int:
+        """
+        Runs the search until limit solutions are found, the tree is exhausted, or it is stopped early by
+        max_iterations, the deadline or the cancellation token.
+        :param grid: The grid to search. It is restored afterwards, unless keep_solution is set and a solution is found
+        :param limit: The number of solutions to stop at
+        :param keep_solution: If true, the grid is left holding the last solution found
+        :param on_solution: Called while the grid holds each solution found
+        :param root: If given, the index of the first cell to branch on and the digits it may take, as a mask
+        :return: The number of solutions found, at most limit.
+        """
+        self.iter_count = 0
+        self.node_count = 0
+        self.dead_end_count = 0
+        self.backtrack_count = 0
+        self.hit_max_iterations = False
+        self.cache_lookups = 0
+        self.cache_hits = 0
+        self.backjump_count = 0
+        stats = self.stats
+
+        # The deadline and token are checked once per search, then every CHECK_INTERVAL iterations
+        reason = check_stop(self._deadline, self._cancel_token)
+        if reason is not None:
+            self.stop_reason = reason
+            return 0
+        max_iterations = self.max_iterations if self.max_iterations is not None else float('inf')
+        limited = self._deadline is not None or self._cancel_token is not None
+        next_check = min(max_iterations, CHECK_INTERVAL) if limited else max_iterations
+        values, rows, columns, subgrids = grid.values, grid.rows, grid.columns, grid.subgrids
+        size, geometry = grid.size, grid.geometry
+        cell_row, cell_column, cell_subgrid = geometry.cell_row, geometry.cell_column, geometry.cell_subgrid
+        blanks = [index for index, value in enumerate(values) if value == 0]
+        minimum_remaining = self.cell_order is CellOrder.MINIMUM_REMAINING_VALUES
+
+        # The trail, one entry per depth
+        trail_cells = [0] * (len(blanks) + 1)
+        trail_placed = [False] * (len(blanks) + 1)
+        trail_options = [None] * (len(blanks) + 1)
+
+        # With a cache, the hash of the board and the solution count when each depth was entered are kept too
+        cache = self.cache
+        if cache is not None:
+            keys = zobrist_keys(geometry)
+            state_hash = zobrist_hash(values, geometry)
+            trail_hashes = [0] * (len(blanks) + 1)
+            trail_counts = [0] * (len(blanks) + 1)
+            # Solutions taken from the cache have no values, so they can only be counted when no values are needed
+            count_cached = on_solution is None and not keep_solution
+            # The first cell of a root search only tries some of its digits, so its count isn't the state's
+            first_stored = 0 if root is None else 1
+            trail_hashes[0] = state_hash
+
+        count = 0
+        depth = 0
+        if root is None:
+            index, candidates = self._choose_cell(grid, blanks, 0, minimum_remaining)
+        else:
+            index, candidates = root
+            blanks.remove(index)
+            blanks.insert(0, index)
+        if index < 0:
+            if on_solution is not None:
+                on_solution()
+            return 1  # Nothing left to fill
+        self.node_count += 1
+        if not candidates:
+            self.dead_end_count += 1
+            stats.add_dead_end(0)
+            return 0
+        trail_cells[0], trail_options[0] = index, self._digit_order(candidates)
+
+        while depth >= 0:
+            index = trail_cells[depth]
+
+            # Undo the digit tried last time at this depth
+            if trail_placed[depth]:
+                num = values[index]
+                bit = ~(1 << (num - 1))
+                values[index] = 0
+                if cache is not None:
+                    state_hash ^= keys[index * size + num - 1]
+                rows[cell_row[index]] &= bit
+                columns[cell_column[index]] &= bit
+                subgrids[cell_subgrid[index]] &= bit
+                trail_placed[depth] = False
+                if on_remove is not None:
+                    on_remove(*divmod(index, size))
+
+            options = trail_options[depth]
+            if not options:
+                if cache is not None and depth >= first_stored:
+                    cache.store(trail_hashes[depth], count - trail_counts[depth])
+                depth -= 1  # Backtrack
+                self.backtrack_count += 1
+                continue
+
+            if self.iter_count >= next_check:
+                if self.iter_count >= max_iterations:
+                    reason = StopReason.MAX_ITERATIONS
+                else:
+                    reason = check_stop(self._deadline, self._cancel_token)
+                if reason is not None:
+                    self.stop_reason = reason
+                    self.hit_max_iterations = reason is StopReason.MAX_ITERATIONS
+                    self._unwind(grid, trail_cells, trail_placed, depth, on_remove)
+                    return count
+                next_check = min(max_iterations, self.iter_count + CHECK_INTERVAL)
+            self.iter_count += 1
+
+            num = options.pop()
+            bit = 1 << (num - 1)
+            values[index] = num
+            rows[cell_row[index]] |= bit
+            columns[cell_column[index]] |= bit
+            subgrids[cell_subgrid[index]] |= bit
+            trail_placed[depth] = True
+            if cache is not None:
+                state_hash ^= keys[index * size + num - 1]
+            if on_place is not None:
+                on_place(*divmod(index, size), num)
+
+            next_index, candidates = self._choose_cell(grid, blanks, depth + 1, minimum_remaining)
+            if next_index < 0:
+                count += 1
+                if on_solution is not None:
+                    on_solution()
+                if count >= limit:
+                    if cache is not None:
+                        self._store_lower_bounds(trail_hashes, trail_counts, first_stored, depth, count)
+                    if not keep_solution:
+                        self._unwind(grid, trail_cells, trail_placed, depth, on_remove)
+                    return count
+                continue
+
+            if cache is not None:
+                self.cache_lookups += 1
+                cached = cache.get(state_hash)
+                if cached == 0:
+                    self.cache_hits += 1
+                    continue  # Already known to be a dead end
+                if cached is not None and count_cached and (cached > 0 or count - cached >= limit):
+                    self.cache_hits += 1
+                    count = min(count + abs(cached), limit)
+                    if count >= limit:
+                        self._store_lower_bounds(trail_hashes, trail_counts, first_stored, depth, count)
+                        self._unwind(grid, trail_cells, trail_placed, depth, on_remove)
+                        return count
+                    continue
+
+            self.node_count += 1
+            if not candidates:
+                self.dead_end_count += 1
+                stats.add_dead_end(depth + 1)
+                continue
+            depth += 1
+            trail_cells[depth], trail_options[depth] = next_index, self._digit_order(candidates)
+            if cache is not None:
+                trail_hashes[depth], trail_counts[depth] = state_hash, count
+        return count
+
+    def _run_backjumping_search(self, grid: BitmaskGrid, limit: int, keep_solution: bool,
+                                on_place: Optional[Callable[[int, int, int], None]],
+                                on_remove: Optional[Callable[[int, int], None]],
+                                on_solution: Optional[Callable[[], None]],
+                                root: Optional[tuple[int, int]]) -> int:
+        """
+        Runs the search with conflict-directed backjumping. Takes the same arguments as _run_search.
+        Depths are kept as bits of an int, so the conflict set of a depth is a mask of the earlier depths to blame.
+        Only the blame passed on from deeper dead ends is kept on the trail. The digits a cell never had are only
+        blamed once it runs out, as most cells never do.
+        """
+        self.iter_count = 0
+        self.node_count = 0
+        self.dead_end_count = 0
+        self.backtrack_count = 0
+        self.hit_max_iterations = False
+        self.cache_lookups = 0
+        self.cache_hits = 0
+        self.backjump_count = 0
+        stats = self.stats
+
+        reason = check_stop(self._deadline, self._cancel_token)
+        if reason is not None:
+            self.stop_reason = reason
+            return 0
+        max_iterations = self.max_iterations if self.max_iterations is not None else float('inf')
+        limited = self._deadline is not None or self._cancel_token is not None
+        next_check = min(max_iterations, CHECK_INTERVAL) if limited else max_iterations
+        values, rows, columns, subgrids = grid.values, grid.rows, grid.columns, grid.subgrids
+        size, geometry = grid.size, grid.geometry
+        cell_row, cell_column, cell_subgrid = geometry.cell_row, geometry.cell_column, geometry.cell_subgrid
+        blanks = [index for index, value in enumerate(values) if value == 0]
+        minimum_remaining = self.cell_order is CellOrder.MINIMUM_REMAINING_VALUES
+        cell_depth = [-1] * len(values)  # The depth each cell was filled at, or -1 for givens and blanks
+
+        trail_cells = [0] * (len(blanks) + 1)
+        trail_placed = [False] * (len(blanks) + 1)
+        trail_options = [None] * (len(blanks) + 1)
+        trail_conflicts = [0] * (len(blanks) + 1)
+
+        count = 0
+        depth = 0
+        if root is None:
+            index, candidates = self._choose_cell(grid, blanks, 0, minimum_remaining)
+        else:
+            index, candidates = root
+            blanks.remove(index)
+            blanks.insert(0, index)
+        if index < 0:
+            if on_solution is not None:
+                on_solution()
+            return 1  # Nothing left to fill
+        self.node_count += 1
+        if not candidates:
+            self.dead_end_count += 1
+            stats.add_dead_end(0)
+            return 0
+        trail_cells[0], trail_options[0] = index, self._digit_order(candidates)
+
+        while depth >= 0:
+            index = trail_cells[depth]
+
+            # Undo the digit tried last time at this depth
+            if trail_placed[depth]:
+                bit = ~(1 << (values[index] - 1))
+                values[index] = 0
+                rows[cell_row[index]] &= bit
+                columns[cell_column[index]] &= bit
+                subgrids[cell_subgrid[index]] &= bit
+                cell_depth[index] = -1
+                trail_placed[depth] = False
+                if on_remove is not None:
+                    on_remove(*divmod(index, size))
+
+            options = trail_options[depth]
+            if not options:
+                # Every digit failed, so jump back to the latest depth that helped rule them out. Only earlier depths
+                # are still filled, just as when the cell was chosen, so the digits it never had can be blamed now
+                conflicts = trail_conflicts[depth] | self._conflicts(geometry.peers[index], values, cell_depth)
+                depth = self._jump(grid, trail_cells, trail_placed, trail_conflicts, cell_depth, depth, conflicts,
+                                   on_remove)
+                self.backtrack_count += 1
+                continue
+
+            if self.iter_count >= next_check:
+                if self.iter_count >= max_iterations:
+                    reason = StopReason.MAX_ITERATIONS
+                else:
+                    reason = check_stop(self._deadline, self._cancel_token)
+                if reason is not None:
+                    self.stop_reason = reason
+                    self.hit_max_iterations = reason is StopReason.MAX_ITERATIONS
+                    self._unwind(grid, trail_cells, trail_placed, depth, on_remove)
+                    return count
+                next_check = min(max_iterations, self.iter_count + CHECK_INTERVAL)
+            self.iter_count += 1
+
+            num = options.pop()
+            bit = 1 << (num - 1)
+            values[index] = num
+            rows[cell_row[index]] |= bit
+            columns[cell_column[index]] |= bit
+            subgrids[cell_subgrid[index]] |= bit
+            cell_depth[index] = depth
+            trail_placed[depth] = True
+            if on_place is not None:
+                on_place(*divmod(index, size), num)
+
+            next_index, candidates = self._choose_cell(grid, blanks, depth + 1, minimum_remaining)
+            if next_index < 0:
+                count += 1
+                if on_solution is not None:
+                    on_solution()
+                if count >= limit:
+                    if not keep_solution:
+                        self._unwind(grid, trail_cells, trail_placed, depth, on_remove)
+                    return count
+                # Every depth above a solution has to go back one at a time, or the solutions next to it are missed
+                for d in range(1, depth + 1):
+                    trail_conflicts[d] |= 1 << (d - 1)
+                continue
+
+            self.node_count += 1
+            if not candidates:
+                self.dead_end_count += 1
+                stats.add_dead_end(depth + 1)
+                conflicts = self._conflicts(geometry.peers[next_index], values, cell_depth)
+                if conflicts >> depth & 1:
+                    trail_conflicts[depth] |= conflicts ^ (1 << depth)  # The digit just placed is to blame
+                else:
+                    # The cell is ruled out by earlier depths alone, so no other digit here can help
+                    depth = self._jump(grid, trail_cells, trail_placed, trail_conflicts, cell_depth, depth, conflicts,
+                                       on_remove, skip_current=False)
+                    self.backtrack_count += 1
+                continue
+            depth += 1
+            trail_cells[depth], trail_options[depth] = next_index, self._digit_order(candidates)
+            trail_conflicts[depth] = 0
+        return count
+
+    def _jump(self, grid: BitmaskGrid, trail_cells: list[int], trail_placed: list[bool], trail_conflicts: list[int],
+              cell_depth: list[int], depth: int, conflicts: int, on_remove: Optional[Callable[[int, int], None]],
+              skip_current=True) -> int:
+        """
+        Jumps back from a dead end to the latest depth in its conflict set, passing the rest of the set on to it.
+        :param depth: The deepest depth on the trail
+        :param conflicts: The conflict set of the dead end, as a mask of depths
+        :param skip_current: If true, the dead end is the cell at depth itself, rather than the cell it would fill next
+        :return: The depth jumped to, or -1 if nothing earlier can be changed to get past the dead end.
+        """
+        target = conflicts.bit_length() - 1
+        if target >= 0:
+            trail_conflicts[target] |= conflicts ^ (1 << target)
+        self.backjump_count += depth - target - (1 if skip_current else 0)
+
+        # Remove the digits of every depth jumped over. The digit at the target is undone by the main loop
+        for d in range(depth, target, -1):
+            if trail_placed[d]:
+                index = trail_cells[d]
+                x, y = divmod(index, grid.size)
+                grid.remove(x, y)
+                cell_depth[index] = -1
+                trail_placed[d] = False
+                if on_remove is not None:
+                    on_remove(x, y)
+        return target
+
+    @staticmethod
+    def _conflicts(peers: list[int], values: list[int], cell_depth: list[int]) -> int:
+        """
+        Returns the conflict set of a cell: for every digit it can't take, the earliest depth that filled a peer with
+        that digit. Digits ruled out by a given blame no depth, as no search choice could free them.
+        """
+        earliest = {}
+        for peer in peers:
+            num = values[peer]
+            if num:
+                d = cell_depth[peer]
+                if num not in earliest or d < earliest[num]:
+                    earliest[num] = d
+        conflicts = 0
+        for d in earliest.values():
+            if d >= 0:
+                conflicts |= 1 << d
+        return conflicts
+
+    def _store_lower_bounds(self, trail_hashes: list[int], trail_counts: list[int], first: int, depth: int,
+                            count: int):
+        """ Stores that every state on the trail has at least the solutions found below it, when the limit is hit. """
+        for d in range(first, depth + 1):
+            self.cache.store(trail_hashes[d], trail_counts[d] - count)
+
+    @staticmethod
+    def _choose_cell(grid: BitmaskGrid, blanks: list[int], depth: int, minimum_remaining: bool) -> tuple[int, int]:
+        """
+        Picks the next cell to branch on.
+        :return: The index and candidate mask of the cell, or an index of -1 if every cell is filled.
+        """
+        if minimum_remaining:
+            cell = grid.most_constrained_cell()
+            if cell is None:
+                return -1, 0
+            x, y, candidates = cell
+            return x * grid.size + y, candidates
+
+        if depth >= len(blanks):
+            return -1, 0
+        index = blanks[depth]
+        geometry = grid.geometry
+        used = grid.rows[geometry.cell_row[index]] | grid.columns[geometry.cell_column[index]] | \
+            grid.subgrids[geometry.cell_subgrid[index]]
+        return index, ~used & geometry.all_digits
+
+    def _digit_order(self, candidates: int) -> list[int]:
+        """ Returns the digits of a candidate mask in the reverse of the order they will be tried. """
+        digits = [num for num in range(candidates.bit_length(), 0, -1) if candidates & (1 << (num - 1))]
+        if self.shuffle:
+            self.rng.shuffle(digits)
+        return digits
+
+    @staticmethod
+    def _unwind(grid: BitmaskGrid, trail_cells: list[int], trail_placed: list[bool], depth: int,
+                on_remove: Optional[Callable[[int, int], None]]):
+        """ Removes every digit still placed on the trail, deepest first. """
+        for d in range(depth, -1, -1):
+            if trail_placed[d]:
+                x, y = divmod(trail_cells[d], grid.size)
+                grid.remove(x, y)
+                trail_placed[d] = False
+                if on_remove is not None:
+                    on_remove(x, y)
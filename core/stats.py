@@ -0,0 +1,96 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+class SolverStats:
+    """
+    Counters and timings filled in by a solve or uniqueness check.
+    Solvers start a new stats object for every public call, so the numbers always describe one whole operation,
+    however many searches it ran internally.
+    """
+
+    def __init__(self):
+        self.node_count = 0  # Cells (or exact cover columns) the search branched on
+        self.backtrack_count = 0  # Times the search stepped back up a level after running out of digits to try
+        self.candidates_tested = 0  # Digits placed by the search
+        self.propagated_count = 0  # Cells filled by naked and hidden singles before searching
+        self.solution_count = 0  # Solutions found
+        self.cache_lookups = 0  # States looked up in a transposition cache
+        self.cache_hits = 0  # Lookups that found the state, so its subtree wasn't searched
+        self.dead_ends_by_depth = {}  # Depth of the search, to the number of cells found with no candidates there
+        self.phase_times = {}  # Name of each phase, to the seconds spent in it
+
+    @property
+    def dead_end_count(self) -> int:
+        """ Returns the number of dead ends at every depth. """
+        return sum(self.dead_ends_by_depth.values())
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """ Returns the fraction of transposition cache lookups that found the state. """
+        return self.cache_hits / self.cache_lookups if self.cache_lookups else 0.0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """ Adds the wall clock time spent inside the with block to the named phase. Phases may be nested. """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + time.perf_counter() - start
+
+    def add_dead_end(self, depth: int):
+        """ Records a cell with no candidates left at the given depth. """
+        self.dead_ends_by_depth[depth] = self.dead_ends_by_depth.get(depth, 0) + 1
+
+    def merge(self, other: 'SolverStats'):
+        """ Adds the counters and timings of another stats object to this one. """
+        self.node_count += other.node_count
+        self.backtrack_count += other.backtrack_count
+        self.candidates_tested += other.candidates_tested
+        self.propagated_count += other.propagated_count
+        self.solution_count += other.solution_count
+        self.cache_lookups += other.cache_lookups
+        self.cache_hits += other.cache_hits
+        for depth, count in other.dead_ends_by_depth.items():
+            self.dead_ends_by_depth[depth] = self.dead_ends_by_depth.get(depth, 0) + count
+        for name, seconds in other.phase_times.items():
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + seconds
+
+    def as_dict(self) -> dict:
+        """ Returns the stats as plain values, ready to be serialized. """
+        return {
+            'node_count': self.node_count,
+            'backtrack_count': self.backtrack_count,
+            'candidates_tested': self.candidates_tested,
+            'propagated_count': self.propagated_count,
+            'solution_count': self.solution_count,
+            'dead_end_count': self.dead_end_count,
+            'cache_lookups': self.cache_lookups,
+            'cache_hits': self.cache_hits,
+            'dead_ends_by_depth': dict(sorted(self.dead_ends_by_depth.items())),
+            'phase_times': dict(self.phase_times),
+        }
+
+    def __str__(self):
+        phases = ', '.join(f'{name} {seconds * 1000:.1f}ms' for name, seconds in self.phase_times.items())
+        cache = f', {self.cache_hit_rate:.0%} of {self.cache_lookups} cache lookups hit' if self.cache_lookups else ''
+        return (f'{self.node_count} nodes, {self.backtrack_count} backtracks, {self.dead_end_count} dead ends, '
+                f'{self.candidates_tested} candidates tested, {self.propagated_count} propagated, '
+                f'{self.solution_count} solutions{cache}' + (f' ({phases})' if phases else ''))
+
+
+def log_stats(logger: logging.Logger = None, level=logging.DEBUG, label='solver') -> Callable[[SolverStats], None]:
+    """
+    Creates a stats hook that writes every stats object it receives to a logger.
+    :param logger: The logger to write to, defaulting to the one for this module
+    :param level: The level to log at
+    :param label: Written in front of each message, to tell solvers apart
+    """
+    logger = logging.getLogger(__name__) if logger is None else logger
+
+    def hook(stats: SolverStats):
+        logger.log(level, '%s: %s', label, stats)
+    return hook
@@ -0,0 +1,165 @@
+import struct
+from array import array
+from typing import Optional
+
+from core.cancellation import CancellationToken, StopReason
+from core.geometry import BoardGeometry
+from core.grid import BitmaskGrid
+from core.solver import BacktrackMode, CellOrder, GridSolver
+
+DIGIT_MASK = 0x1F  # The digit takes the lowest 5 bits, enough for the 25 digits of a 25x25 board
+REMOVE_FLAG = 1 << 5  # Set on events that remove a digit
+CELL_SHIFT = 6  # The cell index takes the top 10 bits, enough for the 625 cells of a 25x25 board
+
+TRACE_MAGIC = b'SDKT'
+TRACE_VERSION = 3
+_HEADER = struct.Struct('<4sHIIB')  # Magic, version, keyframe interval, event count, stop reason. Then the cell count
+_CELL_COUNT_FIELD = struct.Struct('<H')
+
+
+class SolveTrace:
+    """
+    A recording of every placement and removal made while solving a board.
+    Each event is packed into one unsigned short: the cell index, a remove flag and the digit, so a trace of a
+    million steps takes 2MB on any board up to 25x25. Removals keep their digit, which lets the board be stepped
+    backwards as well as forwards.
+    A snapshot of the board is kept every keyframe_interval events, so any step can be rebuilt by replaying at most
+    that many events from the nearest keyframe.
+    """
+
+    def __init__(self, initial: list[int], keyframe_interval=1024):
+        self.size = BoardGeometry.for_cell_count(len(initial)).size  # Cells in each row of the board
+        self.initial = bytes(initial)  # The board before the first event
+        self.keyframe_interval = keyframe_interval
+        self.events = array('H')
+        self.keyframes = [self.initial]  # Keyframe k is the board after k * keyframe_interval events
+        self._current = bytearray(initial)  # The board after the last event recorded
+        self.solved = False  # Whether the trace ends with the board solved
+        self.stop_reason = StopReason.COMPLETED  # Why the recorded search stopped
+
+    def __len__(self):
+        return len(self.events)
+
+    def place(self, x: int, y: int, num: int):
+        """ Records a digit placed at (x, y). Has the signature of the on_place callback of GridSolver. """
+        index = x * self.size + y
+        self._current[index] = num
+        self._append((index << CELL_SHIFT) | num)
+
+    def remove(self, x: int, y: int):
+        """ Records the digit at (x, y) being removed. Has the signature of the on_remove callback of GridSolver. """
+        index = x * self.size + y
+        num = self._current[index]
+        self._current[index] = 0
+        self._append((index << CELL_SHIFT) | REMOVE_FLAG | num)
+
+    def _append(self, event: int):
+        """ Adds an event, taking a keyframe when one is due. """
+        self.events.append(event)
+        if len(self.events) % self.keyframe_interval == 0:
+            self.keyframes.append(bytes(self._current))
+
+    @staticmethod
+    def decode(event: int) -> tuple[int, int, bool]:
+        """ Unpacks an event into the cell index, the digit, and whether it was placed rather than removed. """
+        return event >> CELL_SHIFT, event & DIGIT_MASK, not event & REMOVE_FLAG
+
+    def state_at(self, step: int) -> list[int]:
+        """
+        Rebuilds the board after the first step events.
+        :param step: The number of events to apply, from 0 to the length of the trace
+        :return: The values of the board, with 0 for blanks.
+        """
+        step = max(0, min(step, len(self.events)))
+        keyframe = min(step // self.keyframe_interval, len(self.keyframes) - 1)
+        values = bytearray(self.keyframes[keyframe])
+        for event in self.events[keyframe * self.keyframe_interval:step]:
+            values[event >> CELL_SHIFT] = 0 if event & REMOVE_FLAG else event & DIGIT_MASK
+        return list(values)
+
+    def final_state(self) -> list[int]:
+        """ Returns the board after every event. """
+        return list(self._current)
+
+    def to_bytes(self) -> bytes:
+        """ Serializes the trace. Keyframes are not saved, as they are rebuilt when loading. """
+        events = array('H', self.events)
+        if events.itemsize != 2:  # pragma: no cover
+            raise ValueError('Unsigned shorts must be 2 bytes to save a trace')
+        if struct.pack('=H', 1) != struct.pack('<H', 1):  # pragma: no cover
+            events.byteswap()
+        return _HEADER.pack(TRACE_MAGIC, TRACE_VERSION, self.keyframe_interval, len(events), self.stop_reason.value) + \
+            _CELL_COUNT_FIELD.pack(len(self.initial)) + self.initial + events.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'SolveTrace':
+        """
+        Loads a trace written by to_bytes, replaying it to rebuild the keyframes.
+        Raises ValueError if the data isn't a trace, or has a cell or digit that doesn't fit the board.
+        """
+        if len(data) < _HEADER.size + _CELL_COUNT_FIELD.size:
+            raise ValueError('Too short to be a solve trace')
+        magic, version, keyframe_interval, count, stop_reason = _HEADER.unpack_from(data)
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            raise ValueError('Not a solve trace, or written by an unsupported version')
+        if stop_reason not in {reason.value for reason in StopReason}:
+            raise ValueError('Solve trace has an unknown stop reason')
+        cell_count, = _CELL_COUNT_FIELD.unpack_from(data, _HEADER.size)
+        start = _HEADER.size + _CELL_COUNT_FIELD.size
+        if BoardGeometry.for_cell_count(cell_count) is None or len(data) < start + cell_count + count * 2:
+            raise ValueError('Solve trace is truncated or has an unsupported board size')
+        trace = cls(list(data[start:start + cell_count]), keyframe_interval)
+        trace.stop_reason = StopReason(stop_reason)
+        if max(trace.initial) > trace.size:
+            raise ValueError('Solve trace has a digit too large for its board')
+
+        events = array('H')
+        events.frombytes(data[start + cell_count:start + cell_count + count * 2])
+        if struct.pack('=H', 1) != struct.pack('<H', 1):  # pragma: no cover
+            events.byteswap()
+        for event in events:
+            index, num, placed = cls.decode(event)
+            if index >= cell_count or num > trace.size:
+                raise ValueError('Solve trace has an event outside its board')
+            trace._current[index] = num if placed else 0
+            trace._append(event)
+        trace.solved = all(trace._current)
+        return trace
+
+    def save(self, path: str):
+        """ Writes the trace to a file. """
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'SolveTrace':
+        """ Reads a trace written by save. """
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+
+def record_solve(values: list[int], cell_order: CellOrder = CellOrder.ROW_MAJOR, use_propagation=True,
+                 max_iterations: Optional[int] = None, deadline: Optional[float] = None,
+                 cancel_token: Optional[CancellationToken] = None, keyframe_interval=1024,
+                 backtrack_mode: BacktrackMode = BacktrackMode.CHRONOLOGICAL) -> SolveTrace:
+    """
+    Solves a board, recording every step the way BacktrackingSolver takes them: forced cells first, then the search.
+    :param values: The board as a flat list of values, with 0 for blanks
+    :return: The trace, with solved and stop_reason set. A trace that isn't solved ends back at the starting board.
+    """
+    trace = SolveTrace(values, keyframe_interval)
+    grid = BitmaskGrid.from_values(values)
+    propagated = grid.propagate() if use_propagation else []
+    if propagated is None:
+        return trace
+    for x, y in propagated:
+        trace.place(x, y, grid.get(x, y))
+
+    search = GridSolver(cell_order, max_iterations, backtrack_mode=backtrack_mode)
+    trace.solved = search.solve(grid, on_place=trace.place, on_remove=trace.remove, deadline=deadline,
+                                cancel_token=cancel_token)
+    trace.stop_reason = search.stop_reason
+    if not trace.solved:
+        for x, y in reversed(propagated):
+            trace.remove(x, y)
+    return trace
@@ -0,0 +1,82 @@
+import random
+from collections import OrderedDict
+from typing import Optional
+
+from core.geometry import BoardGeometry
+
+ZOBRIST_SEED = 0x5D0C  # Fixed, so a board hashes the same in every process and every run
+
+_keys = {}  # Board size, to its Zobrist keys
+
+
+def zobrist_keys(geometry: BoardGeometry) -> list[int]:
+    """
+    Returns a random 64 bit key for every digit in every cell of a board, at index * size + digit - 1.
+    The hash of a board is the XOR of the keys of its placed digits, so placing or removing a digit updates the hash
+    with a single XOR.
+    """
+    if geometry.size not in _keys:
+        rng = random.Random(ZOBRIST_SEED + geometry.size)
+        _keys[geometry.size] = [rng.getrandbits(64) for _ in range(geometry.cell_count * geometry.size)]
+    return _keys[geometry.size]
+
+
+def zobrist_hash(values: list[int], geometry: BoardGeometry) -> int:
+    """ Returns the Zobrist hash of a board, given as a flat list of values with 0 for blanks. """
+    keys, size = zobrist_keys(geometry), geometry.size
+    state_hash = 0
+    for index, num in enumerate(values):
+        if num:
+            state_hash ^= keys[index * size + num - 1]
+    return state_hash
+
+
+class TranspositionCache:
+    """
+    Bounded cache of partial boards whose number of completions is already known, keyed by Zobrist hash.
+    The completions of a partial board don't depend on the puzzle or the search that reached it, so one cache can be
+    shared by every check a generator makes. Removing one symmetrical group barely changes the tree, so a hit near
+    the top of the next check's search often skips a large subtree the last check already searched.
+
+    A stored count of 0 or more is exact. A negative count -n means at least n completions were found before the
+    search stopped at its limit. When full, the least recently used state is dropped.
+    """
+
+    def __init__(self, max_entries=1 << 16):
+        self.max_entries = max_entries
+        self.hit_count = 0  # Lookups that found a state, over the life of the cache
+        self.lookup_count = 0  # Every lookup, over the life of the cache
+        self.eviction_count = 0  # States dropped to make room
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """ Returns the fraction of lookups that found a state. """
+        return self.hit_count / self.lookup_count if self.lookup_count else 0.0
+
+    def get(self, state_hash: int) -> Optional[int]:
+        """ Returns the count stored for a state, or None if it isn't known. """
+        self.lookup_count += 1
+        count = self._entries.get(state_hash)
+        if count is not None:
+            self.hit_count += 1
+            self._entries.move_to_end(state_hash)
+        return count
+
+    def store(self, state_hash: int, count: int):
+        """
+        Stores the number of completions of a state.
+        :param count: The exact count, or minus the number found if the search stopped before finishing the state
+        """
+        self._entries[state_hash] = count
+        self._entries.move_to_end(state_hash)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.eviction_count += 1
+
+    def clear(self):
+        """ Drops every state, keeping the counters. """
+        self._entries.clear()
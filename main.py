@@ -1,8 +1,15 @@
 ﻿from typing import Union, Tuple, Callable
+import argparse
 import tkinter as tk
-from tkinter import Event
+from tkinter import Event, messagebox
 
 from controllers.board_controller import BoardController
+from core.cancellation import StopReason
+from core.generator import PuzzleGenerator
+from core.geometry import BoardGeometry
+from core.puzzle_bank import PuzzleBank
+from core.puzzle_pool import PuzzlePool
+from core.transposition import TranspositionCache
 from models.cell_value_type import CellValueType
 from observers.board_end_observer import BoardEndObserver
 from observers.board_start_observer import BoardStartObserver
@@ -10,9 +17,9 @@ from observers.conflict_observer import ConflictObserver
 from observers.is_solved_observer import IsSolvedObserver
 from utils.timer import Timer
 from undo_history.undo_history_manager import UndoHistoryManager
-from utils.backtracking_solver import BacktrackingSolver
-from utils.constants import BACKGROUND_COLOR, BOARD_SIZE
+from utils.constants import BACKGROUND_COLOR, BOARD_SIZE, SUBGRID_SIZE
 from utils.hint_manager import HintManager
+from utils.solve_animator import SolveAnimator
 from utils.sudoku_generator import SudokuGenerator
 from views.action_button import ActionButton, DEFAULT_WIDTH
 from views.drop_down_menu import DropdownMenu
@@ -22,9 +29,15 @@ from views.mode_button import ModeButton
 
 class SudokuApp:
     PADX = (0, 20)
+    EASY, MEDIUM, HARD = 35, 40, 50  # Cells removed from a 9x9 board at each difficulty
+    POOL_DEPTH = 2  # Puzzles kept ready for each difficulty
 
-    def __init__(self, root):
-        """Initialize the Sudoku application."""
+    def __init__(self, root, subgrid_size=SUBGRID_SIZE, bank_path: str = None):
+        """
+        Initialize the Sudoku application.
+        :param subgrid_size: Cells along each side of a subgrid: 3 for a 9x9 board, 4 for 16x16 or 5 for 25x25
+        :param bank_path: A puzzle bank to save new puzzles to, and draw from when none are ready. Up to 16x16 only
+        """
         self.root = root
         self.root.title("Sudoku")
         self.root.configure(bg=BACKGROUND_COLOR)
@@ -37,7 +50,7 @@ class SudokuApp:
         self.bottom_row = self.create_frame(self.side_frame, row=4, column=0, padx=SudokuApp.PADX, pady=(10, 0))
 
         self.undo_history_manager = UndoHistoryManager()
-        self.board_controller = BoardController(self.grid_frame, self.undo_history_manager)
+        self.board_controller = BoardController(self.grid_frame, self.undo_history_manager, subgrid_size)
         self.create_widgets()
 
         # Initialize BoardController
@@ -52,51 +65,79 @@ class SudokuApp:
         self.timer = Timer(self.top_row)
         self.timer.grid(row=0, column=3, sticky="w", padx=5, pady=10)
 
+        # Keep puzzles of every difficulty ready, made in the background between games
+        geometry = BoardGeometry.of(subgrid_size)
+        # A 9x9 bank skips puzzles it already holds in disguise, so games drawn from it don't repeat
+        self.bank = None if bank_path is None else PuzzleBank(bank_path, geometry, unique=subgrid_size == 3)
+        target_counts = [self.scale_target_count(count) for count in (SudokuApp.EASY, SudokuApp.MEDIUM, SudokuApp.HARD)]
+        self.puzzle_pool = PuzzlePool({count: PuzzleGenerator(count, geometry=geometry, cache=TranspositionCache())
+                                       for count in target_counts}, SudokuApp.POOL_DEPTH, self.bank)
+
         # Create observers
         self.conflict_observer = ConflictObserver(self.board_controller.model)
         self.is_solved_observer = IsSolvedObserver(self.board_controller.model)
-        self.board_start_observer = BoardStartObserver(self.board_controller.model, self.timer)
-        self.board_end_observer = BoardEndObserver(self.is_solved_observer, self.timer,
-                                                   self.board_controller, self.board_start_observer)
+        self.board_start_observer = BoardStartObserver(self.board_controller.model, self.timer, self.puzzle_pool)
+        self.board_end_observer = BoardEndObserver(self.is_solved_observer, self.timer, self.board_controller,
+                                                   self.board_start_observer, self.puzzle_pool)
 
         # Create other utility classes
-        self.backtracking_solver = BacktrackingSolver(self.board_controller, ui_display_mode=True)
+        self.solve_animator = SolveAnimator(self.board_controller, self.root)
         self.hint_manager = HintManager()
 
-        # Generate an easy board to start
+        # Generate an easy board to start, then fill the pools while the user looks at it
         self.easy_command(None)
+        self.puzzle_pool.start()
 
     # Commands for difficulty creation
     def easy_command(self, event: Event):
         """ Generate easy puzzle. """
-        self.start_new_game(35)
+        self.start_new_game(SudokuApp.EASY)
 
     def medium_command(self, event: Event):
         """ Generate medium puzzle. """
-        self.start_new_game(40)
+        self.start_new_game(SudokuApp.MEDIUM)
 
     def hard_command(self, event: Event):
         """ Generate hard puzzle. """
-        self.start_new_game(50)
+        self.start_new_game(SudokuApp.HARD)
 
     def start_new_game(self, target_count: int):
         """
-        Creates a puzzle generator to use for new games. Clears old data from previous game.
-        :param target_count: Determines how many cells will be cleared.
+        Creates a puzzle generator to use for new games, taking its puzzles from the pool. Clears old data from
+        previous game.
+        :param target_count: Determines how many cells will be cleared from a 9x9 board. Bigger boards clear the same
+                             share of their cells.
         """
+        target_count = self.scale_target_count(target_count)
+        self.solve_animator.cancel(discard_events=True)
         self.hint_manager.clear_cache()
-        self.generator = SudokuGenerator(self.board_controller, self.hint_manager, self.timer, target_count)
+        self.generator = SudokuGenerator(self.board_controller, self.hint_manager, self.timer, target_count,
+                                         puzzle_pool=self.puzzle_pool)
         self.generator.generate_board()
+        self.puzzle_pool.resume()
+        self.board_start_observer.game_has_started = False  # So the pool pauses again once this game starts
         self.undo_history_manager.clear_history()
         NumberButton.disable_all()
 
+    def close(self):
+        """ Stops filling the puzzle pools, then closes the puzzle bank, writing its index. """
+        self.puzzle_pool.close()
+        if self.bank is not None:
+            self.bank.close()
+
+    def scale_target_count(self, target_count: int) -> int:
+        """ Scales the cells to clear from a 9x9 board to the same share of the cells on this board. """
+        return round(target_count * self.board_controller.size ** 2 / BOARD_SIZE ** 2)
+
     def create_widgets(self):
         """ Create and configure the widgets for the Sudoku application. """
 
-        # Create the grid of number buttons
-        for i in range(BOARD_SIZE):
-            number_button = NumberButton(self.number_grid, self.board_controller, i + 1)
-            number_button.grid(row=i % 3, column=int(i / 3), padx=5, pady=5)
+        # Create the grid of number buttons, laid out like a subgrid and shrunk to keep the same overall width
+        subgrid_size = self.board_controller.model.subgrid_size
+        button_width = NumberButton.WIDTH * SUBGRID_SIZE // subgrid_size
+        for i in range(self.board_controller.size):
+            number_button = NumberButton(self.number_grid, self.board_controller, i + 1, width=button_width)
+            number_button.grid(row=i % subgrid_size, column=int(i / subgrid_size), padx=5, pady=5)
 
         # Create action buttons
         padx = 2
@@ -119,14 +160,14 @@ class SudokuApp:
 
         # Create large buttons
         self.create_large_button('New Game', row=1, pady=0, command=self.new_game_command)
-        self.create_large_button('Solve', row=5, pady=10, command=lambda e: self.backtracking_solver.solve())
+        self.create_large_button('Solve', row=5, pady=10, command=self.solve_command)
 
     def auto_notes_command(self, event):
         """ Auto populates all cells with valid notes. """
         for cell in self.board_controller.cells_flat:
 
             # Get possible notes
-            possible_values = list(range(1, BOARD_SIZE + 1))
+            possible_values = list(range(1, self.board_controller.size + 1))
 
             # Skip Given or Entries
             if cell.model.value_type is CellValueType.GIVEN or cell.model.value_type is CellValueType.ENTRY:
@@ -144,9 +185,28 @@ class SudokuApp:
             for possible_value in possible_values:
                 cell.model.toggle_note(possible_value)
 
+    def solve_command(self, event):
+        """
+        Solves the board in the background, so the window stays responsive, then plays the solve back.
+        Pressing Solve again stops the search, or skips to the end of the playback.
+        """
+        if self.solve_animator.is_recording():
+            self.solve_animator.cancel()
+        elif self.solve_animator.is_running():
+            self.solve_animator.jump_to_end()
+        else:
+            self.solve_animator.start(self.on_solve_done)
+
+    def on_solve_done(self, solved: bool):
+        """ Tells the user when the solve found no solution, either because there is none or it gave up searching. """
+        if not solved and self.solve_animator.stop_reason is not StopReason.CANCELLED:
+            messagebox.showinfo("Solve", "No solution found.")
+
     def new_game_command(self, event):
         """ Generates a new board, reset all cells and states for a new game. """
+        self.solve_animator.cancel(discard_events=True)
         self.generator.generate_board()
+        self.puzzle_pool.resume()
         self.board_controller.return_to_default()
         self.board_controller.can_select = True
         self.board_start_observer.game_has_started = False
@@ -178,6 +238,15 @@ class SudokuApp:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Play sudoku.')
+    parser.add_argument('--size', type=int, choices=[9, 16, 25], default=BOARD_SIZE,
+                        help='Cells along each side of the board')
+    parser.add_argument('--bank', help='Puzzle bank file to save puzzles to and draw them from, up to 16x16')
+    args = parser.parse_args()
+    if args.bank is not None and args.size > 16:
+        parser.error('puzzle banks hold boards up to 16x16')
+
     root = tk.Tk()
-    app = SudokuApp(root)
+    app = SudokuApp(root, {9: 3, 16: 4, 25: 5}[args.size], args.bank)
     root.mainloop()
+    app.close()
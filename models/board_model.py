@@ -1,18 +1,20 @@
 ﻿from models.cell_model import CellModel
 from models.subject import Subject
-from utils.constants import BOARD_SIZE
+from utils.constants import SUBGRID_SIZE
 
 
 class BoardModel(Subject):
     """ Contains the data and cell models for the Board Controller class. """
-    def __init__(self):
+    def __init__(self, subgrid_size=SUBGRID_SIZE):
         super().__init__()
-        self.cells: list[list['CellModel']] = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        self.subgrid_size = subgrid_size  # Cells along each side of a subgrid, 3 for a 9x9 board
+        self.size = subgrid_size * subgrid_size  # Cells along each side of the board
+        self.cells: list[list['CellModel']] = [[None for _ in range(self.size)] for _ in range(self.size)]
 
     def populate_board(self, numbers):
         """ Assigns the cell models with the given numbers. """
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
+        for x in range(self.size):
+            for y in range(self.size):
                 if numbers[x][y] != 0:
                     self.cells[x][y].set_given(numbers[x][y])
 
@@ -1,14 +1,16 @@
-﻿from models.cell_value_type import CellValueType
+﻿from typing import Optional
+
+from models.cell_value_type import CellValueType
 from models.subject import Subject
 from utils.constants import BOARD_SIZE
 
 
 class CellModel(Subject):
     """ Handles all the data for the cell controller, including value, notes, and various states. """
-    def __init__(self, x: int, y: int):
+    def __init__(self, x: int, y: int, size=BOARD_SIZE):
         super().__init__()
         self.x, self.y = x, y
-        self.value, self.notes = None, [False] * BOARD_SIZE
+        self.value, self.notes = None, [False] * size  # One note for each digit of a board of the given size
         self.in_conflict = False
         self.is_selected = False
         self.value_type = CellValueType.BLANK
@@ -40,13 +42,24 @@ class CellModel(Subject):
         self.value_type = CellValueType.GIVEN
         self.notify()
 
+    def load(self, number: Optional[int]):
+        """
+        Resets the cell for a new puzzle, even if it was a given, without notifying observers.
+        The board notifies every cell once they are all loaded, so each view is only redrawn once.
+        :param number: The given to show, or None for a blank cell
+        """
+        self.value = number
+        self.in_conflict = False
+        self.notes = [False] * len(self.notes)
+        self.value_type = CellValueType.BLANK if number is None else CellValueType.GIVEN
+
     def clear(self):
         """ Clears all contents of the cell, both value and all notes. Sets the state back to BLANK. """
         if self.is_given():
             return
         self.value = None
         self.in_conflict = False
-        self.notes = [False] * BOARD_SIZE
+        self.notes = [False] * len(self.notes)
         self.value_type = CellValueType.BLANK
         self.notify()
 
@@ -121,6 +134,6 @@ def get_possible_values(cell: CellModel) -> set[int]:
     If this returns an empty list, then a conflict must exist somewhere.
     :param cell: The cell to get the possible values of.
     """
-    possible_values = set(range(1, BOARD_SIZE + 1))
+    possible_values = set(range(1, len(cell.notes) + 1))
     used_values = {c.value for c in cell.get_house() if c.value is not None}
     return possible_values - used_values
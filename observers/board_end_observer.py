@@ -1,4 +1,5 @@
 ﻿from controllers.board_controller import BoardController
+from core.puzzle_pool import PuzzlePool
 from observers.board_start_observer import BoardStartObserver
 from observers.is_solved_observer import IsSolvedObserver
 from observers.observer import Observer
@@ -9,8 +10,9 @@ from views.number_button import NumberButton
 class BoardEndObserver(Observer):
     """ Observers the IsSolvedObserver, to know when the game has been beaten so we can do game clear stuff. """
     def __init__(self, is_solved_observer: IsSolvedObserver, timer: Timer, board_controller: BoardController,
-                 board_start: BoardStartObserver):
+                 board_start: BoardStartObserver, puzzle_pool: PuzzlePool = None):
         self.timer = timer
+        self.puzzle_pool = puzzle_pool  # Refilled again once the game is over
         self.is_solved_observer = is_solved_observer
         self.is_solved_observer.attach(self)
         self.board_controller = board_controller
@@ -22,3 +24,5 @@ class BoardEndObserver(Observer):
         self.board_controller.can_select = False
         self.timer.stop()
         NumberButton.disable_all()
+        if self.puzzle_pool is not None:
+            self.puzzle_pool.resume()
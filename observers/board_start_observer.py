@@ -1,18 +1,25 @@
-﻿from models.board_model import BoardModel
+﻿from core.puzzle_pool import PuzzlePool
+from models.board_model import BoardModel
 from observers.observer import Observer
 from utils.timer import Timer
 
 
 class BoardStartObserver(Observer):
     """ Observers the board model, waiting for the user to select the first cell which determines the game start. """
-    def __init__(self, board_model: BoardModel, timer: Timer):
+    def __init__(self, board_model: BoardModel, timer: Timer, puzzle_pool: PuzzlePool = None):
         self.timer = timer
+        self.puzzle_pool = puzzle_pool  # Paused while the user solves, so refilling it doesn't slow the board down
         self.board_model = board_model
         self.board_model.attach(self)
         self.game_has_started = False
 
     def update(self):
-        """ Only updates once per game, once the first cell is selected. This starts the game timer. """
+        """
+        Only updates once per game, once the first cell is selected. This starts the game timer and pauses the puzzle
+        pool.
+        """
         if not self.game_has_started and self.board_model.is_any_cell_selected():
             self.game_has_started = True
             self.timer.start()
+            if self.puzzle_pool is not None:
+                self.puzzle_pool.pause()
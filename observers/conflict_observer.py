@@ -3,7 +3,6 @@ from enum import Enum
 from models.board_model import BoardModel
 from models.cell_model import CellModel
 from observers.observer import Observer
-from utils.constants import BOARD_SIZE
 
 
 class ConflictObserver(Observer):
@@ -17,11 +16,15 @@ class ConflictObserver(Observer):
         self.detect_conflicts()
 
     def detect_conflicts(self):
-        """ Loops through each coordinate, updating the conflict status based on whether a conflict exists. """
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                cell_model = self.board_model.cells[x][y]
-                cell_model.set_conflict_status(self.has_conflict(cell_model, cell_model.get_house()))
+        """
+        Loops through each cell, updating the conflict status based on whether a conflict exists.
+        Only cells whose status changed are updated, so a move redraws a handful of cells rather than the whole board.
+        """
+        for row in self.board_model.cells:
+            for cell_model in row:
+                in_conflict = self.has_conflict(cell_model, cell_model.get_house())
+                if in_conflict != cell_model.in_conflict:
+                    cell_model.set_conflict_status(in_conflict)
 
     @staticmethod
     def has_conflict(cell_model: CellModel, house: list[CellModel]) -> bool:
@@ -1,14 +1,16 @@
 ﻿import unittest
 from tkinter import Tk
 from unittest.mock import Mock, MagicMock
-import time
 
 from models.cell_model import CellModel
 from models.cell_value_type import CellValueType
 from controllers.board_controller import BoardController
 from undo_history.undo_history_manager import UndoHistoryManager
 from utils.constants import BOARD_SIZE
-from utils.backtracking_solver import BacktrackingSolver
+from core.cancellation import CancellationToken, StopReason, deadline_in
+from core.solver import BacktrackMode
+from core.transposition import TranspositionCache
+from utils.backtracking_solver import BacktrackingSolver, CellOrder
 from utils.sudoku_generator import SudokuGenerator
 from views.number_button import NumberButton
 
@@ -19,8 +21,7 @@ class TestBacktrackingSolver(unittest.TestCase):
         self.root = Tk()
         self.root.withdraw()
         self.board_controller = BoardController(self.root, UndoHistoryManager())
-        self.generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock(), solver=Mock(),
-                                         target_count=50)
+        self.generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock(), target_count=50)
 
         self.board_controller.cells[0][0].view.update_value_label = Mock()
         self.board_controller.view.update = Mock()
@@ -76,32 +77,6 @@ class TestBacktrackingSolver(unittest.TestCase):
         self.assertFalse(self.solver._is_valid_placement(self.board_controller, 0, 0, 3))
         self.assertTrue(self.solver._is_valid_placement(self.board_controller, 0, 0, 4))
 
-    def test_adjust_update_frequency(self):
-        """ Test the _adjust_update_frequency method. """
-        self.solver.start_time = time.time() - 6
-        self.solver._adjust_update_frequency()
-        self.assertEqual(self.solver.step_display, 200)
-
-        self.solver.start_time = time.time() - 4.75
-        self.solver._adjust_update_frequency()
-        self.assertEqual(self.solver.step_display, 100)
-
-        self.solver.start_time = time.time() - 4.25
-        self.solver._adjust_update_frequency()
-        self.assertEqual(self.solver.step_display, 50)
-
-        self.solver.start_time = time.time() - 3.5
-        self.solver._adjust_update_frequency()
-        self.assertEqual(self.solver.step_display, 20)
-
-        self.solver.start_time = time.time() - 2.5
-        self.solver._adjust_update_frequency()
-        self.assertEqual(self.solver.step_display, 10)
-
-        self.solver.start_time = time.time() - 1.5
-        self.solver._adjust_update_frequency()
-        self.assertEqual(self.solver.step_display, 2)
-
     def test_place_number(self):
         """ Test the _place_number method. """
         self.solver._place_number(0, 0, 5)
@@ -156,10 +131,143 @@ class TestBacktrackingSolver(unittest.TestCase):
 
         self.assertFalse(solver.has_unique_solution(), "Expected the board to have multiple solutions")
 
+    def test_minimum_remaining_values_unique(self):
+        """ The most constrained cell order reaches the same answers as row major order. """
+        for board_values, expected in ((self.UNIQUE_BOARD, True), (self.NON_UNIQUE_BOARD, False)):
+            board_controller = self.create_board_controller(board_values)
+            solver = BacktrackingSolver(board_controller, cell_order=CellOrder.MINIMUM_REMAINING_VALUES)
+            self.assertEqual(solver.has_unique_solution(), expected)
+
+    def test_minimum_remaining_values_visits_fewer_nodes(self):
+        """ Branching on the most constrained cell visits fewer nodes than row major order. """
+        row_major = BacktrackingSolver(self.create_board_controller(self.UNIQUE_BOARD), use_propagation=False)
+        row_major.has_unique_solution()
+        mrv = BacktrackingSolver(self.create_board_controller(self.UNIQUE_BOARD),
+                                 cell_order=CellOrder.MINIMUM_REMAINING_VALUES, use_propagation=False)
+        mrv.has_unique_solution()
+        self.assertLess(mrv.node_count, row_major.node_count)
+
+    def test_minimum_remaining_values_solve(self):
+        """ Solving with the most constrained cell order fills the board. """
+        board_controller = self.create_board_controller(self.UNIQUE_BOARD)
+        solver = BacktrackingSolver(board_controller, cell_order=CellOrder.MINIMUM_REMAINING_VALUES)
+        self.assertTrue(solver.solve())
+        self.assertTrue(all(cell.model.value is not None for row in board_controller.cells for cell in row))
+        self.assertEqual(solver.dead_end_count, 0)
+
+    def test_count_solutions(self):
+        """ Counts up to the limit and returns the solutions without changing the board. """
+        board_controller = self.create_board_controller(self.NON_UNIQUE_BOARD)
+        solver = BacktrackingSolver(board_controller)
+        solutions = []
+        self.assertEqual(solver.count_solutions(5, solutions), 2)
+        self.assertEqual(solver.solutions, 2)
+        self.assertEqual(len(solutions), 2)
+        self.assertNotEqual(solutions[0], solutions[1])
+        self.assertIsNone(board_controller.cells[0][2].model.value)
+        self.assertEqual(solver.count_solutions(1), 1)
+
+    def test_has_unique_solution_with_known_solution(self):
+        """ Passing the known solution gives the same answers as a full count. """
+        solutions = []
+        BacktrackingSolver(self.create_board_controller(self.UNIQUE_BOARD)).count_solutions(1, solutions)
+
+        solver = BacktrackingSolver(self.create_board_controller(self.UNIQUE_BOARD))
+        self.assertTrue(solver.has_unique_solution(solutions[0]))
+        solver = BacktrackingSolver(self.create_board_controller(self.NON_UNIQUE_BOARD))
+        self.assertFalse(solver.has_unique_solution(solutions[0]))
+        self.assertFalse(solver.has_unique_solution(solutions[0], removed_cells=[(8, 7)]))
+
+    def test_has_unique_solution_cached(self):
+        """ With a cache, uniqueness checks count the solutions, and share what they find between boards. """
+        solutions = []
+        BacktrackingSolver(self.create_board_controller(self.UNIQUE_BOARD)).count_solutions(1, solutions)
+        cache = TranspositionCache()
+
+        solver = BacktrackingSolver(self.create_board_controller(self.UNIQUE_BOARD), cache=cache)
+        self.assertTrue(solver.has_unique_solution(solutions[0]))
+        solver = BacktrackingSolver(self.create_board_controller(self.NON_UNIQUE_BOARD), cache=cache)
+        self.assertFalse(solver.has_unique_solution(solutions[0], removed_cells=[(8, 7)]))
+        self.assertEqual(solver.solutions, 2)
+        self.assertGreater(solver.stats.cache_lookups, 0)
+
+    def test_backjumping(self):
+        """ Backjumping gives the same answers, but can't share a cache. """
+        solver = BacktrackingSolver(self.create_board_controller(self.UNIQUE_BOARD), use_propagation=False,
+                                    backtrack_mode=BacktrackMode.CONFLICT_DIRECTED)
+        self.assertEqual(solver.count_solutions(), 1)
+        solver = BacktrackingSolver(self.create_board_controller(self.NON_UNIQUE_BOARD),
+                                    backtrack_mode=BacktrackMode.CONFLICT_DIRECTED)
+        self.assertEqual(solver.count_solutions(), 2)
+        with self.assertRaises(ValueError):
+            BacktrackingSolver(self.create_board_controller(self.UNIQUE_BOARD), cache=TranspositionCache(),
+                               backtrack_mode=BacktrackMode.CONFLICT_DIRECTED)
+
+    def test_propagation_solves_without_search(self):
+        """ An easy board is filled entirely by propagation, without branching. """
+        board_controller = self.create_board_controller(self.UNIQUE_BOARD)
+        solver = BacktrackingSolver(board_controller)
+        self.assertTrue(solver.solve())
+        self.assertEqual(solver.propagated_count, 51)
+        self.assertEqual(solver.searched_count, 0)
+        self.assertEqual(solver.node_count, 0)
+
+    def test_without_propagation(self):
+        """ Turning propagation off leaves all the work to the search. """
+        board_controller = self.create_board_controller(self.UNIQUE_BOARD)
+        solver = BacktrackingSolver(board_controller, use_propagation=False)
+        self.assertTrue(solver.solve())
+        self.assertEqual(solver.propagated_count, 0)
+        self.assertEqual(solver.searched_count, 51)
+
+    def test_cancelled_solve(self):
+        """ A cancelled solve stops, reports why, and leaves the board the way it was found. """
+        board_controller = self.create_board_controller(self.NON_UNIQUE_BOARD)
+        solver = BacktrackingSolver(board_controller, use_propagation=False)
+        token = CancellationToken()
+        token.cancel()
+        self.assertFalse(solver.solve(cancel_token=token))
+        self.assertEqual(solver.stop_reason, StopReason.CANCELLED)
+        self.assertIsNone(board_controller.cells[0][2].model.value)
+
+        self.assertFalse(solver.has_unique_solution(deadline=deadline_in(-1)))
+        self.assertEqual(solver.stop_reason, StopReason.DEADLINE)
+        self.assertTrue(solver.solve())
+        self.assertEqual(solver.stop_reason, StopReason.COMPLETED)
+
+    def test_stats(self):
+        """ Every solve and uniqueness check fills in new stats and passes them to the hook. """
+        reported = []
+        board_controller = self.create_board_controller(self.NON_UNIQUE_BOARD)
+        solver = BacktrackingSolver(board_controller, on_stats=reported.append)
+        self.assertFalse(solver.has_unique_solution())
+        self.assertEqual(reported, [solver.stats])
+        self.assertEqual(solver.stats.solution_count, 2)
+        self.assertEqual(solver.stats.propagated_count, solver.propagated_count)
+        self.assertIn('propagate', solver.stats.phase_times)
+
+        self.assertTrue(solver.solve())
+        self.assertEqual(len(reported), 2)
+        self.assertEqual(reported[1].node_count, solver.node_count)
+        self.assertIn('search', reported[1].phase_times)
+
     #
     # Helper Methods
     #
 
+    UNIQUE_BOARD = [
+        [5, 3, None, None, 7, None, None, None, None],
+        [6, None, None, 1, 9, 5, None, None, None],
+        [None, 9, 8, None, None, None, None, 6, None],
+        [8, None, None, None, 6, None, None, None, 3],
+        [4, None, None, 8, None, 3, None, None, 1],
+        [7, None, None, None, 2, None, None, None, 6],
+        [None, 6, None, None, None, None, 2, 8, None],
+        [None, None, None, 4, 1, 9, None, None, 5],
+        [None, None, None, None, 8, None, None, 7, 9]
+    ]
+    NON_UNIQUE_BOARD = UNIQUE_BOARD[:-1] + [[None, None, None, None, 8, None, None, None, 9]]
+
     @staticmethod
     def create_board_controller(board_values: list[list[int]]):
         """
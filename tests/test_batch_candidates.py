@@ -0,0 +1,88 @@
+import random
+import unittest
+from unittest.mock import Mock
+
+from core.grid import BitmaskGrid
+from models.cell_model import CellModel, get_possible_values
+from utils.constants import BOARD_SIZE
+from utils.house_manager import HouseManager
+
+try:
+    import numpy as np
+    from core.batch_candidates import candidate_masks, propagate_singles
+except ImportError:  # pragma: no cover
+    np = None
+
+EASY_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+HARD_PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestBatchCandidates(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_candidate_masks_match_possible_values(self):
+        """ Every cell of every board matches get_possible_values, including filled cells and conflicts. """
+        boards = [self.values_from_string(EASY_PUZZLE), self.values_from_string(HARD_PUZZLE)]
+        boards += [[random.choice([0, 0, 0] + list(range(1, BOARD_SIZE + 1))) for _ in range(BOARD_SIZE ** 2)]
+                   for _ in range(20)]
+
+        masks = candidate_masks(np.array(boards))
+        self.assertEqual(masks.shape, (len(boards), BOARD_SIZE ** 2))
+        for board, board_masks in zip(boards, masks.tolist()):
+            cells = self.create_cells(board)
+            expected = [sum(1 << (num - 1) for num in get_possible_values(cell)) for cell in cells]
+            self.assertEqual(board_masks, expected)
+
+    def test_propagate_matches_grid(self):
+        """ Reaches the same fixpoint as BitmaskGrid.propagate, and flags the same contradictions. """
+        boards = [self.values_from_string(EASY_PUZZLE), self.values_from_string(HARD_PUZZLE),
+                  self.values_from_string('11' + '0' * 79), self.values_from_string(EASY_PUZZLE[:-1] + '8')]
+        filled, contradiction = propagate_singles(np.array(boards))
+
+        for board, result, failed in zip(boards, filled.tolist(), contradiction.tolist()):
+            grid = BitmaskGrid.from_givens(board)
+            propagated = None if grid is None else grid.propagate()
+            self.assertEqual(failed, propagated is None)
+            if not failed:
+                self.assertEqual(result, grid.values)
+
+    def test_propagate_solves_easy(self):
+        boards = np.array([self.values_from_string(EASY_PUZZLE)] * 3, dtype=np.uint8)
+        filled, contradiction = propagate_singles(boards)
+        self.assertFalse(contradiction.any())
+        self.assertTrue((filled != 0).all())
+        self.assertEqual(filled[0, :BOARD_SIZE].tolist(), [5, 3, 4, 6, 7, 8, 9, 1, 2])
+        self.assertEqual(boards[0, 2], 0)  # The input is not changed
+
+    def test_max_rounds(self):
+        """ Stops after max_rounds, with only part of the board filled. """
+        filled, _ = propagate_singles(np.array([self.values_from_string(EASY_PUZZLE)]), max_rounds=1)
+        self.assertGreater((filled != 0).sum(), BOARD_SIZE ** 2 - EASY_PUZZLE.count('0'))
+        self.assertTrue((filled == 0).any())
+
+    #
+    # Helper Methods
+    #
+
+    @staticmethod
+    def values_from_string(puzzle: str) -> list[int]:
+        """ Converts an 81 character string, with 0 for blanks, to a flat list of values. """
+        return [int(char) for char in puzzle]
+
+    @staticmethod
+    def create_cells(values: list[int]) -> list[CellModel]:
+        """ Creates cell models for a board, linked to their houses, in row major order. """
+        board = Mock()
+        board.cells = [[CellModel(x, y) for y in range(BOARD_SIZE)] for x in range(BOARD_SIZE)]
+        for x, row in enumerate(board.cells):
+            for y, cell in enumerate(row):
+                cell.value = values[x * BOARD_SIZE + y] or None
+                cell.house_manager = HouseManager(cell, board)
+        return [cell for row in board.cells for cell in row]
+
+
+if __name__ == '__main__':
+    unittest.main()
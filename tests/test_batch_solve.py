@@ -0,0 +1,112 @@
+import io
+import unittest
+from multiprocessing import Pool
+from unittest.mock import patch
+
+from core.batch_solve import (GUESS, INVALID, TIMEOUT, UNSOLVABLE, rate_line, rate_line_deduped, run, solve_line,
+                              solve_line_deduped, solve_stream)
+from core.rater import PuzzleRater
+
+UNIQUE_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+UNIQUE_SOLUTION = "534678912672195348198342567859761423426853791713924856961537284287419635345286179"
+HARD_PUZZLE = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+SLOW_SEARCH_PUZZLE = ".....6....59.....82....8....45........3........6..3.54...325..6.................."
+# UNIQUE_PUZZLE with 1 and 2 swapped and the first two rows swapped
+DISGUISED_PUZZLE = "600295000530070000098000060800060003400803002700010006060000180000429005000080079"
+DISGUISED_SOLUTION = "671295348534678921298341567859762413416853792723914856962537184187429635345186279"
+
+
+class TestBatchSolve(unittest.TestCase):
+
+    def test_solve_line(self):
+        self.assertEqual(solve_line(UNIQUE_PUZZLE + '\n'), UNIQUE_SOLUTION)
+        self.assertEqual(solve_line(HARD_PUZZLE)[0], '8')
+        self.assertEqual(solve_line('12345'), INVALID)
+        self.assertEqual(solve_line('11' + '0' * 79), UNSOLVABLE)
+
+    def test_rate_line(self):
+        self.assertEqual(rate_line(UNIQUE_PUZZLE), 'easy naked_single')
+        self.assertEqual(rate_line(HARD_PUZZLE), f'hard {GUESS}')
+        self.assertEqual(rate_line('12345'), INVALID)
+        self.assertEqual(rate_line('11' + '0' * 79), UNSOLVABLE)
+
+    def test_solve_line_deduped(self):
+        """ A disguised copy of a puzzle is solved from the cache, and its solution turned back to match it. """
+        self.assertEqual(solve_line_deduped(UNIQUE_PUZZLE), UNIQUE_SOLUTION)
+        self.assertEqual(solve_line_deduped(DISGUISED_PUZZLE), DISGUISED_SOLUTION)
+        self.assertEqual(solve_line_deduped('12345'), INVALID)
+        self.assertEqual(solve_line_deduped('11' + '0' * 79), UNSOLVABLE)
+        self.assertEqual(solve_line_deduped('0' * 16), solve_line('0' * 16))
+
+    def test_slow_search(self):
+        """ A board that stalled a backtracking worker for a minute solves in well under the time limit. """
+        solution = solve_line(SLOW_SEARCH_PUZZLE)
+        self.assertEqual(len(solution), 81)
+        self.assertTrue(all(given in '.' + num for given, num in zip(SLOW_SEARCH_PUZZLE, solution)))
+
+    def test_solve_line_timeout(self):
+        """ A search that runs out of time is written as a timeout, and counted as a failure. """
+        with patch('core.batch_solve.TIME_LIMIT', 0):
+            self.assertEqual(solve_line(SLOW_SEARCH_PUZZLE), TIMEOUT)
+            destination = io.StringIO()
+            self.assertEqual(run(io.StringIO(SLOW_SEARCH_PUZZLE), destination, processes=1), 1)
+
+    def test_rate_line_timeout(self):
+        """ A puzzle whose search runs out of time is written as a timeout instead of holding up the worker. """
+        with patch('core.batch_solve._rater', PuzzleRater(time_limit=0)):
+            self.assertEqual(rate_line(SLOW_SEARCH_PUZZLE), f'hard {TIMEOUT}')
+
+    def test_rate_line_deduped(self):
+        self.assertEqual(rate_line_deduped(UNIQUE_PUZZLE), 'easy naked_single')
+        self.assertEqual(rate_line_deduped(DISGUISED_PUZZLE), 'easy naked_single')
+        self.assertEqual(rate_line_deduped(HARD_PUZZLE), f'hard {GUESS}')
+        self.assertEqual(rate_line_deduped('12345'), INVALID)
+
+    def test_solve_stream_ordered(self):
+        """ Results come back in input order, across several batches, with a blank result for each blank line. """
+        lines = [UNIQUE_PUZZLE, HARD_PUZZLE, '', 'bad', UNIQUE_PUZZLE]
+        with Pool(2) as pool:
+            results = list(solve_stream(lines, pool, batch_size=2, chunk_size=1))
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0], UNIQUE_SOLUTION)
+        self.assertEqual(results[2:], ['', INVALID, UNIQUE_SOLUTION])
+
+    def test_solve_stream_unordered(self):
+        """ Unordered results carry their input line number, counting the blank lines they leave out. """
+        lines = [UNIQUE_PUZZLE, '\n', 'bad', HARD_PUZZLE]
+        with Pool(2) as pool:
+            results = sorted(solve_stream(lines, pool, ordered=False, batch_size=2, chunk_size=1))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[:2], [f'1 {UNIQUE_SOLUTION}', f'3 {INVALID}'])
+        self.assertTrue(results[2].startswith('4 8'))
+
+    def test_run_counts_failures(self):
+        destination = io.StringIO()
+        failures = run(io.StringIO(f'{UNIQUE_PUZZLE}\nbad\n'), destination, processes=1)
+        self.assertEqual(failures, 1)
+        self.assertEqual(destination.getvalue(), f'{UNIQUE_SOLUTION}\n{INVALID}\n')
+
+    def test_run_blank_lines(self):
+        """ Output line N is the result of input line N, blank lines included. """
+        destination = io.StringIO()
+        failures = run(io.StringIO(f'\n{UNIQUE_PUZZLE}\n\nbad\n'), destination, processes=1)
+        self.assertEqual(failures, 1)
+        self.assertEqual(destination.getvalue(), f'\n{UNIQUE_SOLUTION}\n\n{INVALID}\n')
+
+    def test_run_dedupe(self):
+        destination = io.StringIO()
+        source = io.StringIO(f'{UNIQUE_PUZZLE}\n{DISGUISED_PUZZLE}\nbad\n')
+        failures = run(source, destination, processes=1, dedupe=True)
+        self.assertEqual(failures, 1)
+        self.assertEqual(destination.getvalue(), f'{UNIQUE_SOLUTION}\n{DISGUISED_SOLUTION}\n{INVALID}\n')
+
+    def test_run_rate(self):
+        destination = io.StringIO()
+        source = io.StringIO(f'{UNIQUE_PUZZLE}\n{HARD_PUZZLE}\n')
+        failures = run(source, destination, processes=1, ordered=False, rate=True)
+        self.assertEqual(failures, 0)
+        self.assertEqual(sorted(destination.getvalue().splitlines()), ['1 easy naked_single', f'2 hard {GUESS}'])
+
+
+if __name__ == '__main__':
+    unittest.main()
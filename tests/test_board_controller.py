@@ -42,6 +42,23 @@ class TestBoardController(unittest.TestCase):
         self.board_controller.populate_board(numbers)
         self.assertEqual(self.board_controller.model.get_cell_value(0, 0), 5)
 
+    def test_load_puzzle(self):
+        """ Loading a puzzle replaces the givens of the last one, and redraws each cell once. """
+        numbers = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        numbers[0][0] = 5
+        self.board_controller.populate_board(numbers)
+        for cell in self.board_controller.cells_flat:
+            cell.view.update = Mock()
+
+        givens = [0] * BOARD_SIZE ** 2
+        givens[1] = 7
+        self.board_controller.load_puzzle(givens)
+        self.assertIsNone(self.board_controller.model.get_cell_value(0, 0))
+        self.assertEqual(self.board_controller.model.get_cell_value(0, 1), 7)
+        self.assertTrue(self.board_controller.cells[0][1].model.is_given())
+        for cell in self.board_controller.cells_flat:
+            cell.view.update.assert_called_once()
+
     def test_cells_flat(self):
         """ Tests that the flat cells will be 81 cells long. """
         self.assertEqual(len(self.board_controller.cells_flat), BOARD_SIZE ** 2)
@@ -13,6 +13,13 @@ class TestBoardModel(unittest.TestCase):
         self.assertEqual(len(self.board_model.cells), BOARD_SIZE)
         self.assertEqual(len(self.board_model.cells[0]), BOARD_SIZE)
 
+    def test_initialization_16(self):
+        """ A board model with 4x4 subgrids is 16 cells on each side. """
+        board_model = BoardModel(4)
+        self.assertEqual(board_model.size, 16)
+        self.assertEqual(len(board_model.cells), 16)
+        self.assertEqual(len(board_model.cells[15]), 16)
+
     def test_add_cell_model(self):
         """ Tests the add_cell_model function, ensuring cell models can add themselves to the board model. """
         from models.cell_model import CellModel
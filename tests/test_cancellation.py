@@ -0,0 +1,36 @@
+import multiprocessing
+import time
+import unittest
+
+from core.cancellation import CancellationToken, StopReason, check_stop, deadline_in
+
+
+class TestCancellation(unittest.TestCase):
+
+    def test_token(self):
+        token = CancellationToken()
+        self.assertFalse(token.is_cancelled())
+        token.cancel()
+        self.assertTrue(token.is_cancelled())
+
+    def test_shared_token(self):
+        """ A token made from a multiprocessing Event sees cancels made through the event. """
+        event = multiprocessing.Event()
+        token = CancellationToken(event)
+        self.assertFalse(token.is_cancelled())
+        event.set()
+        self.assertTrue(token.is_cancelled())
+
+    def test_check_stop(self):
+        """ Carries on with no limits, and reports the reason once a limit is reached. """
+        self.assertIsNone(check_stop(None, None))
+        self.assertIsNone(check_stop(deadline_in(60), CancellationToken()))
+        self.assertEqual(check_stop(time.monotonic() - 1, None), StopReason.DEADLINE)
+
+        token = CancellationToken()
+        token.cancel()
+        self.assertEqual(check_stop(deadline_in(60), token), StopReason.CANCELLED)
+
+
+if __name__ == '__main__':
+    unittest.main()
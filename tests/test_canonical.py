@@ -0,0 +1,72 @@
+import random
+import unittest
+
+from core.canonical import SymmetryTransform, canonical_form, canonical_key
+from core.full_grid import FullGridGenerator
+from core.generator import PuzzleGenerator
+from core.geometry import BoardGeometry
+
+HARD_PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+
+class TestCanonical(unittest.TestCase):
+
+    def setUp(self):
+        self.full_grids = FullGridGenerator(rng=random.Random(1))
+        self.puzzle = PuzzleGenerator(50, rng=random.Random(2)).generate().givens
+
+    def test_invariant(self):
+        """ Every relabeling, permutation and transposition of a board has the same canonical form. """
+        rng = random.Random(3)
+        for values in (self.puzzle, [int(c) for c in HARD_PUZZLE], self.full_grids.generate()):
+            form = canonical_form(values)[0]
+            for _ in range(5):
+                self.assertEqual(canonical_form(self.full_grids.transform(values, rng))[0], form)
+
+    def test_transform(self):
+        """ The transform turns the board into its canonical form, and inverts back to the board. """
+        form, transform = canonical_form(self.puzzle)
+        self.assertIsInstance(transform, SymmetryTransform)
+        self.assertEqual(transform.apply(self.puzzle), form)
+        self.assertEqual(transform.invert(form), self.puzzle)
+        self.assertEqual(sorted(form), sorted(transform.relabel[num] for num in self.puzzle))
+
+    def test_smallest(self):
+        """ The canonical form is its own canonical form, and no transform of the board is smaller. """
+        form = canonical_form(self.puzzle)[0]
+        self.assertEqual(canonical_form(form)[0], form)
+        rng = random.Random(4)
+        for _ in range(20):
+            other = self.full_grids.transform(self.puzzle, rng)
+            self.assertLessEqual(self.sort_key(form), self.sort_key(other))
+
+    def test_empty_and_full(self):
+        self.assertEqual(canonical_form([0] * 81)[0], [0] * 81)
+        form = canonical_form(self.full_grids.generate())[0]
+        self.assertEqual(form[:9], list(range(1, 10)))
+        self.assertEqual(canonical_form([0] * 16)[0], [0] * 16)
+
+    def test_different_puzzles(self):
+        """ Puzzles that aren't equivalent have different keys. """
+        other = PuzzleGenerator(50, rng=random.Random(5)).generate().givens
+        self.assertNotEqual(canonical_key(self.puzzle), canonical_key(other))
+        self.assertEqual(canonical_key(self.puzzle), bytes(canonical_form(self.puzzle)[0]))
+
+    def test_rejects_bad_sizes(self):
+        with self.assertRaises(ValueError):
+            canonical_form([0] * 80)
+        with self.assertRaises(ValueError):
+            canonical_form([0] * BoardGeometry.of(4).cell_count)
+
+    #
+    # Helper Methods
+    #
+
+    @staticmethod
+    def sort_key(values: list[int]) -> list[tuple]:
+        """ Orders boards the way canonical forms are compared: row by row, by clue pattern and then by digits. """
+        return [(tuple(num > 0 for num in values[row:row + 9]), tuple(values[row:row + 9])) for row in range(0, 81, 9)]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,11 +5,11 @@ from unittest.mock import MagicMock, Mock, patch
 
 from controllers.board_controller import BoardController
 from controllers.cell_controller import CellController
+from core.stats import SolverStats
 from models.cell_model import CellModel
 from models.cell_value_type import CellValueType
 from observers.conflict_observer import ConflictObserver
 from undo_history.cell_commands import *
-from utils.backtracking_solver import BacktrackingSolver
 from utils.sudoku_generator import SudokuGenerator
 from views.board_view import BoardView
 from views.number_button import NumberButton
@@ -238,10 +238,9 @@ class TestCommandHighlighting(unittest.TestCase):
         self.board_controller = BoardController(self.root, MagicMock())
 
         # Ensure an empty board
-        solver = BacktrackingSolver(self.board_controller)
-        solver.has_unique_solution = Mock(return_value=True)
-        generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock(), solver=solver,
-                                         target_count=81)
+        uniqueness_solver = Mock(has_other_solution=Mock(return_value=False), stats=SolverStats())
+        generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock(),
+                                    uniqueness_solver=uniqueness_solver, target_count=81)
         generator.generate_board()
         self.conflict_observer = ConflictObserver(self.board_controller.model)
         self.show_number_buttons = NumberButton.show_number_buttons
@@ -23,7 +23,7 @@ class TestCellController(unittest.TestCase):
         self.board_model = BoardModel()
         self.board_view = BoardView(self.root)
         self.board_controller = BoardController(self.root, UndoHistoryManager())
-        generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock(), solver=Mock())
+        generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock())
 
         self.cell_controller = self.board_controller.cells[0][0]
         self.cell_controller.view.update_labels = Mock()
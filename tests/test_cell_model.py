@@ -19,6 +19,14 @@ class TestCellModel(unittest.TestCase):
         self.assertFalse(self.cell_model.in_conflict)
         self.assertEqual(self.cell_model.value_type, CellValueType.BLANK)
 
+    def test_init_16(self):
+        """ A cell of a 16x16 board has a note for each of its 16 digits, which clearing keeps. """
+        cell_model = CellModel(0, 0, 16)
+        cell_model.toggle_note(16)
+        self.assertTrue(cell_model.has_note(16))
+        cell_model.clear()
+        self.assertEqual(cell_model.notes, [False] * 16)
+
     def test_toggle_entry(self):
         """ Asserts that toggling an entry on and off works."""
         self.cell_model.toggle_entry(5)
@@ -72,6 +80,25 @@ class TestCellModel(unittest.TestCase):
         self.assertEqual(self.cell_model.value, 9)
         self.assertEqual(self.cell_model.value_type, CellValueType.GIVEN)
 
+    def test_load(self):
+        """ Loading a new puzzle resets any cell, givens included, without notifying observers. """
+        observer = Mock()
+        self.cell_model.set_given(9)
+        self.cell_model.attach(observer)
+        self.cell_model.load(None)
+        self.assertIsNone(self.cell_model.value)
+        self.assertEqual(self.cell_model.value_type, CellValueType.BLANK)
+
+        self.cell_model.toggle_note(2)
+        self.cell_model.set_conflict_status(True)
+        observer.update.reset_mock()
+        self.cell_model.load(5)
+        self.assertEqual(self.cell_model.value, 5)
+        self.assertTrue(self.cell_model.is_given())
+        self.assertFalse(any(self.cell_model.notes))
+        self.assertFalse(self.cell_model.in_conflict)
+        observer.update.assert_not_called()
+
     def test_toggle_note_given(self):
         """ Ensures that toggling notes cannot clear given value"""
         self.cell_model.set_given(4)
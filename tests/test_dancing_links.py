@@ -0,0 +1,128 @@
+import unittest
+from unittest.mock import Mock
+
+from core.exact_cover import ExactCoverSolver
+from core.generator import PuzzleGenerator
+from models.cell_model import CellModel
+from models.cell_value_type import CellValueType
+from utils.constants import BOARD_SIZE
+from utils.dancing_links import DancingLinksSolver
+
+UNIQUE_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+HARD_PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+
+class TestDancingLinksSolver(unittest.TestCase):
+
+    def test_has_unique_solution(self):
+        """ Detects a board with a unique solution. """
+        solver = DancingLinksSolver(self.create_board_controller(UNIQUE_PUZZLE))
+        self.assertTrue(solver.has_unique_solution())
+        self.assertEqual(solver.solution_count, 1)
+
+    def test_has_non_unique_solution(self):
+        """ Detects a board with more than one solution, stopping at 2. """
+        solver = DancingLinksSolver(self.create_board_controller(UNIQUE_PUZZLE[:-2] + '09'))
+        self.assertFalse(solver.has_unique_solution())
+        self.assertEqual(solver.solution_count, 2)
+
+    def test_conflicting_givens(self):
+        """ A board with two equal givens in a house has no solution. """
+        solver = DancingLinksSolver(self.create_board_controller('11' + '0' * 79))
+        self.assertFalse(solver.has_unique_solution())
+        self.assertFalse(solver.solve())
+        self.assertEqual(solver.solution_count, 0)
+
+    def test_solve(self):
+        """ Solving fills in every blank cell with a valid solution. """
+        board_controller = self.create_board_controller(HARD_PUZZLE)
+        solver = DancingLinksSolver(board_controller)
+        self.assertTrue(solver.solve())
+
+        rows = [[cell.model.value for cell in row] for row in board_controller.cells]
+        for i in range(BOARD_SIZE):
+            self.assertEqual(set(rows[i]), set(range(1, BOARD_SIZE + 1)))
+            self.assertEqual({row[i] for row in rows}, set(range(1, BOARD_SIZE + 1)))
+        self.assertEqual(board_controller.cells[0][1].model.value_type, CellValueType.GIVEN)
+        self.assertEqual(rows[0][0], 8)  # Givens are left alone
+
+    def test_matrix_is_reused(self):
+        """ The links are restored after every search, so the same solver can check many boards. """
+        board_controller = self.create_board_controller(UNIQUE_PUZZLE)
+        solver = DancingLinksSolver(board_controller)
+        for _ in range(3):
+            self.assertTrue(solver.has_unique_solution())
+
+        board_controller.cells[8][7].model.value = None
+        self.assertFalse(solver.has_unique_solution())
+        board_controller.cells[8][7].model.value = 7
+        self.assertTrue(solver.has_unique_solution())
+
+    def test_has_unique_solution_with_known_solution(self):
+        """ A known solution only has to be compared against other completions of the removed cells. """
+        board_controller = self.create_board_controller(UNIQUE_PUZZLE)
+        solver = DancingLinksSolver(board_controller)
+        solutions = []
+        solver.count_solutions(1, solutions)
+
+        self.assertTrue(solver.has_unique_solution(solutions[0]))
+        board_controller.cells[8][7].model.value = None
+        self.assertFalse(solver.has_unique_solution(solutions[0], [(8, 7)]))
+        self.assertFalse(solver.has_unique_solution(solutions[0]))
+
+        # The matrix is left ready for the next check
+        board_controller.cells[8][7].model.value = 7
+        self.assertTrue(solver.has_unique_solution())
+
+    def test_uniqueness_solver(self):
+        """ Checks flat boards for a PuzzleGenerator, which reads its stats after every check. """
+        solver = DancingLinksSolver(self.create_board_controller(UNIQUE_PUZZLE))
+        puzzle = PuzzleGenerator(target_count=45, uniqueness_solver=solver).generate(seed=3)
+        self.assertEqual(ExactCoverSolver().count_solutions(puzzle.givens), 1)
+        self.assertGreater(solver.stats.node_count, 0)
+
+    def test_count_solutions_limit(self):
+        """ Searching an empty board stops at the limit. """
+        solver = DancingLinksSolver(self.create_board_controller('0' * 81))
+        solutions = []
+        self.assertEqual(solver.count_solutions(5, solutions), 5)
+        self.assertEqual(solver.solution_count, 5)
+        self.assertEqual(len(solutions), 5)
+        self.assertEqual(len({str(solution) for solution in solutions}), 5)
+
+    def test_count_solutions_returns_solution(self):
+        """ The solution of a unique board is returned without changing the board. """
+        board_controller = self.create_board_controller(UNIQUE_PUZZLE)
+        solutions = []
+        self.assertEqual(DancingLinksSolver(board_controller).count_solutions(solutions=solutions), 1)
+        self.assertEqual(solutions[0][0], [5, 3, 4, 6, 7, 8, 9, 1, 2])
+        self.assertIsNone(board_controller.cells[0][2].model.value)
+
+    #
+    # Helper Methods
+    #
+
+    @staticmethod
+    def create_board_controller(puzzle: str):
+        """
+        Given an 81 character string, with 0 for blanks, creates a mock board controller for testing purposes.
+        :return: The populated mock board controller.
+        """
+        board_controller = Mock()
+        board_controller.cells = []
+
+        for x in range(BOARD_SIZE):
+            row = []
+            for y in range(BOARD_SIZE):
+                cell_model = CellModel(x, y)
+                cell_model.value = int(puzzle[x * BOARD_SIZE + y]) or None
+                cell = Mock()
+                cell.model = cell_model
+                row.append(cell)
+            board_controller.cells.append(row)
+
+        return board_controller
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+
+from core.cancellation import CancellationToken, StopReason, deadline_in
+from core.exact_cover import ExactCoverSolver
+from core.geometry import BoardGeometry
+from core.grid import parse_puzzle
+from utils.constants import BOARD_SIZE
+
+UNIQUE_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+NON_UNIQUE_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080009"
+HARD_PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+PUZZLE_16 = "3B1F0074GD00AC297600EFDA21C5003B000200300600E000DE002000000B0017A06700CB1G00280FE00D90000007G004B003800000025001200G7EF15CD3B0065004C92F683D100G60014000000C900DG0081000000FC003F03C00879B00450E4F00G000000800EA000E004005003000CG00AD9EF3460058137A0052DE00FB4C"
+
+
+class TestExactCoverSolver(unittest.TestCase):
+
+    def test_solve(self):
+        """ Solving fills the values in place, leaving the givens alone. """
+        values = self.values_from_string(HARD_PUZZLE)
+        self.assertTrue(ExactCoverSolver().solve(values))
+        self.assertNotIn(0, values)
+        for i in range(BOARD_SIZE):
+            self.assertEqual(set(values[i * BOARD_SIZE:(i + 1) * BOARD_SIZE]), set(range(1, BOARD_SIZE + 1)))
+            self.assertEqual(set(values[i::BOARD_SIZE]), set(range(1, BOARD_SIZE + 1)))
+        self.assertEqual(values[0], 8)
+
+    def test_count_solutions(self):
+        solver = ExactCoverSolver()
+        self.assertEqual(solver.count_solutions(self.values_from_string(UNIQUE_PUZZLE)), 1)
+        self.assertEqual(solver.count_solutions(self.values_from_string(NON_UNIQUE_PUZZLE), 10), 2)
+
+        solutions = []
+        values = self.values_from_string(UNIQUE_PUZZLE)
+        solver.count_solutions(values, solutions=solutions)
+        self.assertEqual(solutions[0][:BOARD_SIZE], [5, 3, 4, 6, 7, 8, 9, 1, 2])
+        self.assertEqual(values, self.values_from_string(UNIQUE_PUZZLE))
+
+    def test_conflicting_givens(self):
+        """ A board with two equal givens in a house has no solution, and leaves the matrix usable. """
+        solver = ExactCoverSolver()
+        conflicting = self.values_from_string('11' + '0' * 79)
+        self.assertFalse(solver.is_consistent(conflicting))
+        self.assertEqual(solver.count_solutions(conflicting), 0)
+        self.assertTrue(solver.is_consistent(self.values_from_string(UNIQUE_PUZZLE)))
+        self.assertEqual(solver.count_solutions(self.values_from_string(UNIQUE_PUZZLE)), 1)
+
+    def test_has_other_solution(self):
+        """ Only the removed cells need to be searched when the board was unique before. """
+        solutions = []
+        solver = ExactCoverSolver()
+        solver.count_solutions(self.values_from_string(UNIQUE_PUZZLE), 1, solutions)
+        removed = 8 * BOARD_SIZE + 7  # The clue that separates the unique and non unique puzzles
+
+        self.assertFalse(solver.has_other_solution(self.values_from_string(UNIQUE_PUZZLE), solutions[0]))
+        values = self.values_from_string(NON_UNIQUE_PUZZLE)
+        self.assertTrue(solver.has_other_solution(values, solutions[0]))
+        self.assertTrue(solver.has_other_solution(values, solutions[0], [removed]))
+        self.assertFalse(solver.has_other_solution(values, solutions[0], [0, 2]))
+
+    def test_stopped_early(self):
+        """ A search stopped early reports why, and leaves the matrix ready for the next board. """
+        solver = ExactCoverSolver()
+        token = CancellationToken()
+        token.cancel()
+        self.assertEqual(solver.count_solutions(self.values_from_string('0' * 81), 5, cancel_token=token), 0)
+        self.assertEqual(solver.stop_reason, StopReason.CANCELLED)
+
+        solutions = []
+        solver.count_solutions(self.values_from_string(UNIQUE_PUZZLE), 1, solutions)
+        self.assertEqual(solver.stop_reason, StopReason.COMPLETED)
+        self.assertTrue(solver.has_other_solution(self.values_from_string(UNIQUE_PUZZLE), solutions[0],
+                                                  deadline=deadline_in(-1)))
+        self.assertEqual(solver.stop_reason, StopReason.DEADLINE)
+
+        self.assertEqual(solver.count_solutions(self.values_from_string(NON_UNIQUE_PUZZLE), 10), 2)
+        self.assertFalse(solver.has_other_solution(self.values_from_string(UNIQUE_PUZZLE), solutions[0]))
+
+    def test_stats(self):
+        reported = []
+        solver = ExactCoverSolver(on_stats=reported.append)
+        solver.count_solutions(self.values_from_string(HARD_PUZZLE))
+        self.assertEqual(reported, [solver.stats])
+        self.assertEqual(solver.stats.solution_count, 1)
+        self.assertGreater(solver.stats.node_count, 0)
+        self.assertGreaterEqual(solver.stats.candidates_tested, solver.stats.node_count - solver.stats.dead_end_count)
+        self.assertIn('search', solver.stats.phase_times)
+
+    #
+    # Helper Methods
+    #
+
+    def test_16(self):
+        """ A solver made for a 16x16 board counts its solutions, and rejects boards of other sizes. """
+        solver = ExactCoverSolver(geometry=BoardGeometry.of(4))
+        solutions = []
+        self.assertEqual(solver.count_solutions(parse_puzzle(PUZZLE_16), 2, solutions), 1)
+        self.assertEqual(sorted(solutions[0][:16]), list(range(1, 17)))
+        with self.assertRaises(ValueError):
+            solver.count_solutions(self.values_from_string(UNIQUE_PUZZLE))
+
+    @staticmethod
+    def values_from_string(puzzle: str) -> list[int]:
+        """ Converts an 81 character string, with 0 for blanks, to a flat list of values. """
+        return [int(char) for char in puzzle]
+
+
+if __name__ == '__main__':
+    unittest.main()
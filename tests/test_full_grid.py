@@ -0,0 +1,61 @@
+import random
+import unittest
+
+from core.full_grid import FullGridGenerator
+from core.geometry import CLASSIC, BoardGeometry
+
+
+class TestFullGridGenerator(unittest.TestCase):
+
+    def test_generate(self):
+        generator = FullGridGenerator(rng=random.Random(1))
+        for _ in range(5):
+            self.assertSolved(generator.generate(), CLASSIC)
+
+    def test_generate_16(self):
+        geometry = BoardGeometry.of(4)
+        self.assertSolved(FullGridGenerator(geometry, random.Random(2)).generate(), geometry)
+
+    def test_transform(self):
+        """ A transform keeps the grid solved, and the same seed always gives the same transform. """
+        generator = FullGridGenerator(rng=random.Random(3))
+        base = generator.search()
+        transformed = generator.transform(base, random.Random(4))
+        self.assertSolved(transformed, CLASSIC)
+        self.assertNotEqual(transformed, base)
+        self.assertEqual(generator.transform(base, random.Random(4)), transformed)
+
+    def test_grids_per_search(self):
+        """ Only the first grid from each base is searched, the rest are transforms. """
+        generator = FullGridGenerator(rng=random.Random(5), grids_per_search=3)
+        node_counts = []
+        grids = []
+        for _ in range(4):
+            grids.append(generator.generate())
+            node_counts.append(generator.stats.node_count)
+        self.assertGreater(node_counts[0], 0)
+        self.assertEqual(node_counts[1:3], [0, 0])
+        self.assertGreater(node_counts[3], 0)
+        self.assertEqual(len({tuple(grid) for grid in grids}), 4)
+
+    def test_new_base(self):
+        """ A grid made from a new base only depends on the random generator it was given. """
+        generator = FullGridGenerator(rng=random.Random(6))
+        generator.generate()
+        first = generator.generate(random.Random(7), new_base=True)
+        self.assertGreater(generator.stats.node_count, 0)
+        self.assertEqual(FullGridGenerator().generate(random.Random(7), new_base=True), first)
+
+    #
+    # Helper Methods
+    #
+
+    def assertSolved(self, values: list[int], geometry: BoardGeometry):
+        """ Asserts every row, column and subgrid holds every digit once. """
+        digits = set(range(1, geometry.size + 1))
+        for house in geometry.houses:
+            self.assertEqual({values[x * geometry.size + y] for x, y in house}, digits)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import random
+import unittest
+
+from core.exact_cover import ExactCoverSolver
+from core.geometry import BoardGeometry
+from core.generator import PuzzleGenerator
+from core.transposition import TranspositionCache
+from utils.constants import BOARD_SIZE
+
+
+class TestPuzzleGenerator(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_generate_unique(self):
+        """ The puzzle has a unique solution, which matches the filled grid. """
+        puzzle = PuzzleGenerator(target_count=50).generate()
+        solutions = []
+        self.assertEqual(ExactCoverSolver().count_solutions(puzzle.givens, 2, solutions), 1)
+        self.assertEqual(solutions[0], puzzle.solution)
+
+    def test_givens_match_solution(self):
+        """ Every given is taken from the solution, and every removed cell is blank. """
+        puzzle = PuzzleGenerator().generate()
+        for index, num in enumerate(puzzle.givens):
+            self.assertIn(num, (0, puzzle.solution[index]))
+        self.assertEqual(sorted(puzzle.removed), [index for index, num in enumerate(puzzle.givens) if num == 0])
+        self.assertEqual(puzzle.clue_count(), BOARD_SIZE * BOARD_SIZE - len(puzzle.removed))
+
+    def test_target_count(self):
+        """ Removes at least the target count, overshooting by at most one symmetrical group. """
+        puzzle = PuzzleGenerator(target_count=35).generate()
+        self.assertGreaterEqual(len(puzzle.removed), 35)
+        self.assertLess(len(puzzle.removed), 35 + 4)
+
+    def test_symmetrical(self):
+        """ The blank cells are 4 way symmetrical. """
+        puzzle = PuzzleGenerator().generate()
+        for index in puzzle.removed:
+            for cell in PuzzleGenerator.symmetrical_cells(index):
+                self.assertEqual(puzzle.givens[cell], 0)
+
+    def test_stats(self):
+        """ The stats of a puzzle cover filling the grid and every uniqueness check. """
+        reported = []
+        generator = PuzzleGenerator(on_stats=reported.append)
+        generator.generate()
+        self.assertEqual(reported, [generator.stats])
+        self.assertIn('fill', generator.stats.phase_times)
+        self.assertIn('remove', generator.stats.phase_times)
+        self.assertGreater(generator.stats.node_count, 0)
+
+    def test_seed(self):
+        """ A seed always gives the same puzzle, whatever was generated before it. """
+        generator = PuzzleGenerator()
+        first = generator.generate(seed=12)
+        generator.generate()
+        again = generator.generate(seed=12)
+        other = generator.generate(seed=13)
+        self.assertEqual(again.givens, first.givens)
+        self.assertEqual(again.removed, first.removed)
+        self.assertNotEqual(other.solution, first.solution)
+
+    def test_rng(self):
+        """ Generators given random generators seeded the same make the same puzzles. """
+        generators = [PuzzleGenerator(rng=random.Random(3)) for _ in range(2)]
+        puzzles = [[generator.generate().givens for _ in range(2)] for generator in generators]
+        self.assertEqual(puzzles[0], puzzles[1])
+
+    def test_cache(self):
+        """ Checking removals with a cached count makes the same puzzles, and reports how often the cache hit. """
+        cache = TranspositionCache()
+        generator = PuzzleGenerator(target_count=50, cache=cache)
+        self.assertIsNone(generator.uniqueness_solver)  # No exact cover solver is built just to go unused
+        cached = [generator.generate(seed=seed) for seed in (1, 2)]
+        plain = [PuzzleGenerator(target_count=50).generate(seed=seed) for seed in (1, 2)]
+        self.assertEqual([puzzle.givens for puzzle in cached], [puzzle.givens for puzzle in plain])
+        self.assertGreater(generator.stats.cache_lookups, 0)
+        self.assertGreater(len(cache), 0)
+
+    def test_generate_16(self):
+        """ Puzzles can be made for 16x16 boards, and are still unique. """
+        geometry = BoardGeometry.of(4)
+        puzzle = PuzzleGenerator(target_count=60, geometry=geometry).generate(seed=2)
+        self.assertEqual(len(puzzle.givens), 256)
+        self.assertGreaterEqual(len(puzzle.removed), 60)
+        self.assertEqual(ExactCoverSolver(geometry=geometry).count_solutions(puzzle.givens, 2), 1)
+
+    def test_symmetrical_cells(self):
+        self.assertEqual(PuzzleGenerator.symmetrical_cells(0), [0, 72, 8, 80])
+        self.assertEqual(PuzzleGenerator.symmetrical_cells(4), [4, 76])
+        self.assertEqual(PuzzleGenerator.symmetrical_cells(40), [40])
+
+
+if __name__ == '__main__':
+    unittest.main()
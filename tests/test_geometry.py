@@ -0,0 +1,63 @@
+import unittest
+
+from core.geometry import BoardGeometry, CLASSIC, digit_symbol, symbol_digit
+
+
+class TestBoardGeometry(unittest.TestCase):
+
+    def test_classic(self):
+        self.assertEqual(CLASSIC.size, 9)
+        self.assertEqual(CLASSIC.cell_count, 81)
+        self.assertEqual(CLASSIC.all_digits, 0x1FF)
+        self.assertEqual(len(CLASSIC.houses), 27)
+
+    def test_tables(self):
+        """ The row, column and subgrid tables agree with the houses on a 16x16 board. """
+        geometry = BoardGeometry.of(4)
+        self.assertEqual(geometry.size, 16)
+        self.assertEqual(len(geometry.houses), 48)
+        for house in geometry.houses:
+            self.assertEqual(len(house), 16)
+        for x, y in geometry.houses[32 + 6]:
+            self.assertEqual(geometry.cell_subgrid[x * 16 + y], 6)
+            self.assertEqual(geometry.subgrid_index(x, y), 6)
+        self.assertEqual(geometry.cell_row[17], 1)
+        self.assertEqual(geometry.cell_column[17], 1)
+
+    def test_peers(self):
+        """ Every cell shares a house with 20 others on a 9x9 board, and 39 on a 16x16 board. """
+        self.assertEqual(len(CLASSIC.peers[0]), 20)
+        self.assertNotIn(0, CLASSIC.peers[0])
+        self.assertIn(80, CLASSIC.peers[8])
+        self.assertIn(20, CLASSIC.peers[0])
+        self.assertNotIn(21, CLASSIC.peers[0])
+        self.assertEqual(len(BoardGeometry.of(4).peers[100]), 39)
+
+    def test_shared(self):
+        """ Each size is only built once. """
+        self.assertIs(BoardGeometry.of(5), BoardGeometry.of(5))
+        self.assertIs(BoardGeometry.of(), CLASSIC)
+
+    def test_for_cell_count(self):
+        self.assertIs(BoardGeometry.for_cell_count(81), CLASSIC)
+        self.assertEqual(BoardGeometry.for_cell_count(625).size, 25)
+        self.assertIsNone(BoardGeometry.for_cell_count(80))
+        self.assertIsNone(BoardGeometry.for_cell_count(36 * 36))
+
+    def test_unsupported_size(self):
+        with self.assertRaises(ValueError):
+            BoardGeometry(6)
+
+    def test_symbols(self):
+        self.assertEqual(digit_symbol(9), '9')
+        self.assertEqual(digit_symbol(10), 'A')
+        self.assertEqual(digit_symbol(25), 'P')
+        self.assertEqual(symbol_digit('g'), 16)
+        self.assertEqual(symbol_digit('1'), 1)
+        self.assertIsNone(symbol_digit('0'))
+        self.assertIsNone(symbol_digit('Z'))
+        self.assertIsNone(symbol_digit('space'))
+
+
+if __name__ == '__main__':
+    unittest.main()
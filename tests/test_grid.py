@@ -0,0 +1,175 @@
+import unittest
+
+from core.grid import BitmaskGrid, ALL_DIGITS, digit_bit, mask_digits, parse_puzzle, format_puzzle
+from utils.constants import BOARD_SIZE
+
+
+EASY_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+PUZZLE_16 = "3B1F0074GD00AC297600EFDA21C5003B000200300600E000DE002000000B0017A06700CB1G00280FE00D90000007G004B003800000025001200G7EF15CD3B0065004C92F683D100G60014000000C900DG0081000000FC003F03C00879B00450E4F00G000000800EA000E004005003000CG00AD9EF3460058137A0052DE00FB4C"
+
+
+class TestGrid(unittest.TestCase):
+    def setUp(self):
+        self.grid = BitmaskGrid()
+
+    def test_empty_grid_allows_everything(self):
+        """ An empty grid has every digit available in every cell. """
+        for x in range(BOARD_SIZE):
+            for y in range(BOARD_SIZE):
+                self.assertEqual(self.grid.candidates(x, y), ALL_DIGITS)
+
+    def test_place_updates_house_masks(self):
+        """ Placing a digit removes it from the row, column and subgrid, but nowhere else. """
+        self.grid.place(0, 0, 5)
+        self.assertEqual(self.grid.get(0, 0), 5)
+        self.assertFalse(self.grid.can_place(0, 8, 5))  # Same row
+        self.assertFalse(self.grid.can_place(8, 0, 5))  # Same column
+        self.assertFalse(self.grid.can_place(2, 2, 5))  # Same subgrid
+        self.assertTrue(self.grid.can_place(4, 4, 5))
+        self.assertTrue(self.grid.can_place(0, 8, 4))
+
+    def test_remove_restores_masks(self):
+        """ Removing a digit makes it available again. """
+        self.grid.place(3, 4, 7)
+        self.grid.remove(3, 4)
+        self.assertTrue(self.grid.is_blank(3, 4))
+        self.assertEqual(self.grid.rows, [0] * BOARD_SIZE)
+        self.assertEqual(self.grid.columns, [0] * BOARD_SIZE)
+        self.assertEqual(self.grid.subgrids, [0] * BOARD_SIZE)
+
+    def test_remove_blank_cell(self):
+        """ Removing from a blank cell does nothing. """
+        self.grid.remove(0, 0)
+        self.assertTrue(self.grid.is_blank(0, 0))
+
+    def test_from_rows_and_to_rows(self):
+        """ Round trips a 2d list, treating None as blank. """
+        rows = [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        rows[1][2] = 9
+        grid = BitmaskGrid.from_rows(rows)
+        result = grid.to_rows()
+        self.assertEqual(result[1][2], 9)
+        self.assertEqual(sum(v for row in result for v in row), 9)
+
+    def test_from_values(self):
+        """ Creates a grid from a flat list in row major order. """
+        values = [0] * (BOARD_SIZE * BOARD_SIZE)
+        values[BOARD_SIZE + 2] = 4
+        grid = BitmaskGrid.from_values(values)
+        self.assertEqual(grid.get(1, 2), 4)
+        self.assertFalse(grid.can_place(1, 0, 4))
+
+    def test_from_givens(self):
+        """ Refuses givens that share a house. """
+        values = [0] * (BOARD_SIZE * BOARD_SIZE)
+        values[0] = values[BOARD_SIZE - 1] = 3
+        self.assertIsNone(BitmaskGrid.from_givens(values))
+        values[0] = 2
+        self.assertEqual(BitmaskGrid.from_givens(values).values, values)
+
+    def test_parse_puzzle(self):
+        """ Accepts 0 or . for blanks, and rejects lines of the wrong length or with other characters. """
+        values = parse_puzzle(EASY_PUZZLE.replace('0', '.') + '\n')
+        self.assertEqual(format_puzzle(values), EASY_PUZZLE)
+        self.assertEqual(parse_puzzle(EASY_PUZZLE), values)
+        self.assertIsNone(parse_puzzle(EASY_PUZZLE[:-1]))
+        self.assertIsNone(parse_puzzle(EASY_PUZZLE[:-1] + 'x'))
+
+    def test_copy_is_independent(self):
+        """ Mutating a copy does not change the original. """
+        self.grid.place(0, 0, 1)
+        copy = self.grid.copy()
+        copy.place(0, 1, 2)
+        self.assertTrue(self.grid.is_blank(0, 1))
+        self.assertTrue(self.grid.can_place(0, 2, 2))
+
+    def test_most_constrained_cell(self):
+        """ Picks the blank cell with the fewest candidates. """
+        for num in range(1, BOARD_SIZE):
+            self.grid.place(4, num - 1, num)  # Leaves (4, 8) with only 9 available
+        self.assertEqual(self.grid.most_constrained_cell(), (4, 8, digit_bit(9)))
+
+    def test_most_constrained_cell_dead_end(self):
+        """ Returns a cell with no candidates as soon as one exists. """
+        for num in range(1, BOARD_SIZE):
+            self.grid.place(0, num, num)
+        self.grid.place(1, 0, 9)
+        self.assertEqual(self.grid.most_constrained_cell(), (0, 0, 0))
+
+    def test_most_constrained_cell_full_grid(self):
+        """ Returns None when there are no blank cells. """
+        for x in range(BOARD_SIZE):
+            for y in range(BOARD_SIZE):
+                self.grid.place(x, y, (x * 3 + x // 3 + y) % BOARD_SIZE + 1)
+        self.assertIsNone(self.grid.most_constrained_cell())
+
+    def test_propagate_solves_easy_puzzle(self):
+        """ An easy puzzle is solved by singles alone. """
+        grid = self.grid_from_string(EASY_PUZZLE)
+        filled = grid.propagate()
+        self.assertEqual(len(filled), EASY_PUZZLE.count('0'))
+        self.assertEqual(grid.values.count(0), 0)
+        self.assertTrue(all(mask == ALL_DIGITS for mask in grid.rows + grid.columns + grid.subgrids))
+
+    def test_propagate_hidden_single(self):
+        """ A digit that only fits in one cell of a house is placed, even when the cell has other candidates. """
+        # 1 is blocked from every cell of the top left subgrid except (0, 0)
+        self.grid.place(1, 4, 1)
+        self.grid.place(2, 7, 1)
+        self.grid.place(4, 1, 1)
+        self.grid.place(7, 2, 1)
+        filled = self.grid.propagate()
+        self.assertIn((0, 0), filled)
+        self.assertEqual(self.grid.get(0, 0), 1)
+
+    def test_propagate_contradiction(self):
+        """ Returns None when a cell has no candidates left. """
+        for num in range(1, BOARD_SIZE):
+            self.grid.place(0, num, num)
+        self.grid.place(1, 0, 9)
+        self.assertIsNone(self.grid.propagate())
+
+    def test_propagate_nothing_forced(self):
+        """ An empty grid has no forced cells. """
+        self.assertEqual(self.grid.propagate(), [])
+
+    def test_subgrid_index(self):
+        self.assertEqual(BitmaskGrid.subgrid_index(0, 0), 0)
+        self.assertEqual(BitmaskGrid.subgrid_index(4, 7), 5)
+        self.assertEqual(BitmaskGrid.subgrid_index(8, 8), 8)
+
+    def test_mask_helpers(self):
+        self.assertEqual(digit_bit(1), 1)
+        self.assertEqual(mask_digits(digit_bit(3) | digit_bit(9)), [3, 9])
+
+    def test_parse_and_format_16(self):
+        """ Puzzles of 256 characters are 16x16 boards, using letters for the digits past 9. """
+        values = parse_puzzle(PUZZLE_16)
+        self.assertEqual(len(values), 256)
+        self.assertEqual(values[:4], [3, 11, 1, 15])
+        self.assertEqual(format_puzzle(values), PUZZLE_16)
+        self.assertEqual(parse_puzzle(PUZZLE_16.lower()), values)
+
+    def test_parse_wrong_length(self):
+        self.assertIsNone(parse_puzzle('1' * 100))
+        with self.assertRaises(ValueError):
+            BitmaskGrid.from_values([0] * 100)
+
+    def test_grid_16(self):
+        """ A 16x16 grid takes its size from the values, and propagates forced cells. """
+        grid = BitmaskGrid.from_values(parse_puzzle(PUZZLE_16))
+        self.assertEqual(grid.size, 16)
+        self.assertEqual(grid.subgrid_size, 4)
+        self.assertFalse(grid.can_place(0, 4, 3))  # Same row as the 3 at (0, 0)
+        self.assertIsNotNone(grid.propagate())
+        self.assertEqual(grid.values[0], 3)
+
+    @staticmethod
+    def grid_from_string(puzzle: str) -> BitmaskGrid:
+        """ Creates a grid from an 81 character string, with 0 for blanks. """
+        return BitmaskGrid.from_rows([[int(c) for c in puzzle[x * BOARD_SIZE:(x + 1) * BOARD_SIZE]]
+                                      for x in range(BOARD_SIZE)])
+
+
+if __name__ == '__main__':
+    unittest.main()
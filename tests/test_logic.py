@@ -0,0 +1,83 @@
+import unittest
+
+from core.grid import BitmaskGrid, parse_puzzle
+from core.logic import LogicalSolver, Technique
+from core.solver import GridSolver
+
+SINGLES_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+LOCKED_CANDIDATES_PUZZLE = "000090000017000420603104807100000002000209000300000005702905106068000530000040000"
+NAKED_PAIR_PUZZLE = "070000020500070006010908050040030090900704005080020040050401060100080002030000010"
+HIDDEN_PAIR_PUZZLE = "000000000018040230600805007030154070700020005040786010200501008059060720000000000"
+X_WING_PUZZLE = "020000050057604210900000007000357000600409003000861000100000002098103760070000090"
+SWORDFISH_PUZZLE = "700050008080000030006201700200106003003000100600408009005709300060000050900040007"
+XY_WING_PUZZLE = "307040902800000007024070380000609000200050004000401000032010450400000009705090103"
+HARD_PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+PUZZLE_16 = "3B1F0074GD00AC297600EFDA21C5003B000200300600E000DE002000000B0017A06700CB1G00280FE00D90000007G004B003800000025001200G7EF15CD3B0065004C92F683D100G60014000000C900DG0081000000FC003F03C00879B00450E4F00G000000800EA000E004005003000CG00AD9EF3460058137A0052DE00FB4C"
+
+
+class TestLogicalSolver(unittest.TestCase):
+
+    def setUp(self):
+        self.solver = LogicalSolver()
+
+    def test_singles(self):
+        result = self.solver.solve(parse_puzzle(SINGLES_PUZZLE))
+        self.assertTrue(result.solved)
+        self.assertEqual(result.values, self.solution_of(SINGLES_PUZZLE))
+        self.assertLessEqual(result.hardest.value, Technique.HIDDEN_SINGLE.value)
+        self.assertFalse(any(result.candidates))
+
+    def test_hardest_technique(self):
+        """ Each puzzle is solved, and needs its technique on top of the cheaper ones. """
+        puzzles = {Technique.LOCKED_CANDIDATES: LOCKED_CANDIDATES_PUZZLE, Technique.NAKED_PAIR: NAKED_PAIR_PUZZLE,
+                   Technique.HIDDEN_PAIR: HIDDEN_PAIR_PUZZLE, Technique.X_WING: X_WING_PUZZLE,
+                   Technique.SWORDFISH: SWORDFISH_PUZZLE, Technique.XY_WING: XY_WING_PUZZLE}
+        for technique, puzzle in puzzles.items():
+            result = self.solver.solve(parse_puzzle(puzzle))
+            self.assertTrue(result.solved)
+            self.assertEqual(result.values, self.solution_of(puzzle))
+            self.assertIs(result.hardest, technique)
+            self.assertEqual(result.technique_counts[technique], 1)
+
+    def test_stuck(self):
+        """ A puzzle that needs a guess is left part way, with only candidates the solution agrees with. """
+        result = self.solver.solve(parse_puzzle(HARD_PUZZLE))
+        self.assertFalse(result.solved)
+        solution = self.solution_of(HARD_PUZZLE)
+        for index, num in enumerate(result.values):
+            if num:
+                self.assertEqual(num, solution[index])
+            else:
+                self.assertTrue(result.candidates[index] & 1 << (solution[index] - 1))
+
+    def test_broken(self):
+        self.assertIsNone(self.solver.solve(parse_puzzle('11' + '0' * 79)))
+        self.assertIsNone(self.solver.solve(parse_puzzle(SINGLES_PUZZLE[:-1] + '8')))
+
+    def test_full_board(self):
+        result = self.solver.solve(self.solution_of(SINGLES_PUZZLE))
+        self.assertTrue(result.solved)
+        self.assertIsNone(result.hardest)
+
+    def test_16(self):
+        """ The same solver handles a 16x16 board after a 9x9 one. """
+        self.solver.solve(parse_puzzle(SINGLES_PUZZLE))
+        result = self.solver.solve(parse_puzzle(PUZZLE_16))
+        self.assertTrue(result.solved)
+        self.assertEqual(result.values, self.solution_of(PUZZLE_16))
+        self.assertEqual(self.solver.geometry.size, 16)
+
+    #
+    # Helper Methods
+    #
+
+    @staticmethod
+    def solution_of(puzzle: str) -> list[int]:
+        """ Returns the values of the first solution the search finds. """
+        solutions = []
+        GridSolver(max_iterations=None).count_solutions(BitmaskGrid.from_values(parse_puzzle(puzzle)), 1, solutions)
+        return solutions[0]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from core.cancellation import CancellationToken, StopReason, deadline_in
+from core.exact_cover import ExactCoverSolver
+from core.generator import PuzzleGenerator
+from core.grid import parse_puzzle
+from core.parallel_search import ParallelSolver
+
+UNIQUE_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+NON_UNIQUE_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080009"
+HARD_PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+
+class TestParallelSolver(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Splitting straight away sends every check to the pool
+        cls.solver = ParallelSolver(processes=2, split_after=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.solver.close()
+
+    def test_count_solutions(self):
+        """ Counts match the exact cover solver, whether or not the pool is needed. """
+        for puzzle in (UNIQUE_PUZZLE, NON_UNIQUE_PUZZLE, HARD_PUZZLE):
+            expected = ExactCoverSolver().count_solutions(parse_puzzle(puzzle))
+            self.assertEqual(self.solver.count_solutions(parse_puzzle(puzzle)), expected)
+            self.assertEqual(self.solver.stop_reason, StopReason.COMPLETED)
+
+    def test_split(self):
+        """ A search that runs out of budget is split into branches, and the solution comes back from a worker. """
+        solutions = []
+        self.assertTrue(self.solver.has_unique_solution(parse_puzzle(HARD_PUZZLE)))
+        self.assertGreater(self.solver.split_count, 2)
+        self.assertEqual(self.solver.count_solutions(parse_puzzle(HARD_PUZZLE), 2, solutions), 1)
+        expected = parse_puzzle(HARD_PUZZLE)
+        ExactCoverSolver().solve(expected)
+        self.assertEqual(solutions, [expected])
+
+    def test_stops_at_limit(self):
+        """ Every worker stops once they have found the limit between them, even with endless solutions left. """
+        solutions = []
+        self.assertEqual(self.solver.count_solutions([0] * 81, 2, solutions), 2)
+        self.assertEqual(self.solver.stop_reason, StopReason.COMPLETED)
+        self.assertEqual(len(solutions), 2)
+        self.assertNotEqual(solutions[0], solutions[1])
+
+        # The pool is ready for the next check
+        self.assertTrue(self.solver.has_unique_solution(parse_puzzle(HARD_PUZZLE)))
+
+    def test_has_other_solution(self):
+        solution = parse_puzzle(UNIQUE_PUZZLE)
+        ExactCoverSolver().solve(solution)
+        removed = NON_UNIQUE_PUZZLE.index('0', 79)
+        values = parse_puzzle(NON_UNIQUE_PUZZLE)
+        self.assertTrue(self.solver.has_other_solution(values, solution, [removed]))
+        self.assertFalse(self.solver.has_other_solution(values, solution, [0, 2]))
+        self.assertTrue(self.solver.has_other_solution(values, solution))
+        self.assertFalse(self.solver.has_other_solution(parse_puzzle(UNIQUE_PUZZLE), solution))
+
+    def test_has_other_solution_budget(self):
+        """ The cells share one budget, and only the cells it didn't settle are split across the pool. """
+        solution = parse_puzzle(HARD_PUZZLE)
+        ExactCoverSolver().solve(solution)
+        # Each cell takes 15,000 to 23,000 iterations, so the first settles and the budget runs out on the second
+        with ParallelSolver(processes=2, split_after=30000) as solver, \
+                patch.object(ParallelSolver, '_branch', wraps=ParallelSolver._branch) as branch:
+            self.assertFalse(solver.has_other_solution(parse_puzzle(HARD_PUZZLE), solution, [4, 6, 1]))
+            self.assertGreater(solver.split_count, 0)
+            self.assertEqual(solver.stop_reason, StopReason.COMPLETED)
+        # Branches of the unsettled cells all start from the check's grid, while splitting makes new grids
+        grid = branch.call_args_list[0].args[0]
+        roots = {call.args[1:3] for call in branch.call_args_list if call.args[0] is grid}
+        self.assertEqual(roots, {(0, 6), (0, 1)})
+
+    def test_conflicting_givens(self):
+        self.assertEqual(self.solver.count_solutions(parse_puzzle('11' + '0' * 79)), 0)
+
+    def test_cancel(self):
+        """ Cancelling the parent's token stops every worker. """
+        token = CancellationToken()
+        threading.Timer(0.2, token.cancel).start()
+        self.assertLess(self.solver.count_solutions([0] * 81, 10 ** 9, cancel_token=token), 10 ** 9)
+        self.assertEqual(self.solver.stop_reason, StopReason.CANCELLED)
+
+    def test_deadline(self):
+        self.solver.count_solutions([0] * 81, 10 ** 9, deadline=deadline_in(0.2))
+        self.assertEqual(self.solver.stop_reason, StopReason.DEADLINE)
+
+    def test_stats(self):
+        """ The stats of a check include the searches of every worker. """
+        reported = []
+        self.solver.on_stats = reported.append
+        try:
+            self.solver.has_unique_solution(parse_puzzle(HARD_PUZZLE))
+        finally:
+            self.solver.on_stats = None
+        self.assertEqual(reported, [self.solver.stats])
+        self.assertIn('parallel', self.solver.stats.phase_times)
+        self.assertGreater(self.solver.stats.node_count, 0)
+
+    def test_generator(self):
+        """ Can be used as the uniqueness solver of the puzzle generator. """
+        puzzle = PuzzleGenerator(target_count=50, uniqueness_solver=self.solver).generate(seed=4)
+        self.assertEqual(ExactCoverSolver().count_solutions(puzzle.givens), 1)
+
+    def test_no_split(self):
+        """ Checks that finish within the budget never start a pool. """
+        with ParallelSolver(processes=2) as solver:
+            self.assertTrue(solver.has_unique_solution(parse_puzzle(UNIQUE_PUZZLE)))
+            self.assertEqual(solver.split_count, 0)
+            self.assertIsNone(solver._pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
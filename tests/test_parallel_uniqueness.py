@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import Mock
+
+from models.cell_model import CellModel
+from utils.constants import BOARD_SIZE
+from utils.parallel_uniqueness import ParallelUniquenessSolver
+
+UNIQUE_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+SOLUTION = "534678912672195348198342567859761423426853791713924856961537284287419635345286179"
+
+
+class TestParallelUniquenessSolver(unittest.TestCase):
+
+    def setUp(self):
+        self.board_controller = self.create_board_controller(UNIQUE_PUZZLE)
+        self.solver = ParallelUniquenessSolver(self.board_controller, processes=2)
+        self.solver.parallel_solver.split_after = 0  # Send every check to the pool
+
+    def tearDown(self):
+        self.solver.close()
+
+    def test_has_unique_solution(self):
+        self.assertTrue(self.solver.has_unique_solution())
+        self.assertEqual(self.solver.solution_count, 1)
+
+        self.board_controller.cells[8][7].model.value = None
+        self.assertFalse(self.solver.has_unique_solution())
+        self.assertEqual(self.solver.solution_count, 2)
+
+    def test_has_unique_solution_with_known_solution(self):
+        """ Only the removed cells are searched for a different digit. """
+        solution = [[int(c) for c in SOLUTION[x * BOARD_SIZE:(x + 1) * BOARD_SIZE]] for x in range(BOARD_SIZE)]
+        self.board_controller.cells[0][0].model.value = None
+        self.assertTrue(self.solver.has_unique_solution(solution, [(0, 0)]))
+        self.board_controller.cells[8][7].model.value = None
+        self.assertFalse(self.solver.has_unique_solution(solution, [(8, 7)]))
+
+    def test_has_other_solution(self):
+        """ Checks flat boards the way a PuzzleGenerator does, with the stats of the check left to read. """
+        values, solution = [int(c) for c in UNIQUE_PUZZLE], [int(c) for c in SOLUTION]
+        values[0] = 0
+        self.assertFalse(self.solver.has_other_solution(values, solution, [0]))
+        values[79] = 0
+        self.assertTrue(self.solver.has_other_solution(values, solution, [79]))
+        self.assertEqual(self.solver.solution_count, 2)
+        self.assertIs(self.solver.stats, self.solver.parallel_solver.stats)
+
+    def test_conflicting_givens(self):
+        self.board_controller.cells[0][2].model.value = 5
+        self.assertFalse(self.solver.has_unique_solution())
+        self.assertEqual(self.solver.solution_count, 0)
+
+    #
+    # Helper Methods
+    #
+
+    @staticmethod
+    def create_board_controller(puzzle: str):
+        """
+        Given an 81 character string, with 0 for blanks, creates a mock board controller for testing purposes.
+        :return: The populated mock board controller.
+        """
+        board_controller = Mock()
+        board_controller.cells = []
+
+        for x in range(BOARD_SIZE):
+            row = []
+            for y in range(BOARD_SIZE):
+                cell_model = CellModel(x, y)
+                cell_model.value = int(puzzle[x * BOARD_SIZE + y]) or None
+                cell = Mock()
+                cell.model = cell_model
+                row.append(cell)
+            board_controller.cells.append(row)
+
+        return board_controller
+
+
+if __name__ == '__main__':
+    unittest.main()
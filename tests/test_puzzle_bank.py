@@ -0,0 +1,212 @@
+import io
+import os
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from core.full_grid import FullGridGenerator
+from core.generator import GeneratedPuzzle, PuzzleGenerator
+from core.geometry import BoardGeometry
+from core.puzzle_bank import PuzzleBank, dedupe_bank, fill_bank, main
+from core.rater import Difficulty
+
+
+class TestPuzzleBank(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'puzzles.sdb')
+        self.puzzles = [PuzzleGenerator(40 + i % 3 * 4, rng=random.Random(i)).generate() for i in range(6)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_append_and_get(self):
+        with PuzzleBank(self.path) as bank:
+            for i, puzzle in enumerate(self.puzzles):
+                self.assertEqual(bank.append(puzzle, Difficulty(i % 3)), i)
+            self.assertEqual(len(bank), len(self.puzzles))
+            for i, puzzle in enumerate(self.puzzles):
+                self.assertPuzzle(bank.get(i), puzzle)
+                self.assertIs(bank.difficulty(i), Difficulty(i % 3))
+            with self.assertRaises(IndexError):
+                bank.get(len(self.puzzles))
+
+    def test_record_size(self):
+        """ Records fit a 9x9 puzzle in 64 bytes, and a 16x16 one in 256, so no record crosses a page. """
+        with PuzzleBank(self.path) as bank:
+            self.assertEqual(bank.record_size, 64)
+            bank.append(self.puzzles[0], Difficulty.EASY)
+        self.assertEqual(os.path.getsize(self.path), 2 * 64)
+        self.assertEqual(PuzzleBank(self.path + '16', BoardGeometry.of(4)).record_size, 256)
+
+    def test_16(self):
+        geometry = BoardGeometry.of(4)
+        puzzle = PuzzleGenerator(60, rng=random.Random(1), geometry=geometry).generate()
+        with PuzzleBank(self.path, geometry) as bank:
+            bank.append(puzzle, Difficulty.MEDIUM)
+            self.assertPuzzle(bank.get(0), puzzle)
+
+    def test_reopen(self):
+        """ A closed bank opens with the same puzzles and index. """
+        with PuzzleBank(self.path) as bank:
+            for i, puzzle in enumerate(self.puzzles):
+                bank.append(puzzle, Difficulty(i % 3))
+            counts = [bank.count(difficulty) for difficulty in Difficulty]
+        with PuzzleBank(self.path) as bank:
+            self.assertEqual(len(bank), len(self.puzzles))
+            self.assertEqual([bank.count(difficulty) for difficulty in Difficulty], counts)
+            self.assertPuzzle(bank.get(5), self.puzzles[5])
+
+    def test_count(self):
+        with PuzzleBank(self.path, flush_every=4) as bank:
+            for i, puzzle in enumerate(self.puzzles):
+                bank.append(puzzle, Difficulty(i % 3))
+            self.assertEqual(bank.count(), 6)
+            self.assertEqual(bank.count(Difficulty.HARD), 2)
+            clues = [puzzle.clue_count() for puzzle in self.puzzles]
+            self.assertEqual(bank.count(max_clues=min(clues)), clues.count(min(clues)))
+            self.assertEqual(bank.count(min_clues=max(clues) + 1), 0)
+
+    def test_random(self):
+        """ Random puzzles come from both the written index and records appended since. """
+        with PuzzleBank(self.path, flush_every=3) as bank:
+            for puzzle in self.puzzles[:4]:
+                bank.append(puzzle, Difficulty.HARD)
+            bank.append(self.puzzles[4], Difficulty.EASY)
+            rng = random.Random(2)
+            picked = {tuple(bank.random(Difficulty.HARD, rng=rng).givens) for _ in range(100)}
+            self.assertEqual(picked, {tuple(puzzle.givens) for puzzle in self.puzzles[:4]})
+            self.assertEqual(bank.random(Difficulty.EASY).givens, self.puzzles[4].givens)
+            self.assertIsNone(bank.random(Difficulty.MEDIUM))
+
+    def test_stale_index(self):
+        """ Records appended after the index was last written are indexed again when the bank opens. """
+        bank = PuzzleBank(self.path)
+        for puzzle in self.puzzles[:3]:
+            bank.append(puzzle, Difficulty.EASY)
+        bank.flush()
+        for puzzle in self.puzzles[3:]:
+            bank.append(puzzle, Difficulty.HARD)
+        bank._file.flush()  # As if the program stopped without closing the bank
+
+        with PuzzleBank(self.path) as reopened:
+            self.assertEqual(reopened.count(Difficulty.EASY), 3)
+            self.assertEqual(reopened.count(Difficulty.HARD), 3)
+        bank._file.close()
+
+        os.remove(self.path + '.idx')
+        with PuzzleBank(self.path) as rebuilt:
+            self.assertEqual(rebuilt.count(), 6)
+
+    def test_rejects_bad_input(self):
+        with PuzzleBank(self.path) as bank:
+            wrong_given = self.puzzles[0].givens[:]
+            index = wrong_given.index(0)
+            wrong_given[index] = self.puzzles[0].solution[index] % 9 + 1
+            with self.assertRaises(ValueError):
+                bank.append(GeneratedPuzzle(wrong_given, self.puzzles[0].solution, []), Difficulty.EASY)
+            with self.assertRaises(ValueError):
+                bank.append(GeneratedPuzzle([0] * 16, [1] * 16, []), Difficulty.EASY)
+        with self.assertRaises(ValueError):
+            PuzzleBank(self.path, BoardGeometry.of(4))
+        with self.assertRaises(ValueError):
+            PuzzleBank(self.path + '25', BoardGeometry.of(5))
+
+        with open(self.path + 'other', 'wb') as file:
+            file.write(b'not a bank')
+        with self.assertRaises(ValueError):
+            PuzzleBank(self.path + 'other')
+
+    def test_unique(self):
+        """ A unique bank refuses a disguised copy of a puzzle it holds, even after it is reopened. """
+        disguised = self.disguise(self.puzzles[0], 1)
+        with PuzzleBank(self.path, unique=True) as bank:
+            self.assertEqual(bank.append(self.puzzles[0], Difficulty.EASY), 0)
+            self.assertIsNone(bank.append(disguised, Difficulty.EASY))
+            self.assertEqual(bank.append(self.puzzles[1], Difficulty.EASY), 1)
+        with PuzzleBank(self.path, unique=True) as bank:
+            self.assertIsNone(bank.append(disguised, Difficulty.HARD))
+            self.assertEqual(len(bank), 2)
+        with PuzzleBank(self.path) as bank:
+            self.assertEqual(bank.append(disguised, Difficulty.EASY), 2)
+        with self.assertRaises(ValueError):
+            PuzzleBank(self.path + '16', BoardGeometry.of(4), unique=True)
+
+    def test_unique_hashes_file(self):
+        """ A unique bank reads hashes from its hashes file, and only reads the records appended after it. """
+        with PuzzleBank(self.path, flush_every=2, unique=True) as bank:
+            for puzzle in self.puzzles[:4]:
+                bank.append(puzzle, Difficulty.EASY)
+        with PuzzleBank(self.path, flush_every=2, unique=True) as bank:
+            self.assertEqual(bank._hashed_count, 4)
+            self.assertEqual(bank._new_hashes, set())
+            self.assertIsNone(bank.append(self.disguise(self.puzzles[2], 1), Difficulty.EASY))
+
+        with PuzzleBank(self.path) as bank:
+            bank.append(self.puzzles[4], Difficulty.EASY)
+        with PuzzleBank(self.path, unique=True) as bank:
+            self.assertEqual(len(bank._new_hashes), 1)
+            self.assertIsNone(bank.append(self.disguise(self.puzzles[4], 2), Difficulty.EASY))
+            self.assertIsNone(bank.append(self.disguise(self.puzzles[0], 3), Difficulty.EASY))
+            self.assertEqual(bank.append(self.puzzles[5], Difficulty.EASY), 5)
+
+        os.remove(self.path + '.hashes')
+        with PuzzleBank(self.path, unique=True) as bank:
+            self.assertIsNone(bank.append(self.disguise(self.puzzles[5], 4), Difficulty.EASY))
+        with PuzzleBank(self.path, unique=True) as bank:
+            self.assertEqual(bank._hashed_count, 6)
+
+    def test_dedupe_bank(self):
+        with PuzzleBank(self.path) as bank:
+            for i, puzzle in enumerate(self.puzzles[:3]):
+                bank.append(puzzle, Difficulty(i))
+                bank.append(self.disguise(puzzle, i), Difficulty(i))
+            with PuzzleBank(self.path + 'distinct', unique=True) as distinct:
+                self.assertEqual(dedupe_bank(bank, distinct), 3)
+                for i, puzzle in enumerate(self.puzzles[:3]):
+                    self.assertPuzzle(distinct.get(i), puzzle)
+                    self.assertIs(distinct.difficulty(i), Difficulty(i))
+            with PuzzleBank(self.path + 'other') as other, self.assertRaises(ValueError):
+                dedupe_bank(bank, other)
+
+    def test_fill_bank(self):
+        with PuzzleBank(self.path) as bank:
+            added = fill_bank(bank, 3, 45, seed=1)
+            self.assertEqual(sum(added.values()), 3)
+            self.assertEqual(len(bank), 3)
+            self.assertTrue(all(len(bank.get(i).removed) >= 45 for i in range(3)))
+
+    def test_main(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main([self.path, '-n', '2', '--seed', '1']), 0)
+        self.assertEqual(sum(int(line.split(': ')[1]) for line in output.getvalue().splitlines()), 2)
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main([self.path, '--dedupe', self.path + 'distinct']), 0)
+        self.assertEqual(sum(int(line.split(': ')[1]) for line in output.getvalue().splitlines()), 2)
+
+    #
+    # Helper Methods
+    #
+
+    def assertPuzzle(self, loaded: GeneratedPuzzle, puzzle: GeneratedPuzzle):
+        """ Asserts a puzzle read from the bank has the givens and solution it was stored with. """
+        self.assertEqual(loaded.givens, puzzle.givens)
+        self.assertEqual(loaded.solution, puzzle.solution)
+        self.assertEqual(sorted(loaded.removed), sorted(puzzle.removed))
+
+    @staticmethod
+    def disguise(puzzle: GeneratedPuzzle, seed: int) -> GeneratedPuzzle:
+        """ Relabels, permutes and transposes a puzzle and its solution the same way. """
+        generator = FullGridGenerator()
+        givens = generator.transform(puzzle.givens, random.Random(seed))
+        solution = generator.transform(puzzle.solution, random.Random(seed))
+        return GeneratedPuzzle(givens, solution, [index for index, num in enumerate(givens) if not num])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import random
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock
+
+from core.exact_cover import ExactCoverSolver
+from core.generator import PuzzleGenerator
+from core.geometry import CLASSIC
+from core.puzzle_bank import PuzzleBank
+from core.puzzle_pool import PuzzlePool
+
+
+class TestPuzzlePool(unittest.TestCase):
+
+    def tearDown(self):
+        if hasattr(self, 'pool'):
+            self.pool.close()
+
+    def test_refill(self):
+        """ The worker fills every pool, and makes another puzzle for each one taken. """
+        self.pool = PuzzlePool({20: PuzzleGenerator(20, rng=random.Random(1)),
+                                40: PuzzleGenerator(40, rng=random.Random(2))}, depth=2)
+        self.pool.start()
+        self.assertTrue(self.pool.wait(30))
+        self.assertEqual([self.pool.count(20), self.pool.count(40)], [2, 2])
+
+        puzzle = self.pool.take(40)
+        self.assertGreaterEqual(len(puzzle.removed), 40)
+        self.assertEqual(ExactCoverSolver().count_solutions(puzzle.givens), 1)
+        self.assertTrue(self.pool.wait(30))
+        self.assertEqual(self.pool.count(40), 2)
+
+    def test_take_in_order(self):
+        """ Puzzles are taken in the order they were made. """
+        self.pool = PuzzlePool({'easy': self.create_generator()}, depth=3)
+        self.pool.start()
+        self.pool.wait(5)
+        self.assertEqual([self.pool.take('easy') for _ in range(3)], [0, 1, 2])
+
+    def test_take_empty_pool(self):
+        """ Without a worker, each puzzle is generated on the calling thread. """
+        generator = self.create_generator()
+        pool = PuzzlePool({'easy': generator})
+        self.assertEqual(pool.take('easy'), 0)
+        self.assertEqual(generator.generate.call_count, 1)
+        self.assertEqual(pool.count('easy'), 0)
+
+    def test_emptiest_first(self):
+        """ The worker tops up the pool with the fewest puzzles first, so no difficulty waits on another. """
+        order = []
+        generators = {key: self.create_generator(lambda key=key: order.append(key)) for key in ('easy', 'hard')}
+        self.pool = PuzzlePool(generators, depth=2)
+        self.pool.start()
+        self.pool.wait(5)
+        self.assertEqual(order, ['easy', 'hard', 'easy', 'hard'])
+
+        self.pool.take('hard')
+        self.pool.wait(5)
+        self.assertEqual(order[-1], 'hard')
+
+    def test_pause(self):
+        """ A paused worker makes no puzzles until resumed. """
+        generator = self.create_generator()
+        self.pool = PuzzlePool({'easy': generator})
+        self.pool.pause()
+        self.pool.start()
+        self.assertFalse(self.pool.wait(0.1))
+        self.assertTrue(self.pool.is_paused())
+        generator.generate.assert_not_called()
+
+        self.pool.resume()
+        self.assertTrue(self.pool.wait(5))
+        self.assertEqual(self.pool.count('easy'), self.pool.depth)
+
+    def test_close(self):
+        """ Closing stops the worker, while ready puzzles can still be taken. """
+        self.pool = PuzzlePool({'easy': self.create_generator()}, depth=1)
+        self.pool.start()
+        self.pool.wait(5)
+        self.pool.close()
+        self.pool._worker.join(5)
+        self.assertFalse(self.pool._worker.is_alive())
+        self.assertEqual(self.pool.take('easy'), 0)
+
+    def test_bank(self):
+        """ Puzzles made by the worker are saved to the bank, and drawn from it when a pool runs dry. """
+        with tempfile.TemporaryDirectory() as directory, PuzzleBank(os.path.join(directory, 'puzzles.sdb')) as bank:
+            pool = PuzzlePool({24: PuzzleGenerator(24, rng=random.Random(1))}, depth=2, bank=bank)
+            pool.start()
+            self.assertTrue(pool.wait(30))
+            pool.close()
+            self.assertEqual(len(bank), 2)
+
+            generator = self.create_generator()
+            generator.geometry, generator.target_count = CLASSIC, 24
+            puzzle = PuzzlePool({24: generator}, bank=bank).take(24)
+            generator.generate.assert_not_called()
+            self.assertIn(puzzle.givens, [bank.get(0).givens, bank.get(1).givens])
+
+            generator.target_count = 60  # No puzzle in the bank has so few clues
+            PuzzlePool({60: generator}, bank=bank).take(60)
+            generator.generate.assert_called_once()
+
+    #
+    # Helper Methods
+    #
+
+    @staticmethod
+    def create_generator(on_generate=None) -> Mock:
+        """ Creates a generator that quickly makes numbered puzzles, calling on_generate before each one. """
+        generator = Mock()
+        puzzles = iter(range(1000))
+
+        def generate():
+            if on_generate is not None:
+                on_generate()
+            time.sleep(0.001)
+            return next(puzzles)
+        generator.generate = Mock(side_effect=generate)
+        return generator
+
+
+if __name__ == '__main__':
+    unittest.main()
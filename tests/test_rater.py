@@ -0,0 +1,79 @@
+import time
+import unittest
+
+from core.cancellation import StopReason
+from core.logic import Technique
+from core.rater import Difficulty, PuzzleRater
+
+EASY_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+HARD_PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+NAKED_PAIR_PUZZLE = "070000020500070006010908050040030090900704005080020040050401060100080002030000010"
+X_WING_PUZZLE = "020000050057604210900000007000357000600409003000861000100000002098103760070000090"
+# Gets every technique stuck, after which a minimum remaining values search took a minute and millions of nodes
+SLOW_SEARCH_PUZZLE = ".....6....59.....82....8....45........3........6..3.54...325..6.................."
+
+
+class TestPuzzleRater(unittest.TestCase):
+
+    def test_easy(self):
+        """ A puzzle solved by singles alone is easy, and needs no search. """
+        rating = PuzzleRater().rate(self.values_from_string(EASY_PUZZLE))
+        self.assertEqual(rating.difficulty, Difficulty.EASY)
+        self.assertEqual(rating.clue_count, 30)
+        self.assertEqual(rating.propagated_count, 51)
+        self.assertEqual(rating.node_count, 0)
+
+    def test_hard(self):
+        """ A puzzle that gets every technique stuck is hard, and searched. """
+        rating = PuzzleRater().rate(self.values_from_string(HARD_PUZZLE))
+        self.assertEqual(rating.difficulty, Difficulty.HARD)
+        self.assertGreater(rating.node_count, 0)
+
+    def test_medium(self):
+        """ A puzzle that needs a naked pair is medium, whatever its number of givens. """
+        rating = PuzzleRater().rate(self.values_from_string(NAKED_PAIR_PUZZLE))
+        self.assertEqual(rating.difficulty, Difficulty.MEDIUM)
+        self.assertIs(rating.technique, Technique.NAKED_PAIR)
+        self.assertEqual(rating.node_count, 0)
+        self.assertEqual(rating.clue_count + rating.propagated_count, 81)
+
+    def test_hard_technique(self):
+        """ Puzzles needing the hard technique or a later one are hard, without a search. """
+        rating = PuzzleRater().rate(self.values_from_string(X_WING_PUZZLE))
+        self.assertEqual(rating.difficulty, Difficulty.HARD)
+        self.assertIs(rating.technique, Technique.X_WING)
+        self.assertEqual(rating.node_count, 0)
+
+        rating = PuzzleRater(hard_technique=Technique.SWORDFISH).rate(self.values_from_string(X_WING_PUZZLE))
+        self.assertEqual(rating.difficulty, Difficulty.MEDIUM)
+
+    def test_slow_search(self):
+        """ The search once the techniques are stuck settles boards that stalled a backtracking search. """
+        start = time.monotonic()
+        rating = PuzzleRater().rate(self.values_from_string(SLOW_SEARCH_PUZZLE))
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(rating.difficulty, Difficulty.HARD)
+        self.assertIs(rating.stop_reason, StopReason.COMPLETED)
+
+    def test_time_limit(self):
+        """ A search that runs out of time gives a hard rating with the reason it stopped, instead of blocking. """
+        rating = PuzzleRater(time_limit=0).rate(self.values_from_string(SLOW_SEARCH_PUZZLE))
+        self.assertEqual(rating.difficulty, Difficulty.HARD)
+        self.assertIs(rating.stop_reason, StopReason.DEADLINE)
+
+    def test_no_solution(self):
+        self.assertIsNone(PuzzleRater().rate(self.values_from_string('11' + '0' * 79)))
+        self.assertIsNone(PuzzleRater().rate(self.values_from_string(EASY_PUZZLE[:-1] + '8')))
+
+    #
+    # Helper Methods
+    #
+
+    @staticmethod
+    def values_from_string(puzzle: str) -> list[int]:
+        """ Converts an 81 character string, with 0 for blanks, to a flat list of values. """
+        return [0 if char == '.' else int(char) for char in puzzle]
+
+
+if __name__ == '__main__':
+    unittest.main()
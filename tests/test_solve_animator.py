@@ -0,0 +1,186 @@
+import time
+import unittest
+from unittest.mock import Mock
+
+from core.cancellation import StopReason
+from models.cell_model import CellModel
+from models.cell_value_type import CellValueType
+from utils.constants import BOARD_SIZE
+from utils.solve_animator import SolveAnimator
+
+UNIQUE_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+HARD_PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+NO_SOLUTION_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080071"
+
+
+class TestSolveAnimator(unittest.TestCase):
+
+    def setUp(self):
+        self.widget = Mock()
+        self.frames = []
+        self.widget.after = lambda delay, callback: self.frames.append(callback)
+
+    def test_animates_solution(self):
+        """ The board ends up solved, with the new cells shown as entries and the givens untouched. """
+        board_controller = self.create_board_controller(HARD_PUZZLE)
+        animator = SolveAnimator(board_controller, self.widget)
+        results = []
+        animator.start(results.append)
+        self.assertTrue(animator.is_running())
+        self.run_frames()
+
+        self.assertEqual(results, [True])
+        self.assertFalse(animator.is_running())
+        self.assertGreater(animator.frame_count, 0)
+        self.assertTrue(all(cell.model.value is not None for row in board_controller.cells for cell in row))
+        self.assertEqual(board_controller.cells[0][0].model.value, 8)
+        self.assertEqual(board_controller.cells[0][1].model.value_type, CellValueType.ENTRY)
+
+    def test_frames_coalesce_changes(self):
+        """ Each cell is drawn at most once per frame, however many times the search changed it. """
+        board_controller = self.create_board_controller(HARD_PUZZLE)
+        notifications = []
+        for row in board_controller.cells:
+            for cell in row:
+                cell.model.notify = lambda: notifications.append(1)
+
+        animator = SolveAnimator(board_controller, self.widget, use_propagation=False, speed=10 ** 9)
+        animator.start()
+        animator._worker.join()
+        self.run_frames()
+        self.assertEqual(animator.frame_count, 1)
+        self.assertGreater(len(animator.trace), HARD_PUZZLE.count('0'))
+        self.assertLessEqual(len(notifications), HARD_PUZZLE.count('0'))
+
+    def test_playback_speed(self):
+        """ Each frame plays the number of steps the speed allows. """
+        board_controller = self.create_board_controller(UNIQUE_PUZZLE)
+        animator = SolveAnimator(board_controller, self.widget, frame_rate=10, speed=20)
+        animator.start()
+        animator._worker.join()
+        self.run_frames(frame_count=1)
+        self.assertEqual(animator.step, 2)
+        self.assertEqual(animator.frame_count, 1)
+
+    def test_seek(self):
+        """ Seeking shows the board as it was at that step, forwards or backwards, and jumping finishes playback. """
+        board_controller = self.create_board_controller(HARD_PUZZLE)
+        animator = SolveAnimator(board_controller, self.widget, speed=1)
+        results = []
+        animator.start(results.append)
+        animator._worker.join()
+        self.run_frames(frame_count=1)
+
+        for step in [5000, 100, len(animator.trace) // 2, 0]:
+            animator.seek(step)
+            expected = ''.join(map(str, animator.trace.state_at(step)))
+            self.assertEqual(self.read_board(board_controller), expected)
+
+        animator.jump_to_end()
+        self.run_frames()
+        self.assertEqual(results, [True])
+        self.assertFalse(animator.is_running())
+        self.assertTrue(all(cell.model.value is not None for row in board_controller.cells for cell in row))
+
+    def test_no_solution(self):
+        """ A board with no solution is left the way it was found. """
+        board_controller = self.create_board_controller(NO_SOLUTION_PUZZLE)
+        animator = SolveAnimator(board_controller, self.widget)
+        results = []
+        animator.start(results.append)
+        self.run_frames()
+        self.assertEqual(results, [False])
+        self.assertEqual(self.read_board(board_controller), NO_SOLUTION_PUZZLE)
+
+    def test_max_iterations(self):
+        """ A search that runs out of iterations finishes unsolved, leaving the board the way it was found. """
+        board_controller = self.create_board_controller(HARD_PUZZLE)
+        animator = SolveAnimator(board_controller, self.widget, use_propagation=False, max_iterations=100)
+        results = []
+        animator.start(results.append)
+        self.run_frames()
+        self.assertEqual(results, [False])
+        self.assertEqual(animator.stop_reason, StopReason.MAX_ITERATIONS)
+        self.assertEqual(self.read_board(board_controller), HARD_PUZZLE)
+
+    def test_cancel(self):
+        """ Cancelling stops the search and restores the board. """
+        board_controller = self.create_board_controller(HARD_PUZZLE)
+        animator = SolveAnimator(board_controller, self.widget, use_propagation=False)
+        animator.start()
+        animator.cancel()
+        self.run_frames()
+        self.assertFalse(animator.is_running())
+        self.assertFalse(animator.solved)
+        self.assertEqual(animator.stop_reason, StopReason.CANCELLED)
+        self.assertEqual(self.read_board(board_controller), HARD_PUZZLE)
+
+    def test_cancel_playback(self):
+        """ Cancelling during playback puts the board back the way it was found. """
+        board_controller = self.create_board_controller(HARD_PUZZLE)
+        animator = SolveAnimator(board_controller, self.widget, speed=1000)
+        results = []
+        animator.start(results.append)
+        animator._worker.join()
+        self.run_frames(frame_count=1)
+        self.assertNotEqual(self.read_board(board_controller), HARD_PUZZLE)
+
+        animator.cancel()
+        self.run_frames()
+        self.assertEqual(results, [False])
+        self.assertEqual(animator.stop_reason, StopReason.CANCELLED)
+        self.assertEqual(self.read_board(board_controller), HARD_PUZZLE)
+
+    def test_cancel_discards_events(self):
+        """ Discarding stops drawing, for when the board is about to be replaced. """
+        board_controller = self.create_board_controller(UNIQUE_PUZZLE)
+        animator = SolveAnimator(board_controller, self.widget)
+        results = []
+        animator.start(results.append)
+        animator.cancel(discard_events=True)
+        self.run_frames()
+        self.assertEqual(results, [])
+        self.assertEqual(self.read_board(board_controller), UNIQUE_PUZZLE)
+
+    #
+    # Helper Methods
+    #
+
+    def run_frames(self, timeout=10, frame_count: int = None):
+        """
+        Runs the scheduled frames, as the Tk event loop would, until no more are scheduled.
+        :param frame_count: If given, stops after running this many frames
+        """
+        end = time.monotonic() + timeout
+        while self.frames and time.monotonic() < end and frame_count != 0:
+            self.frames.pop(0)()
+            frame_count = None if frame_count is None else frame_count - 1
+            time.sleep(0.001)
+
+    @staticmethod
+    def read_board(board_controller) -> str:
+        """ Returns the values on the board as an 81 character string, with 0 for blanks. """
+        return ''.join(str(cell.model.value or 0) for row in board_controller.cells for cell in row)
+
+    @staticmethod
+    def create_board_controller(puzzle: str):
+        """
+        Given an 81 character string, with 0 for blanks, creates a mock board controller for testing purposes.
+        :return: The populated mock board controller.
+        """
+        board_controller = Mock()
+        board_controller.cells = []
+        for x in range(BOARD_SIZE):
+            row = []
+            for y in range(BOARD_SIZE):
+                cell_model = CellModel(x, y)
+                cell_model.value = int(puzzle[x * BOARD_SIZE + y]) or None
+                cell = Mock()
+                cell.model = cell_model
+                row.append(cell)
+            board_controller.cells.append(row)
+        return board_controller
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,329 @@
+import random
+import sys
+import unittest
+
+from core.cancellation import CHECK_INTERVAL, CancellationToken, StopReason, deadline_in
+from core.grid import BitmaskGrid, ALL_DIGITS, parse_puzzle
+from utils.constants import BOARD_SIZE
+from core.solver import BacktrackMode, GridSolver, CellOrder
+from core.transposition import TranspositionCache
+
+UNIQUE_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+NON_UNIQUE_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080009"
+HARD_PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+PUZZLE_16 = "3B1F0074GD00AC297600EFDA21C5003B000200300600E000DE002000000B0017A06700CB1G00280FE00D90000007G004B003800000025001200G7EF15CD3B0065004C92F683D100G60014000000C900DG0081000000FC003F03C00879B00450E4F00G000000800EA000E004005003000CG00AD9EF3460058137A0052DE00FB4C"
+
+
+class TestGridSolver(unittest.TestCase):
+
+    def test_solve(self):
+        """ Solving fills every cell without breaking any house. """
+        for cell_order in CellOrder:
+            grid = self.grid_from_string(HARD_PUZZLE)
+            solver = GridSolver(cell_order)
+            self.assertTrue(solver.solve(grid))
+            self.assertValidSolution(grid, HARD_PUZZLE)
+
+    def test_solve_shuffled(self):
+        """ Shuffling the digit order still produces a valid grid. """
+        grid = BitmaskGrid()
+        self.assertTrue(GridSolver(shuffle=True).solve(grid))
+        self.assertValidSolution(grid, '0' * 81)
+
+    def test_solve_seeded(self):
+        """ Shuffling with generators seeded the same gives the same grid. """
+        grids = [BitmaskGrid() for _ in range(3)]
+        for grid, seed in zip(grids, [5, 5, 6]):
+            GridSolver(shuffle=True, rng=random.Random(seed)).solve(grid)
+        self.assertEqual(grids[0].values, grids[1].values)
+        self.assertNotEqual(grids[0].values, grids[2].values)
+
+    def test_on_solution(self):
+        """ Each solution is passed to on_solution as soon as it is found, as well as added to solutions. """
+        solutions, reported = [], []
+        count = GridSolver().count_solutions(self.grid_from_string(NON_UNIQUE_PUZZLE), 5, solutions,
+                                             on_solution=lambda values: reported.append(values[:]))
+        self.assertEqual(count, 2)
+        self.assertEqual(reported, solutions)
+
+    def test_has_unique_solution(self):
+        for cell_order in CellOrder:
+            solver = GridSolver(cell_order)
+            self.assertTrue(solver.has_unique_solution(self.grid_from_string(UNIQUE_PUZZLE)))
+            self.assertFalse(solver.has_unique_solution(self.grid_from_string(NON_UNIQUE_PUZZLE)))
+
+    def test_count_solutions_limit(self):
+        """ Counting stops at the limit, and returns the solutions found when asked. """
+        solver = GridSolver()
+        solutions = []
+        self.assertEqual(solver.count_solutions(BitmaskGrid(), 3, solutions), 3)
+        self.assertEqual(len(solutions), 3)
+        self.assertEqual(len({tuple(solution) for solution in solutions}), 3)
+        for solution in solutions:
+            self.assertValidSolution(BitmaskGrid.from_values(solution), '0' * 81)
+
+    def test_count_solutions_exact(self):
+        """ A count below the limit is the exact number of solutions. """
+        solver = GridSolver(CellOrder.MINIMUM_REMAINING_VALUES)
+        self.assertEqual(solver.count_solutions(self.grid_from_string(NON_UNIQUE_PUZZLE), 10), 2)
+        solutions = []
+        self.assertEqual(solver.count_solutions(self.grid_from_string(UNIQUE_PUZZLE), 10, solutions), 1)
+        self.assertEqual(solutions[0][:9], [5, 3, 4, 6, 7, 8, 9, 1, 2])
+
+    def test_has_other_solution(self):
+        """ Finds a second solution by forbidding the known digit, and leaves the grid unchanged. """
+        solutions = []
+        GridSolver().count_solutions(self.grid_from_string(UNIQUE_PUZZLE), 1, solutions)
+        solver = GridSolver(CellOrder.MINIMUM_REMAINING_VALUES)
+
+        unique_grid = self.grid_from_string(UNIQUE_PUZZLE)
+        self.assertFalse(solver.has_other_solution(unique_grid, solutions[0]))
+
+        grid = self.grid_from_string(NON_UNIQUE_PUZZLE)
+        self.assertTrue(solver.has_other_solution(grid, solutions[0]))
+        self.assertEqual(grid.values, self.grid_from_string(NON_UNIQUE_PUZZLE).values)
+
+    def test_has_other_solution_removed_cells(self):
+        """ Only the removed cells need to be searched when the grid was unique before. """
+        solutions = []
+        GridSolver().count_solutions(self.grid_from_string(UNIQUE_PUZZLE), 1, solutions)
+        removed = 8 * BOARD_SIZE + 7  # The clue that separates the unique and non unique puzzles
+        grid = self.grid_from_string(NON_UNIQUE_PUZZLE)
+        self.assertTrue(GridSolver().has_other_solution(grid, solutions[0], [removed]))
+        self.assertFalse(GridSolver().has_other_solution(grid, solutions[0], [0, 2]))  # Not blank, or forced
+
+    def test_unique_check_leaves_grid_unchanged(self):
+        grid = self.grid_from_string(NON_UNIQUE_PUZZLE)
+        before = grid.copy()
+        GridSolver().has_unique_solution(grid)
+        self.assertEqual(grid.values, before.values)
+        self.assertEqual(grid.rows, before.rows)
+        self.assertEqual(grid.subgrids, before.subgrids)
+
+    def test_max_iterations(self):
+        """ Stops after max_iterations and restores the grid. """
+        grid = BitmaskGrid()
+        solver = GridSolver(max_iterations=10)
+        self.assertFalse(solver.solve(grid))
+        self.assertEqual(solver.iter_count, 10)
+        self.assertTrue(solver.hit_max_iterations)
+        self.assertEqual(grid.values, [0] * BOARD_SIZE * BOARD_SIZE)
+
+    def test_max_iterations_is_not_unique(self):
+        """ A uniqueness check that gives up early does not claim the grid is unique. """
+        solver = GridSolver(max_iterations=5)
+        self.assertFalse(solver.has_unique_solution(self.grid_from_string(HARD_PUZZLE)))
+
+    def test_deadline(self):
+        """ A deadline that has passed stops the search, leaving the grid unchanged. """
+        grid = self.grid_from_string(HARD_PUZZLE)
+        solver = GridSolver()
+        self.assertFalse(solver.solve(grid, deadline=deadline_in(-1)))
+        self.assertEqual(solver.stop_reason, StopReason.DEADLINE)
+        self.assertEqual(grid.values, self.grid_from_string(HARD_PUZZLE).values)
+
+        self.assertTrue(solver.solve(grid, deadline=deadline_in(60)))
+        self.assertEqual(solver.stop_reason, StopReason.COMPLETED)
+
+    def test_cancel_during_search(self):
+        """ The token is checked every CHECK_INTERVAL iterations, and the search unwinds when it is cancelled. """
+        grid = self.grid_from_string(HARD_PUZZLE)
+        token = CancellationToken()
+        placed = []
+
+        def on_place(x, y, num):
+            placed.append((x, y))
+            if len(placed) == 10:
+                token.cancel()
+
+        solver = GridSolver()
+        self.assertFalse(solver.solve(grid, on_place=on_place, cancel_token=token))
+        self.assertEqual(solver.stop_reason, StopReason.CANCELLED)
+        self.assertEqual(solver.iter_count, CHECK_INTERVAL)
+        self.assertFalse(solver.hit_max_iterations)
+        self.assertEqual(grid.values, self.grid_from_string(HARD_PUZZLE).values)
+
+    def test_stopped_checks_are_not_unique(self):
+        """ A uniqueness check that stops early does not claim the grid is unique. """
+        token = CancellationToken()
+        token.cancel()
+        solver = GridSolver()
+        self.assertFalse(solver.has_unique_solution(self.grid_from_string(UNIQUE_PUZZLE), cancel_token=token))
+        self.assertEqual(solver.stop_reason, StopReason.CANCELLED)
+
+        solution = self.grid_from_string(UNIQUE_PUZZLE)
+        solver.solve(solution)
+        self.assertTrue(solver.has_other_solution(self.grid_from_string(UNIQUE_PUZZLE), solution.values,
+                                                  deadline=deadline_in(-1)))
+        self.assertEqual(solver.stop_reason, StopReason.DEADLINE)
+
+    def test_callbacks_mirror_the_search(self):
+        """ Every removal reported matches an earlier placement, and the final placements form the solution. """
+        grid = self.grid_from_string(HARD_PUZZLE)
+        mirror = {}
+        GridSolver(CellOrder.MINIMUM_REMAINING_VALUES).solve(
+            grid,
+            on_place=lambda x, y, num: mirror.__setitem__((x, y), num),
+            on_remove=lambda x, y: mirror.pop((x, y)))
+        for (x, y), num in mirror.items():
+            self.assertEqual(grid.get(x, y), num)
+        self.assertEqual(len(mirror), HARD_PUZZLE.count('0'))
+
+    def test_does_not_recurse(self):
+        """ The search depth is not limited by the interpreter's recursion limit. """
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(60)
+        try:
+            grid = BitmaskGrid()
+            self.assertTrue(GridSolver().solve(grid))
+        finally:
+            sys.setrecursionlimit(limit)
+        self.assertValidSolution(grid, '0' * 81)
+
+    def test_stats(self):
+        """ Each check gets new stats covering all of its searches, which are passed to the hook. """
+        reported = []
+        solver = GridSolver(CellOrder.MINIMUM_REMAINING_VALUES, on_stats=reported.append)
+        self.assertTrue(solver.solve(self.grid_from_string(HARD_PUZZLE)))
+        stats = solver.stats
+        self.assertEqual(reported, [stats])
+        self.assertEqual(stats.node_count, solver.node_count)
+        self.assertEqual(stats.candidates_tested, solver.iter_count)
+        self.assertEqual(stats.dead_end_count, solver.dead_end_count)
+        self.assertGreater(stats.backtrack_count, 0)
+        self.assertEqual(stats.solution_count, 1)
+        self.assertIn('search', stats.phase_times)
+
+        solutions = []
+        solver.count_solutions(self.grid_from_string(UNIQUE_PUZZLE), 1, solutions)
+        solver.has_other_solution(self.grid_from_string(NON_UNIQUE_PUZZLE), solutions[0])
+        self.assertEqual(len(reported), 3)
+        self.assertIsNot(reported[2], stats)
+        self.assertEqual(reported[2].solution_count, 1)
+
+    def test_full_grid(self):
+        """ A grid with nothing blank counts as its own solution. """
+        grid = BitmaskGrid()
+        GridSolver().solve(grid)
+        self.assertTrue(GridSolver().has_unique_solution(grid))
+
+    #
+    # Helper Methods
+    #
+
+    def test_solve_16(self):
+        """ A 16x16 board is solved the same way, and the unique check works on it. """
+        grid = BitmaskGrid.from_values(parse_puzzle(PUZZLE_16))
+        self.assertTrue(GridSolver(CellOrder.MINIMUM_REMAINING_VALUES).solve(grid))
+        self.assertNotIn(0, grid.values)
+        self.assertTrue(all(mask == grid.geometry.all_digits for mask in grid.rows + grid.columns + grid.subgrids))
+        self.assertTrue(GridSolver(CellOrder.MINIMUM_REMAINING_VALUES).has_unique_solution(
+            BitmaskGrid.from_values(parse_puzzle(PUZZLE_16))))
+
+    def test_cache(self):
+        """ A cached search gives the same counts as one without, and skips states earlier searches finished. """
+        solver = GridSolver(max_iterations=None, cache=TranspositionCache())
+        self.assertEqual(solver.count_solutions(self.grid_from_string(UNIQUE_PUZZLE), 2), 1)
+        self.assertEqual(solver.stats.cache_hits, 0)
+        first_nodes = solver.stats.node_count
+
+        # With the first given removed, putting it back reaches the board the first search finished
+        grid = self.grid_from_string('0' + UNIQUE_PUZZLE[1:])
+        expected = GridSolver(max_iterations=None).count_solutions(grid, 2)
+        self.assertEqual(solver.count_solutions(grid, 2), expected)
+        self.assertGreater(solver.stats.cache_hits, 0)
+        self.assertGreater(solver.stats.cache_hit_rate, 0)
+
+        # The same board again is answered one level down
+        self.assertEqual(solver.count_solutions(self.grid_from_string(UNIQUE_PUZZLE), 2), 1)
+        self.assertLess(solver.stats.node_count, first_nodes)
+
+    def test_cache_lower_bounds(self):
+        """ States left at the limit are stored as lower bounds, which can only end a search that needs no more. """
+        cache = TranspositionCache()
+        solver = GridSolver(CellOrder.MINIMUM_REMAINING_VALUES, cache=cache)
+        self.assertEqual(solver.count_solutions(BitmaskGrid(), 2), 2)
+        self.assertEqual(solver.count_solutions(BitmaskGrid(), 5), 5)
+        self.assertEqual(solver.count_solutions(BitmaskGrid(), 1), 1)
+        self.assertTrue(solver.has_unique_solution(self.grid_from_string(UNIQUE_PUZZLE)))
+        self.assertFalse(solver.has_unique_solution(self.grid_from_string(NON_UNIQUE_PUZZLE)))
+
+    def test_cache_with_solutions(self):
+        """ Solutions are still returned when asked for, as cached counts have no values. """
+        solver = GridSolver(max_iterations=None, cache=TranspositionCache())
+        solver.count_solutions(self.grid_from_string(NON_UNIQUE_PUZZLE), 5)
+        solutions = []
+        self.assertEqual(solver.count_solutions(self.grid_from_string(NON_UNIQUE_PUZZLE), 5, solutions), 2)
+        self.assertEqual(len(solutions), 2)
+        self.assertNotEqual(solutions[0], solutions[1])
+
+    def test_backjumping(self):
+        """ Backjumping finds the same solutions as going back one cell at a time, with fewer nodes. """
+        for cell_order in CellOrder:
+            for puzzle, limit in ((HARD_PUZZLE, 2), (NON_UNIQUE_PUZZLE, 5), ('0' * 81, 3)):
+                counts, found = [], []
+                for backtrack_mode in BacktrackMode:
+                    grid = self.grid_from_string(puzzle)
+                    solutions = []
+                    solver = GridSolver(cell_order, None, backtrack_mode=backtrack_mode)
+                    counts.append(solver.count_solutions(grid, limit, solutions))
+                    found.append(solutions)
+                    self.assertEqual(grid.values, self.grid_from_string(puzzle).values)
+                self.assertEqual(counts[0], counts[1])
+                self.assertEqual(found[0], found[1])
+
+        chronological = GridSolver(max_iterations=None)
+        backjumping = GridSolver(max_iterations=None, backtrack_mode=BacktrackMode.CONFLICT_DIRECTED)
+        for solver in (chronological, backjumping):
+            grid = self.grid_from_string(HARD_PUZZLE)
+            self.assertTrue(solver.solve(grid))
+            self.assertValidSolution(grid, HARD_PUZZLE)
+        self.assertLess(backjumping.node_count, chronological.node_count)
+        self.assertGreater(backjumping.backjump_count, 0)
+        self.assertEqual(chronological.backjump_count, 0)
+
+    def test_backjumping_other_solution(self):
+        """ Checks against a known solution give the same answers with backjumping. """
+        solver = GridSolver(CellOrder.MINIMUM_REMAINING_VALUES, backtrack_mode=BacktrackMode.CONFLICT_DIRECTED)
+        solutions = []
+        solver.count_solutions(self.grid_from_string(UNIQUE_PUZZLE), 1, solutions)
+        self.assertFalse(solver.has_other_solution(self.grid_from_string(UNIQUE_PUZZLE), solutions[0]))
+        self.assertTrue(solver.has_other_solution(self.grid_from_string(NON_UNIQUE_PUZZLE), solutions[0]))
+
+    def test_backjumping_callbacks(self):
+        """ Every digit removed by a jump is reported, so the callbacks still mirror the search. """
+        values = [0] * 81
+        solver = GridSolver(backtrack_mode=BacktrackMode.CONFLICT_DIRECTED)
+        grid = self.grid_from_string(HARD_PUZZLE)
+
+        def place(x, y, num):
+            values[x * 9 + y] = num
+
+        def remove(x, y):
+            values[x * 9 + y] = 0
+
+        self.assertTrue(solver.solve(grid, on_place=place, on_remove=remove))
+        self.assertEqual([num or given for num, given in zip(values, grid.values)], grid.values)
+        self.assertEqual([0 if int(c) else num for num, c in zip(values, HARD_PUZZLE)], values)
+
+    def test_backjumping_without_cache(self):
+        with self.assertRaises(ValueError):
+            GridSolver(cache=TranspositionCache(), backtrack_mode=BacktrackMode.CONFLICT_DIRECTED)
+
+    def assertValidSolution(self, grid: BitmaskGrid, puzzle: str):
+        """ Checks the grid is completely filled, with every house full and the givens unchanged. """
+        self.assertNotIn(0, grid.values)
+        self.assertTrue(all(mask == ALL_DIGITS for mask in grid.rows + grid.columns + grid.subgrids))
+        for index, given in enumerate(puzzle):
+            if given != '0':
+                self.assertEqual(grid.values[index], int(given))
+
+    @staticmethod
+    def grid_from_string(puzzle: str) -> BitmaskGrid:
+        """ Creates a grid from an 81 character string, with 0 for blanks. """
+        return BitmaskGrid.from_rows([[int(c) for c in puzzle[x * BOARD_SIZE:(x + 1) * BOARD_SIZE]]
+                                      for x in range(BOARD_SIZE)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import logging
+import unittest
+
+from core.stats import SolverStats, log_stats
+
+
+class TestSolverStats(unittest.TestCase):
+
+    def test_dead_ends_by_depth(self):
+        stats = SolverStats()
+        stats.add_dead_end(3)
+        stats.add_dead_end(3)
+        stats.add_dead_end(7)
+        self.assertEqual(stats.dead_ends_by_depth, {3: 2, 7: 1})
+        self.assertEqual(stats.dead_end_count, 3)
+
+    def test_phase(self):
+        """ Time spent in a phase is added up over every time it is entered. """
+        stats = SolverStats()
+        with stats.phase('search'):
+            pass
+        first = stats.phase_times['search']
+        with stats.phase('search'):
+            pass
+        self.assertGreaterEqual(stats.phase_times['search'], first)
+        self.assertEqual(list(stats.phase_times), ['search'])
+
+    def test_merge(self):
+        stats, other = SolverStats(), SolverStats()
+        stats.node_count, other.node_count = 2, 3
+        other.backtrack_count = 4
+        stats.add_dead_end(1)
+        other.add_dead_end(1)
+        other.phase_times['search'] = 0.5
+        stats.merge(other)
+        self.assertEqual(stats.node_count, 5)
+        self.assertEqual(stats.backtrack_count, 4)
+        self.assertEqual(stats.dead_ends_by_depth, {1: 2})
+        self.assertEqual(stats.as_dict()['phase_times'], {'search': 0.5})
+
+    def test_cache_hit_rate(self):
+        stats, other = SolverStats(), SolverStats()
+        self.assertEqual(stats.cache_hit_rate, 0.0)
+        stats.cache_lookups, stats.cache_hits = 3, 1
+        other.cache_lookups, other.cache_hits = 1, 1
+        stats.merge(other)
+        self.assertEqual(stats.cache_hit_rate, 0.5)
+        self.assertIn('50% of 4 cache lookups hit', str(stats))
+
+    def test_log_stats(self):
+        stats = SolverStats()
+        stats.node_count = 12
+        logger = logging.getLogger('test_stats')
+        with self.assertLogs(logger, logging.INFO) as logs:
+            log_stats(logger, logging.INFO, 'uniqueness')(stats)
+        self.assertIn('uniqueness: 12 nodes', logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,13 @@
-﻿import unittest
+﻿import random
+import unittest
 import tkinter as tk
-from unittest.mock import patch, MagicMock, Mock
+from unittest.mock import MagicMock, Mock
 from controllers.board_controller import BoardController
+from core.exact_cover import ExactCoverSolver
+from core.generator import PuzzleGenerator
+from core.puzzle_pool import PuzzlePool
+from core.stats import SolverStats
 from undo_history.undo_history_manager import UndoHistoryManager
-from utils.backtracking_solver import BacktrackingSolver
 from utils.constants import BOARD_SIZE
 from utils.sudoku_generator import SudokuGenerator
 from views.number_button import NumberButton
@@ -14,70 +18,98 @@ class TestSudokuGenerator(unittest.TestCase):
         self.root = tk.Tk()
         self.root.withdraw()
         self.board_controller = BoardController(self.root, UndoHistoryManager())
-        self.generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock(), solver=Mock(),
-                                         target_count=50)
+        self.generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock(), target_count=50)
         self.show_number_buttons = NumberButton.show_number_buttons
         NumberButton.show_number_buttons = Mock()
 
     def tearDown(self):
-        from time import sleep
         self.root.update_idletasks()
         self.root.destroy()
         NumberButton.show_number_buttons = self.show_number_buttons
 
-    @patch.object(SudokuGenerator, '_fill_board')
-    @patch.object(SudokuGenerator, '_remove_numbers')
-    def test_generate_board(self, mock_remove_numbers, mock_fill_board):
+    def test_generate_board(self):
+        """ The puzzle on the board is unique, and the hint manager knows the value of every removed cell. """
         self.generator.generate_board()
-        mock_fill_board.assert_called_once()
-        mock_remove_numbers.assert_called_once()
+        puzzle = self.generator.puzzle
+        self.assertEqual(self.board_values(), puzzle.givens)
+        self.assertEqual(ExactCoverSolver().count_solutions(self.board_values()), 1)
+        self.assertGreaterEqual(len(puzzle.removed), self.generator.target_count)
+        self.generator.timer.reset.assert_called_once()
 
-    # def test_fill_board(self):
-    #     with patch.object(BacktrackingSolver, 'solve') as mock_solve:
-    #         self.generator._fill_board()
-    #         mock_solve.assert_called_once()
+        hints = self.generator.hint_manager.cache_removed_value.call_args_list
+        self.assertEqual(len(hints), len(puzzle.removed))
+        for call, index in zip(hints, puzzle.removed):
+            cell, value = call.args
+            self.assertEqual(cell.model.x * BOARD_SIZE + cell.model.y, index)
+            self.assertEqual(value, puzzle.solution[index])
 
-    def test_remove_numbers(self):
-        """ Tests that removing cells removes in the correct range of numbers. """
-        # Mocking the board to have all cells filled initially
+    def test_generate_board_replaces_givens(self):
+        """ The givens of the last puzzle are cleared along with everything else. """
+        self.generator.generate_board()
+        first = self.board_values()
+        self.generator.generate_board()
+        self.assertEqual(self.board_values(), self.generator.puzzle.givens)
+        self.assertNotEqual(self.board_values(), first)
+        for cell in self.board_controller.cells_flat:
+            self.assertEqual(cell.model.is_given(), cell.model.value is not None)
+
+    def test_each_cell_redrawn_once(self):
+        """ Removals are tried off screen, so each cell view only updates when the finished puzzle is loaded. """
         for cell in self.board_controller.cells_flat:
-            cell.model.value = 1  # Arbitrary non-None value
-
-        solver = BacktrackingSolver(self.board_controller)
-        solver.has_unique_solution = Mock(return_value=True)
-        self.generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock(), solver=solver,
-                                         target_count=50)
-        self.generator._remove_numbers()
-
-        # Check if the correct number of cells were cleared
-        cleared_cells = sum(1 for i in range(BOARD_SIZE)
-                            for j in range(BOARD_SIZE)
-                            if self.board_controller.cells[i][j].model.value is None)
-
-        # Since cells are removed 4 at a time to maintain symmetry, this can allow for variance,
-        # Removing either 2 or only 1 is possible if the cell is in the middle or direct center.
-        # This check tries to account for that
-        min_cleared_cells = (self.generator.target_count // 4)
-        self.assertTrue(min_cleared_cells <= cleared_cells <= self.generator.target_count)
-
-    def test_remove_numbers_bounds(self):
-        # Check if _remove_numbers handles empty and full boards correctly
-        self.generator._remove_numbers()  # Empty board case
-        self.generator._fill_board()
-        self.generator._remove_numbers()  # Full board case
-
-        # Ensure no out-of-bounds access
-        for i in range(BOARD_SIZE):
-            for j in range(BOARD_SIZE):
-                cell = self.board_controller.cells[i][j]
-                self.assertTrue(0 <= i < BOARD_SIZE)
-                self.assertTrue(0 <= j < BOARD_SIZE)
-
-    @patch('random.shuffle')
-    def test_remove_numbers_random(self, mock_random_shuffle):
-        self.generator._fill_board()
-        self.generator._remove_numbers()
-        mock_random_shuffle.assert_called()
+            cell.view.update = Mock()
+        self.generator.generate_board()
+        for cell in self.board_controller.cells_flat:
+            cell.view.update.assert_called_once()
+
+    def test_uniqueness_solver(self):
+        """ Removals are checked with the uniqueness solver when one is given, on flat lists of values. """
+        uniqueness_solver = MagicMock()
+        uniqueness_solver.has_other_solution = Mock(return_value=True)
+        uniqueness_solver.stats = SolverStats()
+        self.generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock(), target_count=50,
+                                         uniqueness_solver=uniqueness_solver)
+        self.generator.generate_board()
+
+        givens, solution, removed = uniqueness_solver.has_other_solution.call_args.args
+        self.assertEqual(len(givens), BOARD_SIZE ** 2)
+        self.assertEqual(solution, self.generator.puzzle.solution)
+        self.assertIn(len(removed), (1, 2, 4))
+        self.assertEqual(self.board_values(), self.generator.puzzle.solution)  # Every removal was refused
+        self.generator.hint_manager.cache_removed_value.assert_not_called()
+
+    def test_rng(self):
+        """ Generators given random generators seeded the same put the same puzzles on the board. """
+        boards = []
+        for _ in range(2):
+            generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock(),
+                                        rng=random.Random(3))
+            generator.generate_board()
+            boards.append(self.board_values())
+        self.assertEqual(boards[0], boards[1])
+
+    def test_puzzle_pool(self):
+        """ Given a pool, the board gets the oldest ready puzzle for the target count. """
+        pool = PuzzlePool({50: PuzzleGenerator(50, rng=random.Random(4))}, depth=2)
+        pool.start()
+        self.assertTrue(pool.wait(30))
+        pool.pause()
+        ready = pool._puzzles[50][0]
+
+        self.generator = SudokuGenerator(self.board_controller, hint_manager=Mock(), timer=Mock(), target_count=50,
+                                         puzzle_pool=pool)
+        self.generator.generate_board()
+        pool.close()
+        self.assertIs(self.generator.puzzle, ready)
+        self.assertEqual(self.board_values(), ready.givens)
+        self.assertEqual(pool.count(50), 1)
+
+    #
+    # Helper Methods
+    #
+
+    def board_values(self) -> list[int]:
+        """ Returns the values on the board as a flat list, with 0 for blank cells. """
+        return [cell.model.value or 0 for cell in self.board_controller.cells_flat]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+
+from core.cancellation import CancellationToken, StopReason
+from core.grid import parse_puzzle
+from core.solver import BacktrackMode
+from core.trace import CELL_SHIFT, SolveTrace, record_solve
+
+UNIQUE_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+HARD_PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+NO_SOLUTION_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080071"
+PUZZLE_16 = "3B1F0074GD00AC297600EFDA21C5003B000200300600E000DE002000000B0017A06700CB1G00280FE00D90000007G004B003800000025001200G7EF15CD3B0065004C92F683D100G60014000000C900DG0081000000FC003F03C00879B00450E4F00G000000800EA000E004005003000CG00AD9EF3460058137A0052DE00FB4C"
+
+
+class TestSolveTrace(unittest.TestCase):
+
+    def test_events(self):
+        """ Placements and removals are packed with their cell and digit. """
+        trace = SolveTrace([0] * 81)
+        trace.place(1, 2, 7)
+        trace.remove(1, 2)
+        self.assertEqual(len(trace), 2)
+        self.assertEqual(SolveTrace.decode(trace.events[0]), (11, 7, True))
+        self.assertEqual(SolveTrace.decode(trace.events[1]), (11, 7, False))
+        self.assertEqual(trace.state_at(1)[11], 7)
+        self.assertEqual(trace.state_at(2)[11], 0)
+
+    def test_state_at_matches_replay(self):
+        """ Rebuilding from keyframes gives the same board as replaying every event from the start. """
+        trace = record_solve(parse_puzzle(HARD_PUZZLE), use_propagation=False, keyframe_interval=64)
+        self.assertGreater(len(trace.keyframes), 2)
+
+        values = list(trace.initial)
+        for step, event in enumerate(trace.events, 1):
+            index, num, placed = SolveTrace.decode(event)
+            values[index] = num if placed else 0
+            if step % 97 == 0 or step % 64 == 0:
+                self.assertEqual(trace.state_at(step), values)
+        self.assertEqual(trace.state_at(len(trace)), trace.final_state())
+        self.assertEqual(trace.state_at(0), parse_puzzle(HARD_PUZZLE))
+
+    def test_record_solve(self):
+        """ A solved trace ends on the solution, and an unsolvable one ends back at the start. """
+        trace = record_solve(parse_puzzle(UNIQUE_PUZZLE))
+        self.assertTrue(trace.solved)
+        self.assertTrue(all(trace.final_state()))
+        self.assertEqual(trace.stop_reason, StopReason.COMPLETED)
+
+        trace = record_solve(parse_puzzle(NO_SOLUTION_PUZZLE))
+        self.assertFalse(trace.solved)
+        self.assertEqual(trace.final_state(), parse_puzzle(NO_SOLUTION_PUZZLE))
+
+    def test_record_backjumping(self):
+        """ Jumps are recorded as one removal per cell undone, so replaying the trace ends on the solution. """
+        trace = record_solve(parse_puzzle(HARD_PUZZLE), use_propagation=False,
+                             backtrack_mode=BacktrackMode.CONFLICT_DIRECTED)
+        self.assertTrue(trace.solved)
+        self.assertEqual(trace.state_at(len(trace)), trace.final_state())
+        self.assertTrue(all(trace.final_state()))
+
+    def test_record_cancelled(self):
+        """ A cancelled solve records its stop reason. """
+        cancel_token = CancellationToken()
+        cancel_token.cancel()
+        trace = record_solve(parse_puzzle(HARD_PUZZLE), use_propagation=False, cancel_token=cancel_token)
+        self.assertFalse(trace.solved)
+        self.assertEqual(trace.stop_reason, StopReason.CANCELLED)
+
+    def test_record_max_iterations(self):
+        """ A solve that runs out of iterations stops, and its trace ends back at the start. """
+        trace = record_solve(parse_puzzle(HARD_PUZZLE), use_propagation=False, max_iterations=100)
+        self.assertFalse(trace.solved)
+        self.assertEqual(trace.stop_reason, StopReason.MAX_ITERATIONS)
+        self.assertEqual(trace.final_state(), parse_puzzle(HARD_PUZZLE))
+
+    def test_save_and_load(self):
+        """ A saved trace loads with the same events, keyframes and result. """
+        trace = record_solve(parse_puzzle(HARD_PUZZLE), keyframe_interval=128)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hard.trace')
+            trace.save(path)
+            loaded = SolveTrace.load(path)
+
+        self.assertEqual(loaded.to_bytes(), trace.to_bytes())
+        self.assertEqual(loaded.keyframes, trace.keyframes)
+        self.assertTrue(loaded.solved)
+        self.assertEqual(loaded.state_at(len(loaded) // 3), trace.state_at(len(trace) // 3))
+
+    def test_save_stop_reason(self):
+        """ A trace of a search that gave up loads with the reason it stopped. """
+        trace = record_solve(parse_puzzle(HARD_PUZZLE), use_propagation=False, max_iterations=100)
+        loaded = SolveTrace.from_bytes(trace.to_bytes())
+        self.assertEqual(loaded.stop_reason, StopReason.MAX_ITERATIONS)
+        self.assertFalse(loaded.solved)
+
+    def test_16(self):
+        """ Traces of 16x16 boards pack digits past 9, and save and load the same way. """
+        trace = record_solve(parse_puzzle(PUZZLE_16))
+        self.assertTrue(trace.solved)
+        self.assertEqual(trace.size, 16)
+        self.assertEqual(SolveTrace.from_bytes(trace.to_bytes()).final_state(), trace.final_state())
+
+        trace = SolveTrace([0] * 256)
+        trace.place(15, 15, 16)
+        self.assertEqual(SolveTrace.decode(trace.events[0]), (255, 16, True))
+
+    def test_load_rejects_other_files(self):
+        """ Bytes that aren't a trace raise a ValueError. """
+        with self.assertRaises(ValueError):
+            SolveTrace.from_bytes(b'not a trace at all')
+
+        trace = SolveTrace([0] * 81)
+        trace.place(8, 8, 9)
+        for event in (81 << CELL_SHIFT | 1, 80 << CELL_SHIFT | 10):  # A cell past the board, and a digit past 9
+            trace.events[0] = event
+            with self.assertRaises(ValueError):
+                SolveTrace.from_bytes(trace.to_bytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from core.geometry import CLASSIC, BoardGeometry
+from core.transposition import TranspositionCache, zobrist_hash, zobrist_keys
+
+
+class TestZobrist(unittest.TestCase):
+
+    def test_keys(self):
+        """ Every digit of every cell has its own key, and the keys are the same every time. """
+        keys = zobrist_keys(CLASSIC)
+        self.assertEqual(len(keys), 81 * 9)
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertIs(zobrist_keys(CLASSIC), keys)
+        self.assertEqual(len(zobrist_keys(BoardGeometry.of(4))), 256 * 16)
+
+    def test_hash_is_incremental(self):
+        """ Placing a digit changes the hash by its key, and removing it changes it back. """
+        values = [0] * 81
+        empty = zobrist_hash(values, CLASSIC)
+        self.assertEqual(empty, 0)
+        values[10] = 4
+        self.assertEqual(zobrist_hash(values, CLASSIC), empty ^ zobrist_keys(CLASSIC)[10 * 9 + 3])
+        values[20] = 4
+        other = [0] * 81
+        other[20] = 4
+        other[10] = 4
+        self.assertEqual(zobrist_hash(values, CLASSIC), zobrist_hash(other, CLASSIC))
+
+
+class TestTranspositionCache(unittest.TestCase):
+
+    def test_get_and_store(self):
+        cache = TranspositionCache()
+        self.assertIsNone(cache.get(1))
+        cache.store(1, 0)
+        cache.store(2, -1)
+        self.assertEqual(cache.get(1), 0)
+        self.assertEqual(cache.get(2), -1)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hit_count, cache.lookup_count), (2, 3))
+        self.assertAlmostEqual(cache.hit_rate, 2 / 3)
+
+    def test_least_recently_used_is_dropped(self):
+        cache = TranspositionCache(max_entries=2)
+        cache.store(1, 0)
+        cache.store(2, 0)
+        cache.get(1)
+        cache.store(3, 0)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(1), 0)
+        self.assertEqual(cache.get(3), 0)
+        self.assertEqual(cache.eviction_count, 1)
+
+    def test_clear(self):
+        cache = TranspositionCache()
+        cache.store(1, 3)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 ﻿from controllers.board_controller import BoardController
+from utils.constants import BOARD_SIZE
 from utils.house_manager import HouseManager
 
 
@@ -9,7 +10,7 @@ class MockBoard:
     """
     def __init__(self, board_controller: BoardController):
         self.cells = [
-            [MockCell(x, y, cell.model.value, self) for y, cell in enumerate(row)]
+            [MockCell(x, y, cell.model.value, self, len(row)) for y, cell in enumerate(row)]
             for x, row in enumerate(board_controller.cells)
         ]
 
@@ -19,11 +20,11 @@ class MockCell:
     Designed to have a simplified interface compared to CellController,
     allowing mutation of dating without affecting the original cell controllers.
     """
-    def __init__(self, x: int, y: int, value: int, board: MockBoard):
+    def __init__(self, x: int, y: int, value: int, board: MockBoard, size=BOARD_SIZE):
         self.x, self.y, self.value = x, y, value
         self.board = board
         self.house_manager = HouseManager(self, board)
-        self.notes = [False] * 9
+        self.notes = [False] * size
 
     def get_row(self):
         """ Returns the row of the cell. """
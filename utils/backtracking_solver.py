@@ -1,11 +1,17 @@
-﻿import time
-import random
+﻿import random
+import time
 
-from controllers.board_controller import BoardController
+from core.cancellation import CancellationToken, StopReason
+from core.grid import BitmaskGrid
+from core.solver import BacktrackMode, CellOrder, GridSolver
+from core.stats import SolverStats
+from core.transposition import TranspositionCache
 from models.cell_value_type import CellValueType
-from utils.Mocks import MockBoard
-from utils.constants import BOARD_SIZE
-from typing import Union
+from typing import TYPE_CHECKING, Callable, Optional, Union
+
+if TYPE_CHECKING:
+    from controllers.board_controller import BoardController  # pragma: no cover
+    from utils.Mocks import MockBoard  # pragma: no cover
 
 
 class BacktrackingSolver:
@@ -13,127 +19,208 @@ class BacktrackingSolver:
     Solver for the sudoku puzzle.
     Works by placing valid numbers cell by cell, until it reaches a conflict, then it backtracks to the first cell
     where it can try a new value. This goes on until the board is solved.
+    The search itself is done by a GridSolver on a bitmask copy of the board, and every placement is mirrored on the
+    board controller.
+
+    In UI mode the placements are shown as entries rather than givens. The step by step animation of the search is
+    done by SolveAnimator, which runs it off the Tk thread.
+    The cell order can also be changed to branch on the most constrained cell first, which keeps the search tree small.
+    Conflict-directed backjumping can be turned on with the backtrack mode. Dead ends then jump straight back to the
+    cell that caused them, which saves the most on puzzles that make a row major search thrash.
+    Before guessing, forced cells (naked and hidden singles) are filled in by propagation, which solves most easy and
+    medium puzzles without any branching.
 
-    Has options to display in UI mode, so we can see the progress, or be instant.
+    Given a TranspositionCache, uniqueness checks count the solutions of the board and keep the states they finish in
+    the cache, so checks of boards that only differ by a few cells skip the parts of the tree already searched.
     """
 
-    def __init__(self, board_controller: BoardController, ui_display_mode=False, max_iterations=1000000):
+    def __init__(self, board_controller: 'BoardController', ui_display_mode=False, max_iterations=1000000,
+                 cell_order: CellOrder = CellOrder.ROW_MAJOR, use_propagation=True,
+                 on_stats: Callable[[SolverStats], None] = None, rng: random.Random = None,
+                 cache: TranspositionCache = None, backtrack_mode: BacktrackMode = BacktrackMode.CHRONOLOGICAL):
+        if cache is not None and backtrack_mode is BacktrackMode.CONFLICT_DIRECTED:
+            raise ValueError('A transposition cache can only be used with chronological backtracking')
         self.board_controller = board_controller
+        self.cell_order = cell_order
+        self.use_propagation = use_propagation  # If true, fill forced cells before searching
+        self.propagated_count = 0  # Counts the cells filled by propagation in the last solve or uniqueness check
+        self.searched_count = 0  # Counts the cells filled by search in the last solve
         self.iter_count = 0  # Counts the number of iterations
-        self.step_display = 1  # Used to speed up the display by skipping display numbers
+        self.node_count = 0  # Counts the blank cells branched on, comparable between cell orders
+        self.dead_end_count = 0  # Counts the blank cells that had no candidates left
         self.start_time = None
         self.max_iterations = max_iterations  # Used to avoid infinite loops
-        self.ui_display_mode = ui_display_mode  # If true, use delays and update the GUI with each step
+        self.ui_display_mode = ui_display_mode  # If true, placements are shown as entries instead of givens
         self.solutions = 0  # Used to count the number of solutions
+        self.stop_reason = StopReason.COMPLETED  # Why the last solve or uniqueness check stopped
+        self.grid = None  # Bitmask copy of the board, kept in sync while solving
+        self.stats = SolverStats()  # Filled in by every solve and uniqueness check
+        self.on_stats = on_stats  # Called with the stats at the end of every solve and uniqueness check
+        self.rng = random if rng is None else rng  # Shuffles the digits when solving. Seed it to reproduce a solve
+        self.cache = cache  # Shared by every uniqueness check and count. None to not cache
+        self.backtrack_mode = backtrack_mode
 
-    def solve(self) -> bool:
+    def solve(self, deadline: float = None, cancel_token: CancellationToken = None) -> bool:
         """
         Sets up the initial conditions for the solving process
-        :return: Returns true if it was able to solve the board.
+        :param deadline: A time from deadline_in to give up at
+        :param cancel_token: A token that can be cancelled to give up early, such as from another thread
+        :return: Returns true if it was able to solve the board. Check stop_reason to know why it wasn't.
         """
+        self.stats = SolverStats()
+        solved = self._solve(deadline, cancel_token)
+        self._report_stats()
+        return solved
+
+    def _solve(self, deadline: Optional[float], cancel_token: Optional[CancellationToken]) -> bool:
+        """ Propagates, then searches, mirroring every placement on the board controller. """
         self.iter_count = 0
-        self.step_display = 1
+        self._reset_counters()
         self.start_time = time.time()
-        return self._solve(0, 0)
+        with self.stats.phase('read'):
+            self.grid = self._read_grid(self.board_controller)
+        blank_count = self.grid.values.count(0)
 
-    def _solve(self, x, y):
-        """ Recursively solve the board using backtracking. """
-        if self.iter_count >= self.max_iterations:
-            return False  # Exceeded maximum allowed iterations
-        self.iter_count += 1
-
-        # All cells have been finished
-        if x >= BOARD_SIZE or y >= BOARD_SIZE:
-            return True
-
-        # Move on to the next empty cell
-        if self.board_controller.cells[x][y].model.value is not None:
-            return self._solve(*self._next_cell(x, y))
+        with self.stats.phase('propagate'):
+            propagated = self._propagate(self.grid)
+            if propagated is None:
+                return False
+            for x, y in propagated:
+                self._place_number(x, y, self.grid.get(x, y))
 
         # Shuffle the numbers before trying them
         # This is done for board generation
-        numbers = list(range(1, BOARD_SIZE + 1))
-        random.shuffle(numbers)
-        for num in numbers:
-            # Skip to the next valid entry
-            if not self._is_valid_placement(self.board_controller, x, y, num):
-                continue
-            self._place_number(x, y, num)
-
-            # Update GUI to show backtracking solving
-            if self.ui_display_mode:
-                self._adjust_update_frequency()  # Allows the display to update less and less often
-                # Only update the display sometimes
-                if self.iter_count % self.step_display == 0:
-                    self.board_controller.view.update()
-                    time.sleep(0.01)
-            if self._solve(*self._next_cell(x, y)):
-                return True
-
-            # Backtrack if reached a conflict
-            self._clear_number(x, y)
-            if self.ui_display_mode and self.iter_count % self.step_display == 0:
-                self.board_controller.view.update()
-        return False
-
-    def has_unique_solution(self):
+        search = self._create_search(shuffle=True)
+        solved = search.solve(self.grid, self._place_number, self._clear_number, deadline, cancel_token)
+        self._read_counters(search)
+
+        if not solved:
+            # Leave the board the way it was found
+            for x, y in propagated:
+                self._clear_number(x, y)
+            return False
+        self.searched_count = blank_count - self.propagated_count
+        return True
+
+    def has_unique_solution(self, solution: list[list[int]] = None, removed_cells: list[tuple[int, int]] = None,
+                            deadline: float = None, cancel_token: CancellationToken = None):
         """
         Sets up initial conditions for detecting a unique solution.
-        Uses a MockBoard to avoid mutating the actual board.
+        Uses a BitmaskGrid copy to avoid mutating the actual board.
+
+        When a solution of the board is already known, only a different solution has to be searched for, which is
+        usually much quicker. If the board was unique before some cells were removed, passing just those cells makes
+        it quicker still. With a cache, the solutions are always counted instead, as counting is what the cache speeds
+        up.
+        :param solution: A known solution of the board, as a 2d list of values
+        :param removed_cells: The x and y of the cells removed since the board was last known to be unique
+        :param deadline: A time from deadline_in to give up at
+        :param cancel_token: A token that can be cancelled to give up early
+        :return: Returns true if the solution is unique. False if the check stopped early, see stop_reason.
         """
-        board = MockBoard(self.board_controller)
-        solutions = []
+        if solution is None or self.cache is not None:
+            return self.count_solutions(2, deadline=deadline, cancel_token=cancel_token) == 1 and \
+                self.stop_reason is StopReason.COMPLETED
 
-        if self._check_unique(board, solutions):
-            return len(solutions) == 1
-        return False
+        self.stats = SolverStats()
+        with self.stats.phase('read'):
+            grid = self._read_grid(self.board_controller)
+        self._reset_counters()
+        cells = None if removed_cells is None else [x * grid.size + y for x, y in removed_cells]
+        search = GridSolver(self.cell_order, max_iterations=None, backtrack_mode=self.backtrack_mode)
+        is_unique = not search.has_other_solution(grid, [num for row in solution for num in row], cells,
+                                                  deadline, cancel_token)
+        self._read_counters(search)
+        self._report_stats()
+        return is_unique
 
-    def _check_unique(self, board: MockBoard, solutions: list[int], x=0, y=0):
+    def count_solutions(self, limit: int = 2, solutions: list[list[list[int]]] = None, deadline: float = None,
+                        cancel_token: CancellationToken = None) -> int:
         """
-        Finds all possible configuration of the board, ensuring that there is only one that has no conflicts.
-        :param board: A mock of the board to mutate safely
-        :param solutions: used to track solutions found
-        :param x: Current X Coordinate
-        :param y: Current Y Coordinate
-        :return: Whether the board has a unique solution or not.
+        Counts the solutions of the board, stopping once limit of them are found. The board is not changed.
+        The count has no iteration limit, as giving up early would leave the answer unknown, but it can be given a
+        deadline or cancellation token.
+        :param limit: The number of solutions to stop at. 2 is enough to tell if the solution is unique
+        :param solutions: If given, each solution found is appended to it as a 2d list of values
+        :param deadline: A time from deadline_in to give up at
+        :param cancel_token: A token that can be cancelled to give up early
+        :return: The number of solutions found, at most limit. Check stop_reason to know if it is exact.
         """
+        self.stats = SolverStats()
+        self.solutions = self._count_solutions(limit, solutions, deadline, cancel_token)
+        self._report_stats()
+        return self.solutions
 
-        # Board is finished
-        if x >= BOARD_SIZE:
-            solutions.append(1)
-            return len(solutions) == 1  # Return True if exactly one solution found
+    def _count_solutions(self, limit: int, solutions: Optional[list[list[list[int]]]], deadline: Optional[float],
+                         cancel_token: Optional[CancellationToken]) -> int:
+        """ Propagates a copy of the board, then counts the solutions of what is left. """
+        with self.stats.phase('read'):
+            grid = self._read_grid(self.board_controller)
+        self._reset_counters()
+        self.solutions = 0
 
-        # Skip to the next empty cell
-        if board.cells[x][y].value is not None:
-            return self._check_unique(board, solutions, *self._next_cell(x, y))
+        # Forced cells are the same in every solution, so filling them first can't change the answer
+        with self.stats.phase('propagate'):
+            if self._propagate(grid) is None:
+                return 0
 
-        # Attempt each number
-        for num in range(1, BOARD_SIZE + 1):
-            # Ignore invalid numbers
-            if not self._is_valid_placement(board, x, y, num):
-                continue
-            board.cells[x][y].value = num
+        search = GridSolver(self.cell_order, max_iterations=None, cache=self.cache, backtrack_mode=self.backtrack_mode)
+        found = None if solutions is None else []
+        count = search.count_solutions(grid, limit, found, deadline, cancel_token)
+        self._read_counters(search)
 
-            if self._check_unique(board, solutions, *self._next_cell(x, y)):
-                if len(solutions) > 1:
-                    board.cells[x][y].value = None  # Backtrack
-                    return False  # More than one solution found
-            board.cells[x][y].value = None  # Backtrack
+        if solutions is not None:
+            solutions.extend(BitmaskGrid.from_values(values).to_rows() for values in found)
+        return count
 
-        return len(solutions) == 1  # Return True if exactly one solution found
+    def _create_search(self, shuffle=False) -> GridSolver:
+        """ Creates the iterative search with the current settings of this solver. """
+        return GridSolver(self.cell_order, self.max_iterations, shuffle, rng=self.rng,
+                          backtrack_mode=self.backtrack_mode)
 
-    @staticmethod
-    def _next_cell(x: int, y: int):
+    def _read_counters(self, search: GridSolver):
+        """ Copies the counters of a finished search, and adds its stats to the stats of this solver. """
+        self.iter_count = search.iter_count
+        self.node_count = search.node_count
+        self.dead_end_count = search.dead_end_count
+        self.stop_reason = search.stop_reason
+        self.stats.merge(search.stats)
+
+    def _report_stats(self):
+        """ Passes the stats of the solve or check that just finished to the stats hook. """
+        self.stats.propagated_count = self.propagated_count
+        if self.on_stats is not None:
+            self.on_stats(self.stats)
+
+    def _propagate(self, grid: BitmaskGrid) -> Optional[list[tuple[int, int]]]:
+        """
+        Fills the forced cells of the grid, if propagation is enabled.
+        :return: The cells that were filled, or None if the grid can't be solved.
         """
-        Returns the next right-bottom most cell.
+        if not self.use_propagation:
+            return []
+        propagated = grid.propagate()
+        self.propagated_count = len(propagated) if propagated is not None else 0
+        return propagated
 
-        :param x: Current X Coordinate
-        :param y: Current Y Coordinate
-        :return: Next cell coordinate
+    def _reset_counters(self):
+        """ Resets the search counters before a new solve or uniqueness check. """
+        self.node_count = 0
+        self.dead_end_count = 0
+        self.propagated_count = 0
+        self.searched_count = 0
+        self.stop_reason = StopReason.COMPLETED
+
+    @staticmethod
+    def _read_grid(board: 'BoardController') -> BitmaskGrid:
         """
-        return (x, y + 1) if y + 1 < BOARD_SIZE else (x + 1, 0)
+        Copies the values of a board into a BitmaskGrid.
+        :param board: The board controller to read from
+        :return: A grid with the same values and the row, column and subgrid masks filled in
+        """
+        return BitmaskGrid.from_rows([[cell.model.value for cell in row] for row in board.cells])
 
-    def _is_valid_placement(self, board: Union[BoardController, MockBoard], x: int, y: int, num: int):
+    def _is_valid_placement(self, board: Union['BoardController', 'MockBoard'], x: int, y: int, num: int):
         """
         Returns true if there are no cells in the house with the value of num.
         :param board: The board controller or MockBoard instance
@@ -174,24 +261,3 @@ class BacktrackingSolver:
         cell = self.board_controller.cells[x][y]
         cell.model.value = None
         cell.view.update_value_label()
-
-    def _adjust_update_frequency(self):
-        """
-        To avoid the display taking too long, this will skip self.step_display amount of iterations to display.
-        I've noticed that the solving can range wildly from hundreds of iterations to thousands, so this attempts to
-        normalize how long it takes.
-        """
-        elapsed_time = time.time() - self.start_time
-
-        if elapsed_time > 5:
-            self.step_display = 200
-        elif elapsed_time > 4.5:
-            self.step_display = 100
-        elif elapsed_time > 4:
-            self.step_display = 50
-        elif elapsed_time > 3:
-            self.step_display = 20
-        elif elapsed_time > 2:
-            self.step_display = 10
-        else:
-            self.step_display = 2
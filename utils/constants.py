@@ -1,4 +1,5 @@
 ﻿BOARD_SIZE = 9
 SUBGRID_SIZE = 3
+DIGIT_SYMBOLS = '123456789ABCDEFGHIJKLMNOP'  # Shown for digits 1 to 25, enough for 25x25 boards
 BACKGROUND_COLOR = '#111'
 SELECTION_COLOR = '#55A'
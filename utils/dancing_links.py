@@ -0,0 +1,119 @@
+from typing import TYPE_CHECKING
+
+from core.cancellation import CancellationToken, StopReason
+from core.exact_cover import ExactCoverSolver
+from core.geometry import BoardGeometry
+from core.stats import SolverStats
+from models.cell_value_type import CellValueType
+
+if TYPE_CHECKING:
+    from controllers.board_controller import BoardController  # pragma: no cover
+
+
+class DancingLinksSolver:
+    """
+    Solves the board on a board controller with the Dancing Links exact cover solver in core.exact_cover.
+    Has the same solve() and has_unique_solution() contract as BacktrackingSolver, and the has_other_solution() and
+    stats of ExactCoverSolver, so it can also be given to SudokuGenerator as its uniqueness solver.
+    """
+
+    def __init__(self, board_controller: 'BoardController'):
+        self.board_controller = board_controller
+        self.solution_count = 0  # Solutions found by the last search, up to the limit it was given
+        self.stop_reason = StopReason.COMPLETED  # Why the last solve or uniqueness check stopped
+        self._size = len(board_controller.cells)
+        self._exact_cover = ExactCoverSolver(geometry=BoardGeometry.for_cell_count(self._size ** 2))
+
+    def solve(self, deadline: float = None, cancel_token: CancellationToken = None) -> bool:
+        """
+        Solves the board, then places the solution on the board controller.
+        :param deadline: A time from deadline_in to give up at
+        :param cancel_token: A token that can be cancelled to give up early
+        :return: Returns true if it was able to solve the board. Check stop_reason to know why it wasn't.
+        """
+        solutions = []
+        if not self.count_solutions(1, solutions, deadline, cancel_token):
+            return False
+
+        for x, row in enumerate(solutions[0]):
+            for y, num in enumerate(row):
+                cell = self.board_controller.cells[x][y]
+                if cell.model.value is not None:
+                    continue
+                cell.model.value = num
+                cell.model.value_type = CellValueType.GIVEN
+                cell.model.notify()
+        return True
+
+    def has_unique_solution(self, solution: list[list[int]] = None, removed_cells: list[tuple[int, int]] = None,
+                            deadline: float = None, cancel_token: CancellationToken = None) -> bool:
+        """
+        Returns true if the board on the board controller has exactly one solution.
+
+        When a solution is already known, each blank cell is searched in turn with its known digit hidden from the
+        matrix, looking for any other solution. If the board was unique before some cells were removed, only those
+        cells need to be searched.
+        :param solution: A known solution of the board, as a 2d list of values
+        :param removed_cells: The x and y of the cells removed since the board was last known to be unique
+        :param deadline: A time from deadline_in to give up at
+        :param cancel_token: A token that can be cancelled to give up early
+        :return: Returns true if the solution is unique. False if the check stopped early, see stop_reason.
+        """
+        if solution is None:
+            self.count_solutions(2, deadline=deadline, cancel_token=cancel_token)
+            return self.solution_count == 1 and self.stop_reason is StopReason.COMPLETED
+
+        values = self._read_values()
+        self.stop_reason = StopReason.COMPLETED
+        if not self._exact_cover.is_consistent(values):
+            self.solution_count = 0
+            return False
+
+        cells = None if removed_cells is None else [x * self._size + y for x, y in removed_cells]
+        solution_flat = [num for row in solution for num in row]
+        found = self._exact_cover.has_other_solution(values, solution_flat, cells, deadline, cancel_token)
+        self.stop_reason = self._exact_cover.stop_reason
+        self.solution_count = 2 if found else 1
+        return not found
+
+    def has_other_solution(self, values: list[int], solution: list[int], cells: list[int] = None,
+                           deadline: float = None, cancel_token: CancellationToken = None) -> bool:
+        """
+        Checks whether a board, given as a flat list of values, has a solution other than a known one.
+        This is the check a PuzzleGenerator makes for each removal, on its own board rather than the board controller's.
+        :param values: The board to check
+        :param solution: The values of the known solution
+        :param cells: The indices of the cells to search, defaulting to every blank cell
+        :return: Returns true if another solution exists, or if the search stopped early before knowing.
+        """
+        found = self._exact_cover.has_other_solution(values, solution, cells, deadline, cancel_token)
+        self.stop_reason = self._exact_cover.stop_reason
+        self.solution_count = 2 if found else 1
+        return found
+
+    @property
+    def stats(self) -> SolverStats:
+        """ The stats of the last search. """
+        return self._exact_cover.stats
+
+    def count_solutions(self, limit: int = 2, solutions: list[list[list[int]]] = None, deadline: float = None,
+                        cancel_token: CancellationToken = None) -> int:
+        """
+        Counts the solutions of the board on the board controller, stopping once limit of them are found.
+        The board is not changed. The number found is also stored in solution_count.
+        :param limit: The number of solutions to stop at. 2 is enough to tell if the solution is unique
+        :param solutions: If given, each solution found is appended to it as a 2d list of values
+        :return: The number of solutions found, at most limit. Check stop_reason to know if it is exact.
+        """
+        found = [] if solutions is not None else None
+        self.solution_count = self._exact_cover.count_solutions(self._read_values(), limit, found, deadline,
+                                                                cancel_token)
+        self.stop_reason = self._exact_cover.stop_reason
+        if solutions is not None:
+            size = self._size
+            solutions.extend([values[x * size:(x + 1) * size] for x in range(size)] for values in found)
+        return self.solution_count
+
+    def _read_values(self) -> list[int]:
+        """ Returns the values on the board as a flat list, with 0 for blank cells. """
+        return [cell.model.value or 0 for row in self.board_controller.cells for cell in row]
@@ -1,10 +1,11 @@
-﻿from utils.constants import BOARD_SIZE, SUBGRID_SIZE
+﻿from math import isqrt
 
 
 class HouseManager:
     """
     Given a cell and a board, allows the retrival of rows, columns, subgrids and houses.
     This is generalized to work with anything that supports the interface.
+    The size of the board is taken from its cells, so the same code works for 9x9, 16x16 and 25x25 boards.
     """
     def __init__(self, cell: any, board: any):
         self.cell = cell
@@ -13,23 +14,24 @@ class HouseManager:
     def get_row(self) -> list[any]:
         """ Returns all cells in the same row. """
         return [self.board.cells[self.cell.x][y]
-                for y in range(BOARD_SIZE)
+                for y in range(len(self.board.cells))
                 if y != self.cell.y]
 
     def get_column(self) -> list[any]:
         """ Returns all cells in the same column. """
         return [self.board.cells[x][self.cell.y]
-                for x in range(BOARD_SIZE)
+                for x in range(len(self.board.cells))
                 if x != self.cell.x]
 
     def get_subgrid(self) -> list[any]:
-        """ Returns all cells in the same subgrid. A subgrid is the 3x3 area of the puzzle. """
-        start_x = (self.cell.x // SUBGRID_SIZE) * SUBGRID_SIZE
-        start_y = (self.cell.y // SUBGRID_SIZE) * SUBGRID_SIZE
+        """ Returns all cells in the same subgrid. A subgrid is the 3x3 area of a 9x9 puzzle. """
+        subgrid_size = isqrt(len(self.board.cells))
+        start_x = (self.cell.x // subgrid_size) * subgrid_size
+        start_y = (self.cell.y // subgrid_size) * subgrid_size
 
         return [self.board.cells[i][j]
-                for i in range(start_x, start_x + SUBGRID_SIZE)
-                for j in range(start_y, start_y + SUBGRID_SIZE)
+                for i in range(start_x, start_x + subgrid_size)
+                for j in range(start_y, start_y + subgrid_size)
                 if (i, j) != (self.cell.x, self.cell.y)]
 
     def get_house(self) -> list[any]:
@@ -0,0 +1,77 @@
+from typing import TYPE_CHECKING
+
+from core.cancellation import CancellationToken, StopReason
+from core.grid import BitmaskGrid
+from core.parallel_search import ParallelSolver
+from core.stats import SolverStats
+
+if TYPE_CHECKING:
+    from controllers.board_controller import BoardController  # pragma: no cover
+
+
+class ParallelUniquenessSolver:
+    """
+    Checks the board on a board controller for a unique solution, splitting long searches across a process pool with
+    the ParallelSolver in core.parallel_search. Has the same has_unique_solution() contract as BacktrackingSolver, and
+    the has_other_solution() and stats of ParallelSolver, so it can be given to SudokuGenerator as its uniqueness
+    solver on machines with many cores.
+    The pool is kept between checks, so call close() once generating is done.
+    """
+
+    def __init__(self, board_controller: 'BoardController', processes: int = None):
+        self.board_controller = board_controller
+        self.solution_count = 0  # Solutions found by the last check, up to 2
+        self.stop_reason = StopReason.COMPLETED  # Why the last uniqueness check stopped
+        self.parallel_solver = ParallelSolver(processes)
+
+    def has_unique_solution(self, solution: list[list[int]] = None, removed_cells: list[tuple[int, int]] = None,
+                            deadline: float = None, cancel_token: CancellationToken = None) -> bool:
+        """
+        Returns true if the board on the board controller has exactly one solution.
+        :param solution: A known solution of the board, as a 2d list of values
+        :param removed_cells: The x and y of the cells removed since the board was last known to be unique
+        :param deadline: A time from deadline_in to give up at
+        :param cancel_token: A token that can be cancelled to give up early
+        :return: Returns true if the solution is unique. False if the check stopped early, see stop_reason.
+        """
+        values = [cell.model.value or 0 for row in self.board_controller.cells for cell in row]
+        size = len(self.board_controller.cells)
+        if BitmaskGrid.from_givens(values) is None:
+            self.solution_count = 0
+            self.stop_reason = StopReason.COMPLETED
+            return False
+
+        if solution is None:
+            self.solution_count = self.parallel_solver.count_solutions(values, 2, deadline=deadline,
+                                                                       cancel_token=cancel_token)
+        else:
+            cells = None if removed_cells is None else [x * size + y for x, y in removed_cells]
+            found = self.parallel_solver.has_other_solution(values, [num for row in solution for num in row], cells,
+                                                            deadline, cancel_token)
+            self.solution_count = 2 if found else 1
+        self.stop_reason = self.parallel_solver.stop_reason
+        return self.solution_count == 1 and self.stop_reason is StopReason.COMPLETED
+
+    def has_other_solution(self, values: list[int], solution: list[int], cells: list[int] = None,
+                           deadline: float = None, cancel_token: CancellationToken = None) -> bool:
+        """
+        Checks whether a board, given as a flat list of values, has a solution other than a known one.
+        This is the check a PuzzleGenerator makes for each removal, on its own board rather than the board controller's.
+        :param values: The board to check
+        :param solution: The values of the known solution
+        :param cells: The indices of the cells removed since the board was last known to be unique
+        :return: Returns true if another solution exists, or if the search stopped early before knowing.
+        """
+        found = self.parallel_solver.has_other_solution(values, solution, cells, deadline, cancel_token)
+        self.stop_reason = self.parallel_solver.stop_reason
+        self.solution_count = 2 if found else 1
+        return found
+
+    @property
+    def stats(self) -> SolverStats:
+        """ The stats of the last check, including the searches of every worker. """
+        return self.parallel_solver.stats
+
+    def close(self):
+        """ Stops the worker processes. """
+        self.parallel_solver.close()
@@ -0,0 +1,184 @@
+import threading
+from typing import TYPE_CHECKING, Callable, Optional
+
+from core.cancellation import CancellationToken, StopReason
+from core.solver import BacktrackMode, CellOrder
+from core.trace import SolveTrace, record_solve
+from models.cell_value_type import CellValueType
+
+if TYPE_CHECKING:
+    import tkinter as tk  # pragma: no cover
+    from controllers.board_controller import BoardController  # pragma: no cover
+
+
+class SolveAnimator:
+    """
+    Animates the backtracking search without blocking the window.
+    The search runs on a worker thread and never touches Tk, recording every placement and removal into a SolveTrace.
+    Once it finishes, the trace is played back on the Tk thread by an after() loop. Each frame moves the board forward
+    by however many steps the speed allows and only redraws the cells that differ, so playback can run at any speed,
+    seek to any step or jump to the end without searching again.
+    The search gives up after max_iterations, like BacktrackingSolver, so a board with wrong entries can't grow the
+    trace without bound. The animation then finishes unsolved, with stop_reason set to MAX_ITERATIONS.
+    """
+
+    def __init__(self, board_controller: 'BoardController', widget: 'tk.Misc', frame_rate=30,
+                 cell_order: CellOrder = CellOrder.ROW_MAJOR, use_propagation=True, speed: Optional[float] = None,
+                 duration=5.0, backtrack_mode: BacktrackMode = BacktrackMode.CHRONOLOGICAL,
+                 max_iterations: Optional[int] = 1000000):
+        self.board_controller = board_controller
+        self.widget = widget  # Any Tk widget, used to schedule frames with after()
+        self.frame_rate = frame_rate  # Frames drawn per second
+        self.cell_order = cell_order
+        self.use_propagation = use_propagation  # If true, forced cells are filled before searching
+        self.backtrack_mode = backtrack_mode  # With conflict-directed backjumping, the playback shows the jumps
+        self.speed = speed  # Steps played per second. If None, the whole trace plays in duration seconds
+        self.duration = duration
+        self.max_iterations = max_iterations  # Search steps before giving up. None means no limit
+        self.trace: Optional[SolveTrace] = None  # Trace of the last solve, once recorded
+        self.step = 0  # Number of steps of the trace shown on the board
+        self.solved = False  # Result of the last animation, set once it finishes
+        self.stop_reason = StopReason.COMPLETED  # Why the search of the last animation stopped
+        self.frame_count = 0  # Frames drawn by the last animation
+        self._shown = []  # Values on the board, as of the step shown
+        self._position = 0.0  # Step reached, including the fraction of a step carried over between frames
+        self._playing = False
+        self._frame_pending = False  # Set while a frame is scheduled, so a restart doesn't run two loops
+        self._cancel_token = None
+        self._worker = None
+        self._on_done = None
+
+    def is_running(self) -> bool:
+        """ Returns true while a solve is being recorded or played back. """
+        return self._worker is not None or self._playing
+
+    def is_recording(self) -> bool:
+        """ Returns true while the worker is still searching. """
+        return self._worker is not None
+
+    def start(self, on_done: Callable[[bool], None] = None):
+        """
+        Starts solving the board in the background. Does nothing if an animation is already running.
+        :param on_done: Called on the Tk thread with whether the board was solved, once the last frame is drawn
+        """
+        if self.is_running():
+            return
+        self.trace = None
+        self.step = 0
+        self.solved = False
+        self.stop_reason = StopReason.COMPLETED
+        self.frame_count = 0
+        self._on_done = on_done
+        self._cancel_token = CancellationToken()
+
+        values = [cell.model.value or 0 for row in self.board_controller.cells for cell in row]
+        self._worker = threading.Thread(target=self._record, args=(values, self._cancel_token), daemon=True)
+        self._worker.start()
+        self._schedule_frame()
+
+    def cancel(self, discard_events=False):
+        """
+        Stops the search, or the playback, and puts the board back the way it was found.
+        :param discard_events: If true, nothing else is drawn, for when the board is about to be replaced
+        """
+        if self._cancel_token is not None:
+            self._cancel_token.cancel()
+        if self._playing:
+            if not discard_events:
+                self.seek(0)
+            self.stop_reason = StopReason.CANCELLED
+            self._finish(False, notify=not discard_events)
+        elif discard_events:
+            self._on_done = None
+
+    def seek(self, step: int):
+        """ Shows the board as it was after the given number of steps of the trace. """
+        if self.trace is None:
+            return
+        step = max(0, min(step, len(self.trace)))
+        if self.step <= step <= self.step + self.trace.keyframe_interval:
+            values = self._shown[:]
+            for event in self.trace.events[self.step:step]:
+                index, num, placed = SolveTrace.decode(event)
+                values[index] = num if placed else 0
+        else:
+            values = self.trace.state_at(step)
+
+        for index in range(len(values)):
+            if values[index] != self._shown[index]:
+                self._show(index, values[index])
+        self._shown = values
+        self.step = step
+        self._position = float(step)
+
+    def jump_to_end(self):
+        """ Shows the end of the trace, finishing the playback. """
+        if self.trace is not None:
+            self.seek(len(self.trace))
+
+    def _record(self, values: list[int], cancel_token: CancellationToken):
+        """ Runs on the worker thread. Solves the board, recording the trace. """
+        self.trace = record_solve(values, self.cell_order, self.use_propagation, self.max_iterations,
+                                  cancel_token=cancel_token, backtrack_mode=self.backtrack_mode)
+
+    def _draw_frame(self):
+        """ Runs on the Tk thread. Waits for the trace, then moves the board forward by a frame's worth of steps. """
+        self._frame_pending = False
+        if self._worker is not None:
+            if self._worker.is_alive():
+                self._schedule_frame()
+                return
+            self._worker = None
+            self.stop_reason = self.trace.stop_reason
+            if self._cancel_token.is_cancelled():
+                self.stop_reason = StopReason.CANCELLED
+            if self.stop_reason is not StopReason.COMPLETED:
+                self._finish(False)
+                return
+            self._shown = list(self.trace.initial)
+            self._position = 0.0
+            self._playing = True
+
+        if not self._playing:
+            return
+        self._position += self._steps_per_second() / self.frame_rate
+        self.seek(int(self._position))
+        self.frame_count += 1
+
+        if self.step < len(self.trace):
+            self._schedule_frame()
+        else:
+            self._finish(self.trace.solved)
+
+    def _schedule_frame(self):
+        """ Schedules the next frame, unless one is already scheduled. """
+        if not self._frame_pending:
+            self._frame_pending = True
+            self.widget.after(self._frame_delay(), self._draw_frame)
+
+    def _finish(self, solved: bool, notify=True):
+        """ Ends the animation, calling on_done with the result. """
+        self.solved = solved
+        self._playing = False
+        self._cancel_token = None
+        if self._on_done is not None and notify:
+            self._on_done(solved)
+        self._on_done = None
+
+    def _show(self, index: int, num: int):
+        """ Sets the value of a cell on the board, or clears it if num is 0. """
+        x, y = divmod(index, len(self.board_controller.cells))
+        model = self.board_controller.cells[x][y].model
+        model.value = num or None
+        model.value_type = CellValueType.ENTRY if num else CellValueType.BLANK
+        model.notify()
+
+    def _steps_per_second(self) -> float:
+        """ Returns the playback speed, spreading the whole trace over the duration if no speed is set. """
+        if self.speed is not None:
+            return self.speed
+        return max(1.0, len(self.trace) / self.duration)
+
+    def _frame_delay(self) -> int:
+        """ Returns the milliseconds between frames. """
+        return max(1, round(1000 / self.frame_rate))
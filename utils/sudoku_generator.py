@@ -1,106 +1,59 @@
 import random
+from typing import Optional
 
 from controllers.board_controller import BoardController
-from controllers.cell_controller import CellController
-from models.cell_value_type import CellValueType
-from utils.constants import BOARD_SIZE
-from utils.backtracking_solver import BacktrackingSolver
+from core.generator import GeneratedPuzzle, PuzzleGenerator, UniquenessSolver
+from core.geometry import BoardGeometry
+from core.puzzle_pool import PuzzlePool
+from core.transposition import TranspositionCache
 from utils.timer import Timer
 from utils.hint_manager import HintManager
 
 
 class SudokuGenerator:
-    """ Generates a sudoku puzzle that has only one unique solution. """
+    """
+    Generates a sudoku puzzle that has only one unique solution, and puts it on the board.
+    The whole puzzle is made off screen by a PuzzleGenerator, on flat lists of values, so trying a removal never
+    touches a cell of the board. The finished puzzle is then loaded onto the board controller in one batch that
+    redraws each cell once, which keeps the time to start a new game from depending on how many removals were tried.
+
+    By default, each removal is checked by counting solutions with a transposition cache, which lets each check reuse
+    the states proven by the checks before it. An ExactCoverSolver can be passed as the uniqueness solver instead, or
+    on machines with many cores a ParallelSolver, which splits the few very long checks across processes.
+    Passing a seeded random.Random makes the boards reproducible.
+
+    Given a PuzzlePool, puzzles are taken from its pool for target_count instead, which is ready straight away as
+    long as the pool's worker has kept up.
+    """
 
     def __init__(self, board_controller: BoardController, hint_manager: HintManager, timer: Timer, target_count=40,
-                 solver: BacktrackingSolver=None):
+                 uniqueness_solver: UniquenessSolver = None, rng: random.Random = None, puzzle_pool: PuzzlePool = None):
         self.board_controller = board_controller
-        self.solver = BacktrackingSolver(board_controller) if solver is None else solver
-        self.target_count = target_count
+        self.rng = random if rng is None else rng
+        self.target_count = target_count  # Number of cells to remove. Higher the count, harder the difficulty
+        self.puzzle_generator = PuzzleGenerator(target_count, uniqueness_solver=uniqueness_solver, rng=self.rng,
+                                                geometry=BoardGeometry.of(board_controller.model.subgrid_size),
+                                                cache=TranspositionCache() if uniqueness_solver is None else None)
+        self.puzzle_pool = puzzle_pool  # If given, puzzles are taken from its pool for target_count
+        self.puzzle: Optional[GeneratedPuzzle] = None  # The last puzzle put on the board
         self.timer = timer
         self.hint_manager = hint_manager
 
     def generate_board(self):
-        """" Generates a board, randomly removes numbers, then updates the views. """
+        """" Generates a puzzle off screen, or takes a ready one from the pool, then puts it on the board. """
         self.timer.stop()
         self.timer.reset()
-        self._empty_board()
-        self._fill_board()
-        self._remove_numbers()
+        if self.puzzle_pool is None:
+            self.puzzle = self.puzzle_generator.generate()
+        else:
+            self.puzzle = self.puzzle_pool.take(self.target_count)
+        self._load_puzzle(self.puzzle)
         self.board_controller.view.update()
 
-    def _empty_board(self):
-        """ Clears all cells. """
-        for cell in self.board_controller.cells_flat:
-            cell.clear()
-
-    def _fill_board(self):
-        """
-        Fills the board by solving an empty board.
-        The solver uses randomization to avoid creating the same board every time.
-        """
-        self.solver.solve()
-
-    def _remove_numbers(self):
-        """
-        Randomly removes numbers from the board to create the puzzle.
-        Amount removed is determined by difficulty.
-        """
-        number_cells_to_remove = self.target_count  # Higher the count, harder the difficulty
-        max_iterations = 1000
-        iterations = 0
-        non_unique_cache = set()  # Use a set to track cells that cause non-unique solutions
-
-        all_cells = [(i, j) for i in range(BOARD_SIZE) for j in range(BOARD_SIZE)]
-        random.shuffle(all_cells)  # Shuffle the list to remove cells randomly
-
-        # Remove until count is reached
-        while number_cells_to_remove > 0 and iterations < max_iterations:
-            iterations += 1
-
-            if not all_cells:
-                break
-
-            i, j = all_cells.pop()
-            cell = self.board_controller.cells[i][j]
-
-            sym_cells = self._get_symmetrical_cells(cell)
-
-            # Don't remove cells that previously allowed multiple solutions when removed
-            if cell in non_unique_cache or cell.model.value is None:
-                continue
-
-            # Skip blank cells
-            if all(c.model.value is None for c in sym_cells):
-                continue
-
-            # Cache values before assigning to None, in case we need to restore it
-            old_values = [c.model.value for c in sym_cells]
-            for c in sym_cells:
-                c.model.value = None
-
-            if self.solver.has_unique_solution():
-                # Unique solution exists, finalize removal
-                number_cells_to_remove -= len(sym_cells)
-                for i, c in enumerate(sym_cells):
-                    c.model.value_type = CellValueType.BLANK
-                    c.view.update_labels()
-                    self.hint_manager.cache_removed_value(c, old_values[i])
-            else:
-                # Unique solution not found, undo removal
-                for c, val in zip(sym_cells, old_values):
-                    c.model.value = val
-
-    def _get_symmetrical_cells(self, cell: CellController):
-        """
-        Gets the 3 symmetrical cells from the given cell.
-        :param cell: The cell to get symmetrical cells from.
-        :return: A list of 4 cells that are 4 way symmetrical.
-        """
-        x, y = cell.model.x, cell.model.y
-        return [
-            self.board_controller.cells[x][y],
-            self.board_controller.cells[BOARD_SIZE - 1 - x][y],
-            self.board_controller.cells[x][BOARD_SIZE - 1 - y],
-            self.board_controller.cells[BOARD_SIZE - 1 - x][BOARD_SIZE - 1 - y]
-        ]
+    def _load_puzzle(self, puzzle: GeneratedPuzzle):
+        """ Puts a generated puzzle on the board, and tells the hint manager the value of every removed cell. """
+        self.board_controller.load_puzzle(puzzle.givens)
+        size = self.board_controller.size
+        for index in puzzle.removed:
+            x, y = divmod(index, size)
+            self.hint_manager.cache_removed_value(self.board_controller.cells[x][y], puzzle.solution[index])
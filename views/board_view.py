@@ -6,11 +6,11 @@ from views.cell_view import CellView
 
 class BoardView(tk.Frame):
     """ Handles the visual of the board. """
-    def __init__(self, parent: Union[tk, tk.Frame]):
+    def __init__(self, parent: Union[tk, tk.Frame], size=BOARD_SIZE):
         tk.Frame.__init__(self, parent)
         self.frame = tk.Frame(parent, bg='black')
         self.frame.grid(row=0, column=0, padx=5, pady=50)
-        self.cells = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        self.cells = [[None for _ in range(size)] for _ in range(size)]
 
     def add_cell_view(self, x: int, y: int, cell_view: CellView):
         """
@@ -1,11 +1,13 @@
 ﻿import tkinter as tk
 from abc import ABC, abstractmethod
+from math import isqrt
 from tkinter import Canvas
 from typing import Optional
 
+from core.geometry import digit_symbol
 from models.cell_model import CellModel
 from observers.observer import Observer
-from utils.constants import SELECTION_COLOR, BACKGROUND_COLOR, SUBGRID_SIZE
+from utils.constants import SELECTION_COLOR, BACKGROUND_COLOR, BOARD_SIZE
 from models.cell_value_type import CellValueType
 
 # Cell colors
@@ -21,15 +23,21 @@ class CellView(Canvas, Observer):
     Manages the visuals for the cell.
     This is also an observer of its cell model,
     and gets notified when the value or notes change of the cell model.
+
+    Cells shrink on boards bigger than 9x9, so a 25x25 board still fits on screen. The note labels are only created
+    the first time the cell shows notes, as most cells never do and a 25x25 board would otherwise create 15,625 of them.
     """
-    WIDTH = 70
+    WIDTH = 70  # Width of a cell on a 9x9 board
 
     def __init__(self, parent: tk.Frame, model: CellModel, **kwargs):
         super().__init__(parent, bd=0, highlightthickness=0, **kwargs)
         self.model = model
-        self.actual_width = CellView.WIDTH
-        self.actual_height = CellView.WIDTH
-        self.config(width=CellView.WIDTH, height=CellView.WIDTH, bg=CELL_DEFAULT_COLOR)
+        self.subgrid_size = isqrt(len(model.notes))
+        self.cell_width = round(CellView.WIDTH * min(1.0, BOARD_SIZE / len(model.notes)))
+        self.scale = self.cell_width / CellView.WIDTH  # Scales the fonts and borders along with the cell
+        self.actual_width = self.cell_width
+        self.actual_height = self.cell_width
+        self.config(width=self.cell_width, height=self.cell_width, bg=CELL_DEFAULT_COLOR)
         self._draw_thick_borders()
         self.on_press_event = None
         self.is_highlighted = False
@@ -39,33 +47,40 @@ class CellView(Canvas, Observer):
 
         # Used to display final values, given or entry
         self.value_label = self.create_text(self.actual_width / 2, self.actual_height / 2,
-                                            text='', fill='black', font=("Arial", 30))
-        # An array of 9 notes
-        self.note_labels = [self.create_text((col + 1) * self.actual_width / 4,
-                                             (row + 1) * self.actual_height / 4, fill='white', font=("Arial", 9))
-                            for row in range(SUBGRID_SIZE) for col in range(SUBGRID_SIZE)]
+                                            text='', fill='black', font=("Arial", round(30 * self.scale)))
+        # One label per digit, laid out like a subgrid. Created by _create_note_labels
+        self.note_labels = []
+
+    def _create_note_labels(self):
+        """ Creates the note labels, the first time they are needed. """
+        n = self.subgrid_size
+        font_size = max(5, round(9 * self.scale * 3 / n))
+        self.note_labels = [self.create_text((col + 1) * self.actual_width / (n + 1),
+                                             (row + 1) * self.actual_height / (n + 1), fill='white',
+                                             font=("Arial", font_size))
+                            for row in range(n) for col in range(n)]
 
     def _draw_thick_borders(self):
         """
         Draws the thicker lines on cells that are on the edge of a subgrid.
         Because this changes the length of the cell, the cell has to be made even long to accommodate them.
         """
-        thickness_width = 8
-        should_draw_vertical_line = self.model.y % SUBGRID_SIZE == 0 and self.model.y != 0
-        should_draw_horizontal_line = self.model.x % SUBGRID_SIZE == 0 and self.model.x != 0
-        line_length = CellView.WIDTH * 1.4
+        thickness_width = max(2, round(8 * self.scale))
+        should_draw_vertical_line = self.model.y % self.subgrid_size == 0 and self.model.y != 0
+        should_draw_horizontal_line = self.model.x % self.subgrid_size == 0 and self.model.x != 0
+        line_length = self.cell_width * 1.4
 
         if should_draw_vertical_line:
             self.create_line(0, 0, 0, line_length if should_draw_horizontal_line
-                                                  else CellView.WIDTH, width=thickness_width, fill=BACKGROUND_COLOR)
-            self.actual_width = CellView.WIDTH + thickness_width
-            self.config(width=CellView.WIDTH + thickness_width / 2)
+                                                  else self.cell_width, width=thickness_width, fill=BACKGROUND_COLOR)
+            self.actual_width = self.cell_width + thickness_width
+            self.config(width=self.cell_width + thickness_width / 2)
 
         if should_draw_horizontal_line:
             self.create_line(0, 0, line_length if should_draw_vertical_line
-                                               else CellView.WIDTH, 0, width=thickness_width, fill=BACKGROUND_COLOR)
-            self.actual_height = CellView.WIDTH + thickness_width
-            self.config(height=CellView.WIDTH + thickness_width / 2)
+                                               else self.cell_width, 0, width=thickness_width, fill=BACKGROUND_COLOR)
+            self.actual_height = self.cell_width + thickness_width
+            self.config(height=self.cell_width + thickness_width / 2)
 
     def update_color(self, color: str):
         """ Sets the color of the cell. """
@@ -77,7 +92,7 @@ class CellView(Canvas, Observer):
         If the model is empty, this will be blank.
         """
         self.itemconfig(self.value_label,
-                        text=self.model.value if self.model.value is not None else '',
+                        text=digit_symbol(self.model.value) if self.model.value is not None else '',
                         fill='white' if self.model.value_type == CellValueType.ENTRY else 'black')
 
     @property
@@ -96,8 +111,10 @@ class CellView(Canvas, Observer):
             case CellValueType.NOTES:
                 self.clear_entry()
 
+                if not self.note_labels:
+                    self._create_note_labels()
                 for i, label in enumerate(self.note_labels):
-                    self.itemconfig(label, text=i + 1 if self.model.notes[i] else '')
+                    self.itemconfig(label, text=digit_symbol(i + 1) if self.model.notes[i] else '')
             case CellValueType.GIVEN:
                 self.update_value_label()
             case _:
@@ -1,4 +1,5 @@
-﻿from views.action_button import BUTTON_DEFAULT_COLOR
+﻿from core.geometry import digit_symbol
+from views.action_button import BUTTON_DEFAULT_COLOR
 from views.toggle_button import ToggleButton
 from tkinter import Frame
 
@@ -21,9 +22,9 @@ class NumberButton(ToggleButton):
     WIDTH = 100
     board_controller = None
 
-    def __init__(self, parent: Frame, board_controller: 'BoardController', number: int, **kwargs):
-        super().__init__(parent, str(number), font_size=18,
-                         width=NumberButton.WIDTH, height=NumberButton.WIDTH, **kwargs)
+    def __init__(self, parent: Frame, board_controller: 'BoardController', number: int, width=WIDTH, **kwargs):
+        super().__init__(parent, digit_symbol(number), font_size=round(18 * width / NumberButton.WIDTH),
+                         width=width, height=width, **kwargs)
         NumberButton.buttons[number] = self
         NumberButton.board_controller = board_controller
         self.number = number